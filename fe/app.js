@@ -7,7 +7,7 @@
 
 const API_BASE = localStorage.getItem("cj_api") || "http://localhost:8000";
 const TG_FILE_LIMIT_MB = 20; // mirror of Settings.TG_FILE_LIMIT_MB
-const POLL_MS = 8000;
+const RETRY_MS = 8000; // pause before reconnecting after a failed wait
 
 const state = {
   access: localStorage.getItem("cj_access"),
@@ -15,7 +15,7 @@ const state = {
   me: null,
   wizard: null, // {type: "launch"|"phone", step, data}
   lastNotifId: 0,
-  pollTimer: null,
+  notifAbort: null, // AbortController of the live notifications loop
   submitTaskId: null,
 };
 
@@ -86,7 +86,7 @@ function flattenDetail(detail) {
   return String(detail);
 }
 
-async function api(path, { method = "GET", body, raw = false } = {}) {
+async function api(path, { method = "GET", body, raw = false, signal } = {}) {
   const doFetch = () =>
     fetch(API_BASE + path, {
       method,
@@ -95,6 +95,7 @@ async function api(path, { method = "GET", body, raw = false } = {}) {
         ...(state.access ? { Authorization: `Bearer ${state.access}` } : {}),
       },
       body: body === undefined ? undefined : JSON.stringify(body),
+      signal,
     });
 
   let resp;
@@ -166,7 +167,7 @@ function logout() {
   localStorage.removeItem("cj_refresh");
   state.access = state.refresh = state.me = null;
   state.wizard = null;
-  if (state.pollTimer) clearInterval(state.pollTimer);
+  if (state.notifAbort) state.notifAbort.abort();
   $("frame").classList.add("hidden");
   $("login").classList.remove("hidden");
 }
@@ -773,28 +774,73 @@ async function phoneInput(text) {
   }
 }
 
-// --- notifications polling ----------------------------------------------------------
+// --- live notifications ----------------------------------------------------------
+// Server-sent events from /users/me/notifications/stream, read with fetch (an
+// EventSource can't send the bearer token). If the stream can't be opened or
+// drops, one long-poll round on /wait keeps us current and refreshes the token
+// through api(); then the stream is retried.
 
 function startPolling() {
-  if (state.pollTimer) clearInterval(state.pollTimer);
+  if (state.notifAbort) state.notifAbort.abort();
+  const ctl = new AbortController();
+  state.notifAbort = ctl;
   state.lastNotifId = 0;
-  // first poll primes since_id without replaying history
-  api("/users/me/notifications?limit=1")
+  // prime since_id without replaying history
+  api("/users/me/notifications?limit=1", { signal: ctl.signal })
     .then((rows) => { if (rows.length) state.lastNotifId = rows[0].id; })
-    .catch(() => {});
-  state.pollTimer = setInterval(pollNotifications, POLL_MS);
+    .catch(() => {})
+    .then(() => listenNotifications(ctl.signal));
 }
 
-async function pollNotifications() {
-  if (!state.access) return;
-  try {
-    const rows = await api(`/users/me/notifications?since_id=${state.lastNotifId}`);
-    for (const row of rows.reverse()) {
-      // oldest first
-      state.lastNotifId = Math.max(state.lastNotifId, row.id);
-      if (row.text && row.status === "sent") bellMsg(row.text);
+function showNotification(row) {
+  state.lastNotifId = Math.max(state.lastNotifId, row.id);
+  // outbox rows arrive before Telegram delivery; only skipped ones stay silent
+  if (row.text && row.status !== "skipped") bellMsg(row.text);
+}
+
+async function listenNotifications(signal) {
+  while (!signal.aborted && state.access) {
+    try {
+      await streamNotifications(signal);
+    } catch (_) { /* fall through to a long-poll round */ }
+    if (signal.aborted || !state.access) return;
+    try {
+      const rows = await api(
+        `/users/me/notifications/wait?since_id=${state.lastNotifId}&timeout=25`,
+        { signal },
+      );
+      rows.forEach(showNotification); // oldest first
+    } catch (_) {
+      // live updates never bother the user; just back off
+      await new Promise((r) => setTimeout(r, RETRY_MS));
     }
-  } catch (_) { /* polling never bothers the user */ }
+  }
+}
+
+async function streamNotifications(signal) {
+  const resp = await fetch(
+    `${API_BASE}/users/me/notifications/stream?since_id=${state.lastNotifId}`,
+    { headers: { Authorization: `Bearer ${state.access}` }, signal },
+  );
+  if (!resp.ok || !resp.body) throw { status: resp.status };
+  const reader = resp.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buf = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buf += value;
+    let cut;
+    while ((cut = buf.indexOf("\n\n")) >= 0) {
+      const frame = buf.slice(0, cut);
+      buf = buf.slice(cut + 2);
+      const data = frame
+        .split("\n")
+        .filter((l) => l.startsWith("data: "))
+        .map((l) => l.slice(6))
+        .join("\n");
+      if (data) showNotification(JSON.parse(data)); // ": keep-alive" frames have none
+    }
+  }
 }
 
 // --- wire-up ---------------------------------------------------------------------
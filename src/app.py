@@ -2,6 +2,7 @@
 
 import logging
 import uuid
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,6 +11,9 @@ from sqlalchemy.exc import IntegrityError
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from config import settings
+from db import query_stats
+
+logger = logging.getLogger(__name__)
 
 
 def setup_logging() -> None:
@@ -28,6 +32,42 @@ class RequestIDMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class QueryCountMiddleware(BaseHTTPMiddleware):
+    """SQL statements and DB time per request (db/query_stats.py)."""
+
+    async def dispatch(self, request: Request, call_next):
+        with query_stats.track() as stats:
+            response = await call_next(request)
+        route = request.scope.get("route")
+        name = f"{request.method} {route.path if route else '(unmatched)'}"
+        query_stats.get_metrics().observe(name, stats)
+        for sql, n in stats.repeated(settings.QUERY_REPEAT_WARN):
+            logger.warning("Possible N+1 in %s: %d x %s", name, n, " ".join(sql.split())[:200])
+        if settings.ENV == "dev":
+            response.headers["X-DB-Queries"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.1f}"
+        return response
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    workers = []
+    if settings.NOTIFY_DISPATCH == "outbox":
+        from services.dispatcher import get_dispatcher
+        from services.fanout import get_worker
+
+        workers += [get_dispatcher(), get_worker()]
+    if settings.AUDIT_SINK == "buffered":
+        from services.audit import get_writer
+
+        workers.append(get_writer())
+    for worker in workers:
+        worker.start()
+    yield
+    for worker in workers:
+        await worker.stop()
+
+
 def create_app() -> FastAPI:
     setup_logging()
 
@@ -35,6 +75,7 @@ def create_app() -> FastAPI:
         title="Crowdjump API",
         description="Launch a task. The crowd jumps on it.",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -43,9 +84,10 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
         allow_headers=["*"],
-        expose_headers=["X-Request-ID"],
+        expose_headers=["X-Request-ID", "X-DB-Queries", "X-DB-Time-Ms"],
     )
     app.add_middleware(RequestIDMiddleware)
+    app.add_middleware(QueryCountMiddleware)
 
     from routers import auth as auth_router
     from routers import health as health_router
@@ -0,0 +1,121 @@
+# filepath: src/benchmarks/clarifier_pool.py
+
+"""Clarifier under load: synchronous runs vs the bounded runner pool.
+
+Run from src/:  python -m benchmarks.clarifier_pool [--drafts 100 --latency-ms 500]
+
+A pool of --api-threads stands in for the API's sync worker threads (40 is
+Starlette's default). --drafts submissions arrive at once, interleaved with
+--probes cheap requests (one SELECT each). The mock backend sleeps
+CLARIFIER_MOCK_LATENCY_MS per call, like a slow LLM. "sync" runs
+run_clarifier on the API thread; "pool" calls clarifier_runner.submit and
+the run lands from CLARIFIER_WORKERS background threads. Reports how long
+submissions and the probes waited, and when the last run landed.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Settings read the environment at import time (as in tests/conftest.py).
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='cj_bench_')}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production-000000")
+
+from sqlalchemy import text  # noqa: E402
+
+import db.models  # noqa: E402, F401  (register tables on Base.metadata)
+from config import settings  # noqa: E402
+from db.base import Base  # noqa: E402
+from db.engine import SessionLocal, engine  # noqa: E402
+from db.models import ClarifierRun, TaskDraft, User  # noqa: E402
+from services import clarifier  # noqa: E402
+from services.clarifier_runner import ClarifierRunner  # noqa: E402
+
+
+def _setup(drafts: int) -> list[int]:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        users = [User(email=f"launcher{i}@bench.local") for i in range(drafts)]
+        db.add_all(users)
+        db.flush()
+        rows = [
+            TaskDraft(
+                owner_id=u.id,
+                payload={"desc": f"watch the video on youtube.com/v{i} until 30s elapsed"},
+            )
+            for i, u in enumerate(users)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [d.id for d in rows]
+
+
+def _pct(values: list[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+def _run(mode: str, args: argparse.Namespace) -> None:
+    draft_ids = _setup(args.drafts)
+    runner = ClarifierRunner()
+
+    def submit(draft_id: int) -> float:
+        t0 = time.perf_counter()
+        with SessionLocal() as db:
+            draft = db.get(TaskDraft, draft_id)
+            if mode == "sync":
+                clarifier.run_clarifier(db, draft)
+            else:
+                runner.submit(db, draft)
+            db.commit()
+        return time.perf_counter() - t0
+
+    def probe(enqueued: float) -> float:
+        with SessionLocal() as db:
+            db.execute(text("SELECT 1"))
+        return time.perf_counter() - enqueued  # includes the wait for a free thread
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.api_threads) as api:
+        subs = [api.submit(submit, d) for d in draft_ids]
+        probes = [api.submit(probe, time.perf_counter()) for _ in range(args.probes)]
+        sub_latency = [f.result() for f in subs]
+        probe_latency = [f.result() for f in probes]
+    runner.wait_idle()
+    total = time.perf_counter() - start
+    with SessionLocal() as db:
+        recorded = db.query(ClarifierRun).count()
+    print(
+        f"{mode:<5} submit p50 {_pct(sub_latency, 0.5):>7.1f} ms"
+        f"  p99 {_pct(sub_latency, 0.99):>7.1f} ms"
+        f" | probe p50 {_pct(probe_latency, 0.5):>7.1f} ms"
+        f"  p99 {_pct(probe_latency, 0.99):>7.1f} ms"
+        f" | all landed {total:>5.1f}s  runs {recorded}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drafts", type=int, default=100)
+    parser.add_argument("--probes", type=int, default=50)
+    parser.add_argument("--api-threads", type=int, default=40)
+    parser.add_argument("--latency-ms", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=settings.CLARIFIER_WORKERS)
+    args = parser.parse_args()
+
+    settings.CLARIFIER_BACKEND = "mock"
+    settings.CLARIFIER_MOCK_LATENCY_MS = args.latency_ms
+    settings.CLARIFIER_QUEUE_MAX = args.drafts
+    settings.CLARIFIER_WORKERS = args.workers
+    print(
+        f"{args.drafts} submissions + {args.probes} probes on {args.api_threads} API threads, "
+        f"backend {args.latency_ms} ms, {settings.CLARIFIER_WORKERS} clarifier workers"
+    )
+    for mode in ("sync", "pool"):
+        _run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
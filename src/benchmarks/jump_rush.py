@@ -0,0 +1,119 @@
+# filepath: src/benchmarks/jump_rush.py
+
+"""Launch rush: many concurrent POST /tasks/{id}/jump on one small task.
+
+Run from src/:  python -m benchmarks.jump_rush [--jumpers 1000 --slots 10]
+
+Uses a throwaway SQLite database and the in-process app. Each run is done
+with the admission queue on ("memory") and off, and checks that exactly
+--slots jumps were granted and the task's slot counter agrees. Latency is
+measured client-side through TestClient, so it includes the harness; the
+SQL statement count is the server-side cost.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Settings read the environment at import time (as in tests/conftest.py).
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='cj_bench_')}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production-000000")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import db.models  # noqa: E402, F401  (register tables on Base.metadata)
+from app import app  # noqa: E402
+from config import settings  # noqa: E402
+from db.base import Base  # noqa: E402
+from db.engine import SessionLocal, engine  # noqa: E402
+from db.models import Jump, Task, User  # noqa: E402
+from services.admission import get_admission  # noqa: E402
+from services.auth import create_access_token  # noqa: E402
+
+_statements = Counter()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(*_args) -> None:
+    _statements["n"] += 1
+
+
+def _setup(jumpers: int, slots: int) -> tuple[int, list[dict]]:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        owner = User(email="launcher@bench.local")
+        users = [User(email=f"jumper{i}@bench.local") for i in range(jumpers)]
+        db.add_all([owner, *users])
+        db.flush()
+        task = Task(
+            owner_id=owner.id,
+            desc="launch rush",
+            total_budget=5 * slots,
+            you_earn=5,
+            num_jumpers=slots,
+        )
+        db.add(task)
+        db.commit()
+        headers = [{"Authorization": f"Bearer {create_access_token(u.id)}"} for u in users]
+        return task.id, headers
+
+
+def _run(backend: str, jumpers: int, slots: int) -> None:
+    settings.ADMISSION_BACKEND = backend
+    get_admission().reset()
+    task_id, headers = _setup(jumpers, slots)
+    client = TestClient(app, raise_server_exceptions=False)
+    start = threading.Barrier(jumpers)
+
+    def jump(h: dict) -> tuple[int, float]:
+        start.wait()  # release every request at once
+        t0 = time.perf_counter()
+        code = client.post(f"/tasks/{task_id}/jump", headers=h).status_code
+        return code, time.perf_counter() - t0
+
+    _statements.clear()
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jumpers) as pool:
+        results = list(pool.map(jump, headers))
+    wall = time.perf_counter() - t0
+    statements = _statements["n"]
+
+    with SessionLocal() as db:
+        task = db.get(Task, task_id)
+        granted = db.query(Jump).filter(Jump.task_id == task_id).count()
+        occupied, task_status = task.occupied_slots, task.status
+
+    codes = Counter(code for code, _ in results)
+    ms = sorted(latency * 1000 for _, latency in results)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(
+        f"{backend:<8}{wall:>7.2f}s  p50 {statistics.median(ms):>7.1f}ms  p99 {p99:>7.1f}ms  "
+        f"max {ms[-1]:>7.1f}ms  {dict(sorted(codes.items()))}"
+    )
+    print(
+        f"{'':<8}{statements:,} SQL statements; "
+        f"jumps {granted}, occupied_slots {occupied}, status {task_status}"
+    )
+    assert granted == occupied == slots and task_status == "full", "slot accounting broke"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jumpers", type=int, default=1000)
+    parser.add_argument("--slots", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{args.jumpers:,} concurrent jumps on a {args.slots}-slot task")
+    for backend in ("memory", "off"):
+        _run(backend, args.jumpers, args.slots)
+
+
+if __name__ == "__main__":
+    main()
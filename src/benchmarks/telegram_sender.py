@@ -0,0 +1,134 @@
+# filepath: src/benchmarks/telegram_sender.py
+
+"""Telegram sender against a local fake Bot API that enforces rate limits.
+
+Run from src/:  python -m benchmarks.telegram_sender [--messages 300 --chats 100]
+
+The fake server answers sendMessage with 429 + retry_after once a bot
+exceeds --limit messages in the last second or a chat gets two messages
+within a second, like the real Bot API. The same workload is sent with
+the configured pacing and with pacing disabled; both honor retry_after.
+Reports throughput, 429s and TCP connections opened.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production-000000")
+
+from config import settings  # noqa: E402
+from services.notifier import TelegramNotifierBackend  # noqa: E402
+
+
+class FakeBotApi(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, limit: int):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.recent: deque[float] = deque()  # accepted send times, last second
+        self.last_by_chat: dict[str, float] = {}
+        self.accepted = self.rejected = self.connections = 0
+
+    def admit(self, chat_id: str) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and self.recent[0] <= now - 1:
+                self.recent.popleft()
+            if len(self.recent) >= self.limit or now - self.last_by_chat.get(chat_id, -1) < 1:
+                self.rejected += 1
+                return False
+            self.recent.append(now)
+            self.last_by_chat[chat_id] = now
+            self.accepted += 1
+            return True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+    server: FakeBotApi
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.server.admit(str(body["chat_id"])):
+            status, reply = 200, {"ok": True, "result": {"message_id": self.server.accepted}}
+        else:
+            status, reply = 429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 1}}
+        payload = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+def _run(label: str, args: argparse.Namespace, **overrides) -> None:
+    server = FakeBotApi(args.limit)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    settings.TELEGRAM_API_BASE = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.TELEGRAM_MAX_RETRIES = 10
+    sender = TelegramNotifierBackend("BENCH")
+
+    def send(i: int) -> bool:
+        try:
+            sender.send(str(i % args.chats), f"message {i}")
+            return True
+        except Exception:
+            return False
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        delivered = sum(pool.map(send, range(args.messages)))
+    elapsed = time.perf_counter() - t0
+    sender.close()
+    server.shutdown()
+    print(
+        f"{label:<10}{elapsed:>7.1f}s {delivered / elapsed:>7.1f} msg/s  delivered {delivered}  "
+        f"429s {server.rejected} ({server.rejected / (server.rejected + server.accepted):.0%})  "
+        f"connections {server.connections}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=settings.NOTIFY_DISPATCH_CONCURRENCY)
+    parser.add_argument("--limit", type=int, default=30, help="fake server's global msg/s")
+    args = parser.parse_args()
+
+    defaults = {
+        "TELEGRAM_RATE_PER_SECOND": settings.TELEGRAM_RATE_PER_SECOND,
+        "TELEGRAM_BURST": settings.TELEGRAM_BURST,
+        "TELEGRAM_CHAT_INTERVAL_SECONDS": settings.TELEGRAM_CHAT_INTERVAL_SECONDS,
+    }
+    print(f"{args.messages} messages to {args.chats} chats, {args.concurrency} senders")
+    _run("paced", args, **defaults)
+    _run(
+        "unpaced",
+        args,
+        TELEGRAM_RATE_PER_SECOND=1e9,
+        TELEGRAM_BURST=10**9,
+        TELEGRAM_CHAT_INTERVAL_SECONDS=0.0,
+    )
+
+
+if __name__ == "__main__":
+    main()
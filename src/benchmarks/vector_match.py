@@ -0,0 +1,109 @@
+# filepath: src/benchmarks/vector_match.py
+
+"""Vectorized vs per-user snapshot mode over a synthetic population.
+
+Run from src/:  python -m benchmarks.vector_match [--users 1000000]   (or: make bench)
+
+Needs numpy. Per-user snapshot mode is timed on a sample and scaled up;
+the sample doubles as an agreement check against unmet_requirements.
+"""
+
+import argparse
+import random
+import time
+from datetime import date
+
+from services import matching
+from services.attributes import (
+    FIELD_BIRTH_DATE,
+    FIELD_CITY,
+    FIELD_COUNTRY,
+    FIELD_GENDER,
+    SnapshotColumns,
+)
+from services.vector_match import AttributeMatrix
+
+CHUNK = 10_000
+COUNTRIES = ("germany", "france", "turkey", "russia", "spain", "italy", "brazil", "japan")
+CITIES = ("berlin", "munich", "paris", "istanbul", "moscow", "madrid", "rome", "tokyo")
+
+CASES = {
+    "gender": {"basic_filters": {"gender": "female"}},
+    "age 18-25": {"basic_filters": {"age_range": {"min": 18, "max": 25}}},
+    "emea minus russia": {
+        "basic_filters": {
+            "location_filter": {
+                "regions": [{"name": "emea", "exceptions": {"countries": ["russia"]}}]
+            }
+        }
+    },
+    "everything": {
+        "basic_filters": {
+            "gender": "male",
+            "age_range": {"min": 21, "max": 40},
+            "location_filter": {
+                "countries": [{"name": "germany", "exceptions": {"cities": ["berlin"]}}],
+                "cities": [{"name": "paris"}],
+            },
+        }
+    },
+}
+
+
+def _population(users: int, seed: int):
+    rng = random.Random(seed)
+    this_year = date.today().year
+
+    def one(values):
+        return frozenset((rng.choice(values),)) if rng.random() < 0.9 else frozenset()
+
+    for start in range(1, users + 1, CHUNK):
+        ids = tuple(range(start, min(start + CHUNK, users + 1)))
+        births = [
+            frozenset((f"{rng.randint(this_year - 70, this_year - 16)}-0{rng.randint(1, 9)}-15",))
+            for _ in ids
+        ]
+        yield SnapshotColumns(
+            ids,
+            {
+                FIELD_GENDER: tuple(one(("female", "male")) for _ in ids),
+                FIELD_COUNTRY: tuple(one(COUNTRIES) for _ in ids),
+                FIELD_CITY: tuple(one(CITIES) for _ in ids),
+                FIELD_BIRTH_DATE: tuple(births),
+            },
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    chunks = list(_population(args.users, args.seed))
+    matrix = AttributeMatrix.from_snapshots(chunks)
+    print(f"{args.users:,} users; matrix built in {time.perf_counter() - t0:.1f}s")
+
+    sample = [pair for chunk in chunks for pair in chunk][: args.sample]
+    scale = args.users / len(sample)
+    print(f"{'case':<20}{'vectorized':>12}{'per-user (est.)':>18}{'matches':>10}")
+    for name, filters in CASES.items():
+        pf = matching.parse_filters(filters)
+
+        t0 = time.perf_counter()
+        mask = matrix.mask(pf)
+        vectorized = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        expected = [not matching.unmet_requirements(pf, snap) for _uid, snap in sample]
+        per_user = (time.perf_counter() - t0) * scale
+
+        assert mask[: len(sample)].tolist() == expected, f"disagreement on {name}"
+        matches = int(mask.sum())
+        print(f"{name:<20}{vectorized * 1000:>10.1f}ms{per_user * 1000:>16.0f}ms{matches:>10,}")
+
+
+if __name__ == "__main__":
+    main()
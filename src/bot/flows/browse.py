@@ -2,7 +2,9 @@
 
 """Browse open tasks: one card per page, prev/next paging, Jump button.
 
-Paging edits the card message in place to keep the chat clean.
+Paging edits the card message in place to keep the chat clean. Next resumes
+from the previous card's cursor, so a tap fetches one task instead of
+recounting the feed; the total shown comes from the first page.
 """
 
 from aiogram import F, Router
@@ -15,6 +17,7 @@ from bot.api_client import ApiClient, ApiError
 router = Router(name="browse")
 
 PAGE_PREFIX = "br:page:"
+NEXT_PREFIX = "br:next:"  # br:next:{index}:{total}:{cursor}
 JUMP_PREFIX = "br:jump:"
 
 
@@ -30,12 +33,19 @@ def card_text(task: dict, index: int, total: int) -> str:
     )
 
 
-def card_kb(task: dict, page: int, total: int) -> InlineKeyboardMarkup:
+def card_kb(
+    task: dict, page: int, total: int, next_cursor: str | None = None
+) -> InlineKeyboardMarkup:
     nav: list[InlineKeyboardButton] = []
     if page > 1:
         nav.append(InlineKeyboardButton(text="⬅️ Prev", callback_data=f"{PAGE_PREFIX}{page - 1}"))
-    if page < total:
-        nav.append(InlineKeyboardButton(text="Next ➡️", callback_data=f"{PAGE_PREFIX}{page + 1}"))
+    if next_cursor:
+        nav.append(
+            InlineKeyboardButton(
+                text="Next ➡️",
+                callback_data=f"{NEXT_PREFIX}{page + 1}:{max(total, page + 1)}:{next_cursor}",
+            )
+        )
     rows = []
     if nav:
         rows.append(nav)
@@ -58,7 +68,20 @@ async def _render_page(
     if total == 0 or not data["items"]:
         return texts.BROWSE_EMPTY, None
     task = data["items"][0]
-    return card_text(task, page, total), card_kb(task, page, total)
+    return card_text(task, page, total), card_kb(task, page, total, data.get("next_cursor"))
+
+
+async def _render_next(
+    api: ApiClient, tg_id: int, page: int, total: int, cursor: str
+) -> tuple[str, InlineKeyboardMarkup | None]:
+    try:
+        data = await api.browse(tg_id, size=1, cursor=cursor, status="open")
+    except ApiError:  # stale or mangled cursor — start over
+        return await _render_page(api, tg_id, 1)
+    if not data["items"]:
+        return await _render_page(api, tg_id, page)
+    task = data["items"][0]
+    return card_text(task, page, total), card_kb(task, page, total, data.get("next_cursor"))
 
 
 @router.message(Command("browse"))
@@ -91,6 +114,18 @@ async def cb_page(query: CallbackQuery, api: ApiClient) -> None:
     await query.message.edit_text(text, reply_markup=kb)
 
 
+@router.callback_query(F.data.startswith(NEXT_PREFIX))
+async def cb_next(query: CallbackQuery, api: ApiClient) -> None:
+    await query.answer()
+    try:
+        page_s, total_s, cursor = query.data.removeprefix(NEXT_PREFIX).split(":", 2)
+        page, total = int(page_s), int(total_s)
+    except ValueError:  # malformed or stale callback data
+        return
+    text, kb = await _render_next(api, query.from_user.id, page, total, cursor)
+    await query.message.edit_text(text, reply_markup=kb)
+
+
 @router.callback_query(F.data.startswith(JUMP_PREFIX))
 async def cb_jump(query: CallbackQuery, api: ApiClient) -> None:
     payload = query.data.removeprefix(JUMP_PREFIX)
@@ -29,6 +29,9 @@ class Settings(BaseSettings):
     EMAIL_TOKEN_HOURS: int = 48
     ENV: str = "dev"
     LOG_LEVEL: str = "INFO"
+    # a statement run this often in one request is logged as a likely N+1
+    # (db/query_stats.py; ENV="dev" also sends X-DB-Queries / X-DB-Time-Ms)
+    QUERY_REPEAT_WARN: int = 10
     # --- Telegram bot (separate process; the bot is a pure API client) ---
     BOT_TOKEN: str | None = None
     API_BASE_URL: str = "http://localhost:8000"
@@ -56,10 +59,63 @@ class Settings(BaseSettings):
 
     # --- matching + notifications ---
     MATCH_CONFIDENCE_MIN: float = 0.8  # attribute rows below this don't count
-    MATCH_NOTIFY_CAP: int = 50  # max Jumpers notified per launch
+    MATCH_NOTIFY_CAP: int | None = None  # max Jumpers notified per launch; None = all
+    # Launch fan-out job (services/fanout.py): keyset batches, dripped per task.
+    FANOUT_BATCH_SIZE: int = 500  # recipients per batch
+    FANOUT_RATE_PER_SECOND: float = 100.0  # recipients enqueued per second, per task
+    FANOUT_POLL_SECONDS: float = 1.0  # idle re-check for due batches
     AUDIENCE_PRIVACY_FLOOR: int = 10  # below this, preview says "fewer than N"
-    BROWSE_SCAN_LIMIT: int = 200  # open tasks scanned for the eligible feed
+    # In-process bitmap index for audience counts (services/attribute_index.py);
+    # single-process: another worker's attribute writes are not seen.
+    ATTRIBUTE_INDEX_ENABLED: bool = True
+    # Counter cells (gender x country x birth date) answering audience previews
+    # without cities (services/audience_counters.py); same single-process caveat.
+    AUDIENCE_COUNTERS_ENABLED: bool = True
+    # Theta sketches for approximate previews (services/audience_sketches.py).
+    AUDIENCE_SKETCH_K: int = 4096  # hashes kept per sketch; error ~ 1/sqrt(K)
+    AUDIENCE_SKETCH_MAX_AGE_SECONDS: int = 300  # stale sketches rebuild after this
+    AUDIENCE_SKETCH_MIN_COUNT: int = 1000  # smaller estimates are recounted exactly
+    FILTER_CACHE_SIZE: int = 4096  # compiled task filters kept (LRU, by canonical JSON)
+    # Per-viewer eligible feed ids (services/feed_cache.py); 0 TTL disables.
+    FEED_CACHE_TTL_SECONDS: int = 30
+    FEED_CACHE_SIZE: int = 2048  # cached (viewer, feed params) entries, LRU
     NOTIFY_BACKEND: str = "console"  # "console" (log) | "telegram" (real sends)
+    # "outbox" = requests only write pending ledger rows and the background
+    # dispatcher (services/dispatcher.py) sends them; "inline" = send inside
+    # the triggering request, as before.
+    NOTIFY_DISPATCH: str = "outbox"
+    NOTIFY_DISPATCH_CONCURRENCY: int = 8  # sends in flight at once
+    NOTIFY_DISPATCH_BATCH: int = 100  # rows claimed per round
+    NOTIFY_DISPATCH_POLL_SECONDS: float = 2.0  # idle re-check (other workers' rows)
+    NOTIFY_SENDING_TIMEOUT_SECONDS: int = 300  # a claim older than this is retried
+    # task.matched rows are held this long and sent as one digest per user; 0 = off
+    NOTIFY_DIGEST_WINDOW_SECONDS: float = 60.0
+    # Live web notifications (routers/users.py, services/notification_bus.py)
+    NOTIFY_STREAM_HEARTBEAT_SECONDS: float = 15.0  # SSE keep-alive comment interval
+    NOTIFY_LONGPOLL_MAX_SECONDS: int = 30  # cap on the long-poll timeout
+    # Telegram sender (services/notifier.py). Bot API limits: ~30 msg/s per
+    # bot, ~1 msg/s per chat; 429s carry retry_after.
+    TELEGRAM_API_BASE: str = "https://api.telegram.org"  # point at a fake for benchmarks
+    TELEGRAM_RATE_PER_SECOND: float = 25.0  # global send rate, kept under the limit
+    TELEGRAM_BURST: int = 4  # back-to-back sends; rate + burst stays under ~30 in any second
+    TELEGRAM_CHAT_INTERVAL_SECONDS: float = 1.0  # min spacing of messages to one chat
+    TELEGRAM_MAX_RETRIES: int = 3  # transient failures: network, 5xx, 429
+    TELEGRAM_POOL_SIZE: int = 10  # pooled keep-alive connections to the Bot API
+
+    # --- jump admission (services/admission.py) ---
+    # "memory" = per-task in-process queue in front of jump grants; "off" = none.
+    ADMISSION_BACKEND: str = "memory"
+    ADMISSION_QUEUE_MAX: int = 200  # requests queued on one task before 503
+    ADMISSION_WAIT_SECONDS: float = 2.0  # longest wait for a task's turn, then 503
+    ADMISSION_FULL_TTL_SECONDS: float = 5.0  # "full" answered from memory this long
+
+    # --- audit log (services/audit.py) ---
+    # "session" = rows commit with the request; "buffered" = batched inserts
+    # from a background writer after the request commits.
+    AUDIT_SINK: str = "session"
+    AUDIT_BATCH_SIZE: int = 500  # rows per INSERT; a full batch flushes at once
+    AUDIT_FLUSH_SECONDS: float = 1.0  # otherwise flush this often
+    AUDIT_BUFFER_MAX: int = 50_000  # oldest rows are dropped beyond this (DB outage)
 
     # --- clarifier (task-consumer LLM; devdocs/scoped/be/clarifier/bom.md) ---
     # "off" = clients use today's direct launch flow; "mock" = deterministic
@@ -72,6 +128,9 @@ class Settings(BaseSettings):
     CLARIFIER_MIN_TASK_CHARS: int = 12  # CJ-X3 code half
     CLARIFIER_QUESTION_CAP: int = 3  # blocking questions per card (§5)
     CLARIFIER_RUNS_PER_USER_PER_HOUR: int = 20  # token-abuse guard (429 beyond)
+    # services/rate_limiter.py: "memory" = per-process sliding window, no DB
+    # on the hot path; "db" = count recorded runs (exact across processes).
+    CLARIFIER_RATE_LIMITER: str = "memory"
     # Drafts persist indefinitely at MVP; retention POLICY is open (PII posture,
     # finding's T7). The knob ships so enabling cleanup is config, not code.
     CLARIFIER_DRAFT_TTL_DAYS: int | None = None
@@ -83,6 +142,20 @@ class Settings(BaseSettings):
     CLARIFIER_TOS_KILLED_ROWS: list[str] = []
     # Mock-backend latency injection (ms) for the slow-backend simulation (§8).
     CLARIFIER_MOCK_LATENCY_MS: int = 0
+    # Backend outputs shared across drafts by content (services/clarifier_cache.py);
+    # rows kept, least recently used evicted beyond. 0 disables the cache.
+    CLARIFIER_CACHE_SIZE: int = 10_000
+    # Backend runs off the request thread (services/clarifier_runner.py).
+    CLARIFIER_WORKERS: int = 4  # backend calls in flight at once
+    CLARIFIER_QUEUE_MAX: int = 32  # runs submitted but not landed; 503 beyond
+    CLARIFIER_RUN_TIMEOUT_SECONDS: float = 45.0  # then the run lands degraded
+    # Guard around every backend call (services/clarifier_backend.GuardedBackend).
+    CLARIFIER_MAX_IN_FLIGHT: int = 8  # concurrent backend calls; beyond = shed
+    CLARIFIER_BREAKER_WINDOW_SECONDS: float = 60.0  # rolling outcome window
+    CLARIFIER_BREAKER_MIN_CALLS: int = 5  # outcomes in the window before it can open
+    CLARIFIER_BREAKER_FAILURE_RATE: float = 0.5  # errors + slow calls share that opens it
+    CLARIFIER_BREAKER_SLOW_CALL_SECONDS: float = 20.0  # a success this slow counts as failed
+    CLARIFIER_BREAKER_OPEN_SECONDS: float = 30.0  # shed everything, then probe once
 
     @model_validator(mode="after")
     def _clarifier_real_needs_credentials(self) -> "Settings":
@@ -0,0 +1,87 @@
+# filepath: src/db/events.py
+
+"""Post-commit change feed for in-process indexes and caches.
+
+In-memory structures that mirror table contents (services/attribute_index.py
+and friends) must only ever see COMMITTED state — a flush that later rolls
+back must not leak into them. Changed rows are therefore collected per
+session at flush time and handed to subscribers only after the transaction
+commits; a rollback discards them.
+
+Subscribers receive keys (e.g. user ids), never ORM objects, and are
+expected to mark those keys stale and re-read lazily on their next use.
+Writes that bypass the unit of work (Core UPDATE/INSERT) must call touch().
+A subscriber may name the attributes it cares about: updates that change
+none of them (by attribute history, or touch()'s changed=) are not passed on.
+
+Single-process by design: commits made by another worker are invisible.
+"""
+
+import logging
+from collections.abc import Callable, Hashable, Iterable
+from itertools import chain
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_PENDING = "committed_changes"
+
+# (model, key extractor, handler, fields) — handler(keys) runs after each
+# commit that touched at least one instance of model (in one of fields, if set).
+_subscriptions: list[
+    tuple[type, Callable[[object], Hashable], Callable[[set], None], frozenset[str] | None]
+] = []
+
+
+def subscribe(
+    model: type,
+    handler: Callable[[set], None],
+    key: Callable[[object], Hashable],
+    fields: Iterable[str] | None = None,
+) -> None:
+    _subscriptions.append((model, key, handler, None if fields is None else frozenset(fields)))
+
+
+def touch(
+    session: Session,
+    instance: object,
+    model: type | None = None,
+    changed: Iterable[str] | None = None,
+) -> None:
+    """Record a change the unit of work can't see (e.g. a Core UPDATE). For a
+    Core write, pass a RETURNING row carrying the key columns, and its model.
+    changed names the attributes written; None means any (inserts, deletes)."""
+    changed = None if changed is None else set(changed)
+    pending = session.info.setdefault(_PENDING, {})
+    for subscribed, key, handler, fields in _subscriptions:
+        if not (issubclass(model, subscribed) if model else isinstance(instance, subscribed)):
+            continue
+        if fields is not None and changed is not None and fields.isdisjoint(changed):
+            continue
+        pending.setdefault(handler, set()).add(key(instance))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session: Session, _flush_context) -> None:
+    for instance in chain(session.new, session.deleted):
+        touch(session, instance)
+    for instance in session.dirty:
+        # attribute history is still in place until after_flush_postexec
+        attrs = inspect(instance).attrs
+        touch(session, instance, changed=(a.key for a in attrs if a.history.has_changes()))
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch(session: Session) -> None:
+    for handler, keys in session.info.pop(_PENDING, {}).items():
+        try:
+            handler(keys)
+        except Exception:  # a stale cache must never fail a committed request
+            logger.exception("Post-commit handler %r failed", handler)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_PENDING, None)
@@ -2,13 +2,20 @@
 
 from db.base import Base, utcnow
 from db.models.audit import AuditEvent
-from db.models.clarifier import ClarifierRun, DetectionRecord, DraftStatus, TaskDraft
+from db.models.clarifier import (
+    ClarifierCache,
+    ClarifierRun,
+    DetectionRecord,
+    DraftStatus,
+    TaskDraft,
+)
 from db.models.jump import Jump, JumpStatus
-from db.models.notification import Notification
+from db.models.notification import FanOutJob, Notification
 from db.models.payment import Payment, PaymentStatus, PaymentType
 from db.models.phone import SmsVerification
 from db.models.task import Task, TaskStatus
 from db.models.user import User
+from db.models.user_attributes import UserAttributes
 from db.models.verification import (
     ProofType,
     UserProof,
@@ -23,9 +30,11 @@ from db.models.verification import (
 __all__ = [
     "AuditEvent",
     "Base",
+    "ClarifierCache",
     "ClarifierRun",
     "DetectionRecord",
     "DraftStatus",
+    "FanOutJob",
     "Jump",
     "JumpStatus",
     "Notification",
@@ -38,6 +47,7 @@ __all__ = [
     "TaskDraft",
     "TaskStatus",
     "User",
+    "UserAttributes",
     "UserProof",
     "UserVerification",
     "VerificationData",
@@ -4,6 +4,7 @@ import enum
 
 from sqlalchemy import (
     JSON,
+    Boolean,
     Column,
     DateTime,
     ForeignKey,
@@ -11,6 +12,7 @@ from sqlalchemy import (
     Integer,
     String,
     UniqueConstraint,
+    false,
 )
 from sqlalchemy.orm import relationship
 
@@ -19,6 +21,7 @@ from db.base import Base, utcnow
 
 class DraftStatus(str, enum.Enum):
     CLARIFYING = "clarifying"
+    CHECKING = "checking"  # a backend run is in flight (services/clarifier_runner.py)
     AWAITING_APPROVAL = "awaiting_approval"
     HELD = "held"
     DECLINED = "declined"
@@ -32,6 +35,7 @@ class TaskDraft(Base):
     Status machine (transitions enforced server-side in the lifecycle
     endpoints, BOM §6):
 
+        clarifying ──submit──▶ checking ──run lands──▶ (the run's outcome, below)
         clarifying ──run ok, no gate──▶ awaiting_approval ──approve──▶ launched
         clarifying ──CJ-K3 uncertain──▶ held ──operator──▶ awaiting_approval | declined
         clarifying ──unrepairable gate─▶ declined (revise may re-enter clarifying)
@@ -96,6 +100,8 @@ class ClarifierRun(Base):
     normalized_slots = Column(JSON, nullable=True)  # copied onto the task at launch
     # ToS matrix v1 row — logged on EVERY run (matrix-v2 calibration data).
     tos_category = Column(String(16), nullable=True, index=True)
+    # llm_output came from the shared ClarifierCache — no backend call was made
+    cache_hit = Column(Boolean, nullable=False, default=False, server_default=false())
 
     created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
 
@@ -108,6 +114,40 @@ class ClarifierRun(Base):
         return f"<ClarifierRun id={self.id} draft={self.draft_id} status={self.status}>"
 
 
+class ClarifierCache(Base):
+    """Backend output shared across drafts and users, content-addressed.
+
+    Identical submissions (agencies relaunching the same brief) reuse one
+    LLMOutput instead of paying a backend call each. The key pins everything
+    the output depends on: the submission hash, the catalog the prompt was
+    built from, and the backend + model that produced it. Only successful
+    backend outputs are stored; degraded runs never are. Bounded to
+    CLARIFIER_CACHE_SIZE rows, least recently used evicted first.
+    """
+
+    __tablename__ = "clarifier_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "submission_hash", "catalog_version", "backend", "model",
+            name="uq_clarifier_cache_key",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    submission_hash = Column(String(64), nullable=False)
+    catalog_version = Column(String(16), nullable=False)
+    backend = Column(String(16), nullable=False)  # mock | real
+    model = Column(String(120), nullable=False, default="")  # "" when not applicable
+    llm_output = Column(JSON, nullable=False)
+    hits = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    last_used_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, index=True)
+
+    def __repr__(self) -> str:
+        return f"<ClarifierCache id={self.id} {self.backend} hits={self.hits}>"
+
+
 class DetectionRecord(Base):
     """Per-entry result row (catalog §2.6) — the calibration dataset.
 
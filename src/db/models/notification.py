@@ -20,10 +20,35 @@ class Notification(Base):
     event_type = Column(String(50), nullable=False, index=True)
     text = Column(String(500), nullable=True)  # the rendered message, for audit + web polling
     payload = Column(JSON, nullable=True)
-    status = Column(String(16), nullable=False, default="pending")
-    # pending | sent | failed | skipped
-    skip_reason = Column(String(30), nullable=True)  # "muted" | "no_channel"
+    status = Column(String(16), nullable=False, default="pending", index=True)
+    # pending | sending | sent | failed | skipped
+    skip_reason = Column(String(30), nullable=True)  # "muted" | "no_channel" | "task_closed"
     dedupe_key = Column(String(120), nullable=True, unique=True)
     provider_ref = Column(String(64), nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
     sent_at = Column(DateTime(timezone=True), nullable=True)
+    # set when the dispatcher claims the row (status -> sending)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class FanOutJob(Base):
+    """Progress of one task's task.matched fan-out (matching C7).
+
+    The matched audience is walked newest account first in keyset batches
+    (last_user_id is the cursor), so a job survives restarts and any worker
+    can pick up the next batch once next_run_at has passed.
+    """
+
+    __tablename__ = "fan_out_jobs"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, unique=True)
+    status = Column(String(16), nullable=False, default="running", index=True)
+    # running | done | stopped
+    stop_reason = Column(String(16), nullable=True)  # "full" | "closed" | "cap"
+    last_user_id = Column(Integer, nullable=True)  # cursor: lowest user id walked
+    matched = Column(Integer, nullable=False, default=0)  # recipients walked so far
+    notified = Column(Integer, nullable=False, default=0)  # ledger rows enqueued
+    next_run_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -37,6 +37,9 @@ class Task(Base):
     total_budget = Column(Float, nullable=False, default=0.0)
     you_earn = Column(Float, nullable=False, default=0.0)  # per-Jumper pay
     num_jumpers = Column(Integer, nullable=False, default=1)
+    # Jumps holding a slot (active/submitted/verified). Only ever changed by
+    # the conditional UPDATEs in services/tasks.py, never read-modify-write.
+    occupied_slots = Column(Integer, nullable=False, default=0, server_default="0")
     status = Column(String(20), nullable=False, default=TaskStatus.OPEN.value, index=True)
     category = Column(String(50), nullable=True, index=True)
 
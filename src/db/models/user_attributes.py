@@ -0,0 +1,35 @@
+# filepath: src/db/models/user_attributes.py
+
+from sqlalchemy import Boolean, Column, Date, DateTime, Float, ForeignKey, Integer, Text, false
+
+from db.base import Base, utcnow
+
+
+class UserAttributes(Base):
+    """Per-user projection of current verification_data (matching SQL mode).
+
+    Derived, never written directly: services/attributes.py re-syncs a
+    user's row in the same transaction as any flush that touches their
+    verification_data. One value per field: the newest confident current
+    row, else the newest current row. Confidence is kept per field so the
+    MATCH_CONFIDENCE_MIN threshold still applies at query time. Text like
+    verification_data.field_value, so no value can fail the sync.
+
+    irregular marks users one value per field can't describe: more than one
+    current row in a field, or a birth_date that isn't an ISO date (stored
+    as NULL). SQL mode checks those users against verification_data itself.
+    """
+
+    __tablename__ = "user_attributes"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    gender = Column(Text, nullable=True, index=True)
+    gender_confidence = Column(Float, nullable=True)
+    birth_date = Column(Date, nullable=True, index=True)
+    birth_date_confidence = Column(Float, nullable=True)
+    country = Column(Text, nullable=True, index=True)
+    country_confidence = Column(Float, nullable=True)
+    city = Column(Text, nullable=True, index=True)
+    city_confidence = Column(Float, nullable=True)
+    irregular = Column(Boolean, nullable=False, default=False, server_default=false())
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
@@ -0,0 +1,110 @@
+# filepath: src/db/query_stats.py
+
+"""Per-request SQL statement counting (N+1 detection).
+
+track() opens a scope in a contextvar; engine hooks add every statement
+executed inside it — count, DB time, and how often each distinct SQL string
+ran. QueryCountMiddleware (app.py) tracks each request: in dev the totals go
+out as X-DB-Queries / X-DB-Time-Ms response headers (tests assert query
+budgets on them), and every request feeds the per-route aggregates served at
+/health/queries. A statement repeated QUERY_REPEAT_WARN times in one request
+is logged as a likely N+1.
+
+Only work on the request's own context is counted: sync routes and
+asyncio.to_thread copy the context, background workers don't. Statements a
+streaming response runs after its headers are sent are not counted.
+"""
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from db.engine import engine
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statements executed at least threshold times, most frequent first."""
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start(_conn, _cursor, statement, _params, context, _executemany) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.statements[statement] += 1
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _stop(_conn, _cursor, _statement, _params, context, _executemany) -> None:
+    stats = _current.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.seconds += time.perf_counter() - started
+
+
+class RouteMetrics:
+    """Running totals per route template (e.g. "GET /tasks/{task_id}")."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict] = {}
+
+    def observe(self, route: str, stats: QueryStats) -> None:
+        with self._lock:
+            m = self._routes.setdefault(
+                route, {"requests": 0, "queries": 0, "max_queries": 0, "db_ms": 0.0}
+            )
+            m["requests"] += 1
+            m["queries"] += stats.count
+            m["max_queries"] = max(m["max_queries"], stats.count)
+            m["db_ms"] += stats.seconds * 1000
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                route: {
+                    "requests": m["requests"],
+                    "queries_avg": round(m["queries"] / m["requests"], 2),
+                    "queries_max": m["max_queries"],
+                    "db_ms_avg": round(m["db_ms"] / m["requests"], 3),
+                }
+                for route, m in sorted(self._routes.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+_metrics = RouteMetrics()
+
+
+def get_metrics() -> RouteMetrics:
+    return _metrics
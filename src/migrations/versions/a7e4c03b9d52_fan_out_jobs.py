@@ -0,0 +1,47 @@
+"""fan_out_jobs: paced task.matched fan-out progress
+
+Revision ID: a7e4c03b9d52
+Revises: f6c2d94a8e17
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e4c03b9d52'
+down_revision: Union[str, Sequence[str], None] = 'f6c2d94a8e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fan_out_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('stop_reason', sa.String(length=16), nullable=True),
+    sa.Column('last_user_id', sa.Integer(), nullable=True),
+    sa.Column('matched', sa.Integer(), nullable=False),
+    sa.Column('notified', sa.Integer(), nullable=False),
+    sa.Column('next_run_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], name=op.f('fk_fan_out_jobs_task_id_tasks')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_fan_out_jobs')),
+    sa.UniqueConstraint('task_id', name=op.f('uq_fan_out_jobs_task_id'))
+    )
+    with op.batch_alter_table('fan_out_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_fan_out_jobs_status'), ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('fan_out_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_fan_out_jobs_status'))
+
+    op.drop_table('fan_out_jobs')
@@ -0,0 +1,51 @@
+"""clarifier_cache: backend outputs shared across drafts; clarifier_runs.cache_hit
+
+Revision ID: c378eebb42d1
+Revises: a7e4c03b9d52
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c378eebb42d1'
+down_revision: Union[str, Sequence[str], None] = 'a7e4c03b9d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('clarifier_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('submission_hash', sa.String(length=64), nullable=False),
+    sa.Column('catalog_version', sa.String(length=16), nullable=False),
+    sa.Column('backend', sa.String(length=16), nullable=False),
+    sa.Column('model', sa.String(length=120), nullable=False),
+    sa.Column('llm_output', sa.JSON(), nullable=False),
+    sa.Column('hits', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_clarifier_cache')),
+    sa.UniqueConstraint('submission_hash', 'catalog_version', 'backend', 'model', name='uq_clarifier_cache_key')
+    )
+    with op.batch_alter_table('clarifier_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_clarifier_cache_last_used_at'), ['last_used_at'], unique=False)
+
+    with op.batch_alter_table('clarifier_runs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cache_hit', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('clarifier_runs', schema=None) as batch_op:
+        batch_op.drop_column('cache_hit')
+
+    with op.batch_alter_table('clarifier_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_clarifier_cache_last_used_at'))
+
+    op.drop_table('clarifier_cache')
@@ -0,0 +1,108 @@
+"""user_attributes: per-user projection of current verification_data (matching SQL mode)
+
+Revision ID: c52e9a7d1f03
+Revises: b7d31f8c4e22
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52e9a7d1f03'
+down_revision: Union[str, Sequence[str], None] = 'b7d31f8c4e22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# frozen copy of services.attributes.WIDE_COLUMNS at this revision
+_WIDE_COLUMNS = {
+    'gender': ('gender', 'gender_confidence'),
+    'birth_date': ('birth_date', 'birth_date_confidence'),
+    'location_country': ('country', 'country_confidence'),
+    'location_city': ('city', 'city_confidence'),
+}
+
+
+def _wide_value(field, value):
+    value = value.strip().lower()
+    if field != 'birth_date':
+        return value
+    try:
+        return date.fromisoformat(value) if len(value) == 10 else None
+    except ValueError:
+        return None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    user_attributes = op.create_table('user_attributes',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('gender', sa.Text(), nullable=True),
+    sa.Column('gender_confidence', sa.Float(), nullable=True),
+    sa.Column('birth_date', sa.Date(), nullable=True),
+    sa.Column('birth_date_confidence', sa.Float(), nullable=True),
+    sa.Column('country', sa.Text(), nullable=True),
+    sa.Column('country_confidence', sa.Float(), nullable=True),
+    sa.Column('city', sa.Text(), nullable=True),
+    sa.Column('city_confidence', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_user_attributes_user_id_users')),
+    sa.PrimaryKeyConstraint('user_id', name=op.f('pk_user_attributes'))
+    )
+    with op.batch_alter_table('user_attributes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_attributes_birth_date'), ['birth_date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_attributes_city'), ['city'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_attributes_country'), ['country'], unique=False)
+        batch_op.create_index(batch_op.f('ix_user_attributes_gender'), ['gender'], unique=False)
+
+    # backfill from current rows, newest row per field wins (ascending id)
+    verification_data = sa.table(
+        'verification_data',
+        sa.column('id', sa.Integer),
+        sa.column('user_id', sa.Integer),
+        sa.column('field_name', sa.String),
+        sa.column('field_value', sa.Text),
+        sa.column('confidence_score', sa.Float),
+        sa.column('is_current', sa.Boolean),
+    )
+    rows = op.get_bind().execute(
+        sa.select(
+            verification_data.c.user_id,
+            verification_data.c.field_name,
+            verification_data.c.field_value,
+            verification_data.c.confidence_score,
+        )
+        .where(
+            verification_data.c.is_current.is_(True),
+            verification_data.c.field_name.in_(list(_WIDE_COLUMNS)),
+        )
+        .order_by(verification_data.c.id)
+    )
+    blank = {c: None for pair in _WIDE_COLUMNS.values() for c in pair}
+    wide = {}
+    for user_id, field, value, confidence in rows:
+        column, confidence_column = _WIDE_COLUMNS[field]
+        row = wide.setdefault(user_id, {'user_id': user_id, **blank})
+        row[column] = _wide_value(field, value)
+        row[confidence_column] = confidence if row[column] is not None else None
+    now = datetime.now(timezone.utc)
+    if wide:
+        op.bulk_insert(
+            user_attributes,
+            [{**row, 'updated_at': now} for row in wide.values()],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('user_attributes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_attributes_gender'))
+        batch_op.drop_index(batch_op.f('ix_user_attributes_country'))
+        batch_op.drop_index(batch_op.f('ix_user_attributes_city'))
+        batch_op.drop_index(batch_op.f('ix_user_attributes_birth_date'))
+
+    op.drop_table('user_attributes')
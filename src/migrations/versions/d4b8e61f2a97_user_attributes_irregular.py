@@ -0,0 +1,82 @@
+"""user_attributes.irregular: users SQL mode checks against verification_data
+
+Revision ID: d4b8e61f2a97
+Revises: c378eebb42d1
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8e61f2a97'
+down_revision: Union[str, Sequence[str], None] = 'c378eebb42d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_FIELDS = ('gender', 'birth_date', 'location_country', 'location_city')
+_CHUNK = 1000
+
+
+def _iso(value):
+    value = value.strip().lower()
+    try:
+        return len(value) == 10 and date.fromisoformat(value) is not None
+    except ValueError:
+        return False
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('user_attributes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('irregular', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    # flag users with several current rows in a field or a non-ISO birth_date;
+    # their stored values are only read through the flag, so they stay as is
+    # until the user's next verification write re-syncs the row
+    verification_data = sa.table(
+        'verification_data',
+        sa.column('user_id', sa.Integer),
+        sa.column('field_name', sa.String),
+        sa.column('field_value', sa.Text),
+        sa.column('is_current', sa.Boolean),
+    )
+    user_attributes = sa.table(
+        'user_attributes',
+        sa.column('user_id', sa.Integer),
+        sa.column('irregular', sa.Boolean),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(
+            verification_data.c.user_id,
+            verification_data.c.field_name,
+            verification_data.c.field_value,
+        ).where(
+            verification_data.c.is_current.is_(True),
+            verification_data.c.field_name.in_(list(_FIELDS)),
+        )
+    )
+    seen = set()
+    irregular = set()
+    for user_id, field, value in rows:
+        if (user_id, field) in seen or (field == 'birth_date' and not _iso(value)):
+            irregular.add(user_id)
+        seen.add((user_id, field))
+    ids = sorted(irregular)
+    for start in range(0, len(ids), _CHUNK):
+        bind.execute(
+            user_attributes.update()
+            .where(user_attributes.c.user_id.in_(ids[start:start + _CHUNK]))
+            .values(irregular=True)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('user_attributes', schema=None) as batch_op:
+        batch_op.drop_column('irregular')
@@ -0,0 +1,37 @@
+"""tasks.occupied_slots: per-task slot counter for atomic jump accounting
+
+Revision ID: e3a8b15c7d40
+Revises: c52e9a7d1f03
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a8b15c7d40'
+down_revision: Union[str, Sequence[str], None] = 'c52e9a7d1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('occupied_slots', sa.Integer(), server_default='0', nullable=False))
+
+    # backfill: jumps holding a slot (services.tasks._SLOT_STATES at this revision)
+    op.execute(
+        "UPDATE tasks SET occupied_slots = ("
+        "SELECT COUNT(*) FROM jumps WHERE jumps.task_id = tasks.id "
+        "AND jumps.status IN ('active', 'submitted', 'verified'))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_column('occupied_slots')
@@ -4,7 +4,11 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from db import query_stats
 from db.deps import get_db
+from services.admission import get_admission
+from services.clarifier_backend import backend_stats
+from services.rate_limiter import get_limiter
 
 router = APIRouter(tags=["health"])
 
@@ -13,3 +17,22 @@ router = APIRouter(tags=["health"])
 def health(db: Session = Depends(get_db)) -> dict:
     db.execute(text("SELECT 1"))
     return {"status": "ok", "version": "0.1.0"}
+
+
+@router.get("/health/admission")
+def admission() -> dict:
+    """Jump admission queues: depth per busy task, tasks answered as full."""
+    return get_admission().stats()
+
+
+@router.get("/health/queries")
+def queries() -> dict:
+    """SQL statements and DB time per route since startup."""
+    return query_stats.get_metrics().snapshot()
+
+
+@router.get("/health/clarifier")
+def clarifier() -> dict:
+    """Clarifier backend guard (breaker state, calls in flight, shed counts)
+    and the per-owner run rate cap."""
+    return {**backend_stats(), "rate_limiter": get_limiter().stats()}
@@ -1,5 +1,7 @@
 # filepath: src/routers/tasks.py
 
+import asyncio
+
 from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 
@@ -10,13 +12,15 @@ from schemas.common import Page
 from schemas.task import (
     AudiencePreviewRequest,
     AudiencePreviewResponse,
+    FanOutRead,
     JumpRead,
     ParticipationRead,
     TaskCreate,
     TaskRead,
 )
-from services import audit, notifications
+from services import audit, fanout, notifications
 from services import tasks as task_service
+from services.admission import get_admission
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -42,7 +46,7 @@ def launch_task(
         payload={"total_budget": task.total_budget, "num_jumpers": task.num_jumpers},
         request_id=_request_id(request),
     )
-    notifications.fan_out_task_matched(db, task)  # matching C7
+    fanout.start(db, task)  # matching C7
     return task
 
 
@@ -53,10 +57,13 @@ def browse_tasks(
     min_you_earn: float | None = Query(default=None, ge=0),
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None, max_length=64),
     user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Page[TaskRead]:
-    items, total = task_service.browse_tasks(
+    # cursor (from a previous page's next_cursor) resumes after that item and
+    # skips the total; page is then ignored
+    items, total, next_cursor = task_service.browse_tasks(
         db,
         viewer_id=user.id,
         status_filter=status,
@@ -64,12 +71,14 @@ def browse_tasks(
         min_you_earn=min_you_earn,
         page=page,
         size=size,
+        cursor=cursor,
     )
     return Page(
         items=[TaskRead.model_validate(t) for t in items],
         total=total,
         page=page,
         size=size,
+        next_cursor=next_cursor,
     )
 
 
@@ -80,19 +89,30 @@ def audience_preview(
     db: Session = Depends(get_db),
 ) -> AudiencePreviewResponse:
     """How many verified Jumpers match these filters — shown to the Launcher
-    before funding. Exact counts only above the privacy floor."""
+    before funding. Counts only above the privacy floor; exact unless the
+    Launcher asked for an approximate figure and the audience is large."""
     from config import settings
     from services import matching
 
     filters = body.filters.model_dump(exclude_unset=True) if body.filters else None
-    count, warnings = matching.audience_count(db, filters, exclude_user_id=user.id)
+    count, warnings, source = matching.preview_count(
+        db, filters, exclude_user_id=user.id, approximate=body.approximate
+    )
     if count < settings.AUDIENCE_PRIVACY_FLOOR:
         return AudiencePreviewResponse(
             eligible_count=None,
             display=f"fewer than {settings.AUDIENCE_PRIVACY_FLOOR}",
             warnings=warnings,
+            source=source,
         )
-    return AudiencePreviewResponse(eligible_count=count, display=str(count), warnings=warnings)
+    approximate = source == "sketch"
+    return AudiencePreviewResponse(
+        eligible_count=count,
+        display=f"~{count}" if approximate else str(count),
+        warnings=warnings,
+        source=source,
+        approximate=approximate,
+    )
 
 
 @router.get("/my", response_model=list[TaskRead])
@@ -122,13 +142,7 @@ def get_task(
     return task_service.get_task(db, task_id)
 
 
-@router.post("/{task_id}/jump", response_model=JumpRead, status_code=201)
-def jump_on_task(
-    task_id: int,
-    request: Request,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> JumpRead:
+def _grant_jump(db: Session, task_id: int, user: User, request_id: str | None) -> JumpRead:
     task = task_service.get_task(db, task_id)
     jump = task_service.jump_on_task(db, task, user)
     audit.record(
@@ -138,13 +152,42 @@ def jump_on_task(
         target_type="jump",
         target_id=jump.id,
         payload={"task_id": task.id, "status": jump.status},
-        request_id=_request_id(request),
+        request_id=request_id,
     )
     if jump.status == "pending":
         notifications.notify_jump_pending(db, task, jump)
     if task.status == "full":
         notifications.notify_task_full(db, task)
-    return jump
+    # commit inside the turn: the next request in line must see this grant
+    db.commit()
+    if task.status == "full":
+        get_admission().mark_full(task_id)
+    return JumpRead.model_validate(jump)
+
+
+@router.post("/{task_id}/jump", response_model=JumpRead, status_code=201)
+async def jump_on_task(
+    task_id: int,
+    request: Request,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> JumpRead:
+    # auth is done; end its transaction so the connection goes back to the
+    # pool, then wait for the task's turn on the event loop, not a thread
+    await asyncio.to_thread(db.commit)
+    async with get_admission().admit(task_id):
+        return await asyncio.to_thread(_grant_jump, db, task_id, user, _request_id(request))
+
+
+@router.get("/{task_id}/fan-out", response_model=FanOutRead)
+def fan_out_progress(
+    task_id: int,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> FanOutRead:
+    """Launcher-only: how far the task.matched fan-out has got."""
+    task = task_service.get_task(db, task_id)
+    return fanout.get_progress(db, task, user)
 
 
 @router.get("/{task_id}/jumps", response_model=list[JumpRead])
@@ -203,6 +246,8 @@ def approve_jump(
     notifications.notify_jump_decision(db, task, jump, approved=True)
     if task.status == "full":
         notifications.notify_task_full(db, task)
+        db.commit()
+        get_admission().mark_full(task_id)
     return jump
 
 
@@ -214,6 +259,7 @@ def forfeit(
     db: Session = Depends(get_db),
 ) -> JumpRead:
     task = task_service.get_task(db, task_id)
+    was_full = task.status == "full"
     jump = task_service.forfeit_jump(db, task, user)
     audit.record(
         db,
@@ -224,4 +270,7 @@ def forfeit(
         payload={"task_id": task.id},
         request_id=_request_id(request),
     )
+    if was_full and task.status == "open":  # the freed slot reopened it
+        db.commit()
+        get_admission().mark_open(task_id)
     return jump
@@ -1,15 +1,24 @@
 # filepath: src/routers/users.py
 
-from fastapi import APIRouter, Depends, Query
+import asyncio
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 
+from config import settings
 from db.deps import get_db
+from db.engine import SessionLocal
 from db.models import Notification, User, UserVerification
 from routers.deps import get_current_user
 from schemas.user import NotificationPrefs, NotificationRead, UserMe, VerificationSummary
+from services.notification_bus import get_bus
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+_BATCH = 100  # rows per ledger read in the live endpoints
+
 
 @router.get("/me/notifications", response_model=list[NotificationRead])
 def my_notifications(
@@ -26,6 +35,88 @@ def my_notifications(
     return q.order_by(Notification.id.desc()).limit(limit).all()
 
 
+def _rows_after(user_id: int, after_id: int) -> list[NotificationRead]:
+    # own short session: live endpoints must not hold a connection while idle
+    with SessionLocal() as db:
+        rows = (
+            db.query(Notification)
+            .filter(Notification.user_id == user_id, Notification.id > after_id)
+            .order_by(Notification.id.asc())
+            .limit(_BATCH)
+            .all()
+        )
+        return [NotificationRead.model_validate(r) for r in rows]
+
+
+def _release(db: Session, user: User) -> int:
+    # auth is done; give the request session's connection back before waiting
+    user_id = user.id
+    db.close()
+    return user_id
+
+
+@router.get("/me/notifications/wait", response_model=list[NotificationRead])
+async def wait_for_notifications(
+    since_id: int = Query(default=0, ge=0),
+    timeout: float = Query(default=25, ge=0),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> list[NotificationRead]:
+    """Long-poll: rows with id > since_id, oldest first, as soon as there are
+    any — or [] after timeout seconds. Fallback for clients without streams."""
+    user_id = _release(db, user)
+    timeout = min(timeout, settings.NOTIFY_LONGPOLL_MAX_SECONDS)
+    with get_bus().subscribe(user_id) as sub:
+        rows = await asyncio.to_thread(_rows_after, user_id, since_id)
+        if rows or not timeout:
+            return rows
+        try:
+            await asyncio.wait_for(sub.changed.wait(), timeout)
+        except TimeoutError:
+            return []
+        return await asyncio.to_thread(_rows_after, user_id, since_id)
+
+
+@router.get("/me/notifications/stream")
+async def stream_notifications(
+    request: Request,
+    since_id: int = Query(default=0, ge=0),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """Server-sent events: every row with id > since_id, oldest first, then
+    each new row as it is committed (event "notification", id = row id).
+    Comment lines keep idle connections alive; idle streams touch no DB."""
+    user_id = _release(db, user)
+
+    async def events() -> AsyncIterator[str]:
+        last_id = since_id
+        with get_bus().subscribe(user_id) as sub:
+            while True:
+                sub.changed.clear()  # before reading, so no commit slips between
+                while rows := await asyncio.to_thread(_rows_after, user_id, last_id):
+                    for row in rows:
+                        last_id = row.id
+                        data = row.model_dump_json()
+                        yield f"id: {row.id}\nevent: notification\ndata: {data}\n\n"
+                    if len(rows) < _BATCH:
+                        break
+                try:
+                    await asyncio.wait_for(
+                        sub.changed.wait(), settings.NOTIFY_STREAM_HEARTBEAT_SECONDS
+                    )
+                except TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/me/notifications", response_model=NotificationPrefs)
 def set_notification_prefs(
     body: NotificationPrefs,
@@ -88,6 +88,7 @@ class RunResult(BaseModel):
     catalog_version: str
     backend: Literal["off", "mock", "real"]
     degraded: bool = False  # backend failure -> code-only run (visible fail-open)
+    cache_hit: bool = False  # backend output reused from the shared cache
     submission_hash: str
     results: list[EntryResult]
     slots: NormalizedSlots
@@ -9,6 +9,7 @@ T = TypeVar("T")
 
 class Page(BaseModel, Generic[T]):
     items: list[T]
-    total: int
+    total: int | None  # None in cursor mode: nothing past the page is counted
     page: int
     size: int
+    next_cursor: str | None = None
@@ -65,12 +65,16 @@ class TaskCreate(BaseModel):
 
 class AudiencePreviewRequest(BaseModel):
     filters: TaskFilters | None = None
+    # allow a sketch-based estimate for large audiences (faster, ~2% error)
+    approximate: bool = False
 
 
 class AudiencePreviewResponse(BaseModel):
     eligible_count: int | None  # None when below the privacy floor
-    display: str  # "23" or "fewer than 10"
+    display: str  # "23", "~12000" or "fewer than 10"
     warnings: list[str] = []
+    source: str = "sql"  # "sketch" | "counters" | "index" | "sql" — how the count was derived
+    approximate: bool = False  # True only for source="sketch"
 
 
 class TaskRead(BaseModel):
@@ -107,6 +111,16 @@ class JumpRead(BaseModel):
     resolved_at: datetime | None
 
 
+class FanOutRead(BaseModel):
+    status: str  # "running" | "done" | "stopped"
+    stop_reason: str | None  # "full" | "closed" | "cap"
+    matched: int  # recipients walked so far
+    notified: int  # ledger rows enqueued (deduped repeats excluded)
+    sent: int  # of those, delivered
+    created_at: datetime
+    finished_at: datetime | None
+
+
 class ParticipationRead(BaseModel):
     jump: JumpRead
     task: TaskRead
@@ -0,0 +1,233 @@
+# filepath: src/services/admission.py
+
+"""Admission queue in front of jump grants (launch rush).
+
+A launch notifies its matched Jumpers in quick batches and they all POST
+/tasks/{id}/jump within seconds. Every one of those requests would run the
+duplicate check, the eligibility snapshot and the slot claim against the
+same task row. The gate puts a per-task queue in front of that:
+
+- one request per task at a time holds the task's turn and runs the grant
+  (through its commit); the rest wait in line, at most ADMISSION_QUEUE_MAX
+  of them and for at most ADMISSION_WAIT_SECONDS — past either, 503;
+- once a grant fills the task it is marked full, and every queued or later
+  request is answered 409 "Task is full" without touching the database,
+  for ADMISSION_FULL_TTL_SECONDS or until a forfeit reopens the task here.
+
+Waiting costs no thread and no connection: admit() is an async context
+manager, so a queued request is a parked coroutine, and the route gives its
+session's connection back before queueing (routers/tasks.jump_on_task). The
+turn is handed from one request to the next under a thread lock with
+call_soon_threadsafe, so requests served on different event loops (tests,
+TestClient) share one queue.
+
+The slot claim itself stays atomic in SQL (services/tasks._claim_slot), so
+the gate is about load, not correctness: "off", another worker, or a stale
+full mark can only cost a DB round trip or an early 409, never an
+oversubscribed task.
+
+Backends: "memory" (per-process) or "off". Another backend (e.g. shared
+across workers) implements admit / mark_full / mark_open / stats and is
+returned by get_admission().
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, status
+
+from config import settings
+
+_SWEEP_STEP = 2  # gates looked at per admit / mark_full, so stale ones can't pile up
+
+
+def _full() -> HTTPException:
+    return HTTPException(status.HTTP_409_CONFLICT, "Task is full")
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        "Task is busy — try again",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _wake(turn: asyncio.Future) -> None:
+    if not turn.done():
+        turn.set_result(None)
+
+
+class _TaskGate:
+    __slots__ = ("held", "owner", "waiters", "depth", "full_until")
+
+    def __init__(self) -> None:
+        self.held = False  # some request holds the task's turn
+        self.owner: asyncio.Future | None = None  # the waiter the turn was handed to
+        self.waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self.depth = 0  # requests inside admit(): queued + the one holding the turn
+        self.full_until = 0.0  # clock deadline of the full mark
+
+    def is_full(self, now: float) -> bool:
+        return self.full_until > now
+
+    def pass_turn(self) -> None:
+        """Hand the turn to the next waiter, or free it. Caller holds the guard."""
+        if self.waiters:
+            loop, turn = self.waiters.popleft()
+            self.owner = turn
+            loop.call_soon_threadsafe(_wake, turn)
+        else:
+            self.held, self.owner = False, None
+
+
+class MemoryAdmission:
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._guard = threading.Lock()  # protects _gates and every gate's counters
+        self._gates: dict[int, _TaskGate] = {}
+        self._counts = {"admitted": 0, "rejected_full": 0, "rejected_busy": 0}
+
+    def reset(self) -> None:
+        with self._guard:
+            self._gates.clear()
+            self._counts = dict.fromkeys(self._counts, 0)
+
+    def _reject(self, kind: str) -> HTTPException:
+        self._counts[kind] += 1
+        return _full() if kind == "rejected_full" else _busy()
+
+    def _leave(self, task_id: int, gate: _TaskGate) -> None:
+        with self._guard:
+            gate.depth -= 1
+            if not gate.depth and not gate.is_full(self._clock()):
+                self._gates.pop(task_id, None)
+
+    def _sweep(self, now: float) -> None:
+        """Drop idle gates whose full mark expired — a task that filled and saw
+        no request since. Round robin: live gates go to the back. Caller holds
+        the guard."""
+        for _ in range(min(_SWEEP_STEP, len(self._gates))):
+            task_id = next(iter(self._gates))
+            gate = self._gates.pop(task_id)
+            if gate.depth or gate.is_full(now):
+                self._gates[task_id] = gate
+
+    async def _wait_turn(self, gate: _TaskGate, turn: asyncio.Future) -> bool:
+        """Wait for the turn; True once it's ours. On timeout or cancellation
+        a turn handed over meanwhile is ours (and passed on if cancelled)."""
+        try:
+            await asyncio.wait({turn}, timeout=settings.ADMISSION_WAIT_SECONDS)
+        finally:
+            with self._guard:
+                mine = gate.owner is turn
+                if not mine:
+                    gate.waiters.remove((turn.get_loop(), turn))
+                    turn.cancel()
+                elif not turn.done():  # handed over but not woken yet
+                    turn.cancel()
+        return mine
+
+    @asynccontextmanager
+    async def admit(self, task_id: int) -> AsyncIterator[None]:
+        """Hold task_id's turn for the body; 409 if known full, 503 if the
+        queue is too long or the turn doesn't come in time."""
+        turn = None
+        with self._guard:
+            now = self._clock()
+            self._sweep(now)
+            gate = self._gates.get(task_id) or _TaskGate()
+            if gate.is_full(now):
+                raise self._reject("rejected_full")
+            if gate.depth >= settings.ADMISSION_QUEUE_MAX:
+                raise self._reject("rejected_busy")
+            gate.depth += 1
+            self._gates[task_id] = gate
+            if gate.held:
+                turn = asyncio.get_running_loop().create_future()
+                gate.waiters.append((turn.get_loop(), turn))
+            else:
+                gate.held = True
+
+        try:
+            try:
+                if turn is not None and not await self._wait_turn(gate, turn):
+                    with self._guard:
+                        raise self._reject("rejected_busy")
+            except BaseException:
+                if turn is not None:
+                    with self._guard:
+                        if gate.owner is turn:  # cancelled right after the handover
+                            gate.pass_turn()
+                raise
+            try:
+                # the request ahead of us may have taken the last slot
+                with self._guard:
+                    if gate.is_full(self._clock()):
+                        raise self._reject("rejected_full")
+                    self._counts["admitted"] += 1
+                yield
+            finally:
+                with self._guard:
+                    gate.pass_turn()
+        finally:
+            self._leave(task_id, gate)
+
+    def mark_full(self, task_id: int) -> None:
+        with self._guard:
+            now = self._clock()
+            self._sweep(now)
+            gate = self._gates.setdefault(task_id, _TaskGate())
+            gate.full_until = now + settings.ADMISSION_FULL_TTL_SECONDS
+
+    def mark_open(self, task_id: int) -> None:
+        with self._guard:
+            gate = self._gates.get(task_id)
+            if gate is not None:
+                gate.full_until = 0.0
+                if not gate.depth:
+                    del self._gates[task_id]
+
+    def stats(self) -> dict:
+        """Queue depth per busy task, tasks marked full, and outcome counts."""
+        with self._guard:
+            now = self._clock()
+            return {
+                "queued": {tid: g.depth for tid, g in self._gates.items() if g.depth},
+                "full": sorted(tid for tid, g in self._gates.items() if g.is_full(now)),
+                **self._counts,
+            }
+
+
+class NoAdmission:
+    """ADMISSION_BACKEND=off: every request goes straight to the database."""
+
+    def reset(self) -> None:
+        pass
+
+    @asynccontextmanager
+    async def admit(self, task_id: int) -> AsyncIterator[None]:
+        yield
+
+    def mark_full(self, task_id: int) -> None:
+        pass
+
+    def mark_open(self, task_id: int) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+_memory = MemoryAdmission()
+_off = NoAdmission()
+
+
+def get_admission() -> MemoryAdmission | NoAdmission:
+    if settings.ADMISSION_BACKEND == "memory":
+        return _memory
+    return _off
@@ -0,0 +1,258 @@
+# filepath: src/services/attribute_index.py
+
+"""In-process inverted index over verified attributes (matching concept 4).
+
+The third evaluation mode next to SQL and snapshot mode: field/value ->
+bitmap of user ids (a Python int, bit n = user n), so a filter is answered
+with AND / OR / AND-NOT over a handful of integers instead of one
+correlated EXISTS per filter field and location alternative.
+
+Same inputs as load_snapshot: current rows with NULL or >= MATCH_CONFIDENCE_MIN
+confidence, values normalized lowercase. birth_date is bucketed by year,
+month and day so an age range costs at most ~100 bitmap ORs; values that
+aren't ISO dates keep their string comparison, exactly like the other modes.
+
+Kept fresh from db.events: a committed VerificationData write marks its user
+stale and the next lookup re-reads only those users. Changing
+MATCH_CONFIDENCE_MIN rebuilds from scratch.
+"""
+
+import threading
+from calendar import monthrange
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import events
+from db.models import VerificationData
+from services.attributes import (
+    FIELD_BIRTH_DATE,
+    FIELD_CITY,
+    FIELD_COUNTRY,
+    FIELD_GENDER,
+    current_confident,
+)
+
+if TYPE_CHECKING:
+    from services.matching import ParsedFilters
+
+_REFRESH_CHUNK = 500
+
+
+def bitmap_from_ids(ids: Iterable[int]) -> int:
+    """Build in O(n) — OR-ing 1 << id per id would copy the int every time."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buf = bytearray((max(ids) >> 3) + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def ids_from_bitmap(bitmap: int) -> list[int]:
+    """Set bits, ascending."""
+    out: list[int] = []
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) >> 3, "little")
+    for pos, byte in enumerate(data):
+        if byte:
+            base = pos << 3
+            out.extend(base + bit for bit in range(8) if byte >> bit & 1)
+    return out
+
+
+def parse_iso_date(value: str) -> date | None:
+    """birth_date values as dates; None for anything that isn't YYYY-MM-DD."""
+    try:
+        return date.fromisoformat(value) if len(value) == 10 else None
+    except ValueError:
+        return None
+
+
+def date_range_buckets(lo: date, hi: date) -> list[tuple[str, object]]:
+    """Cover [lo, hi] with the fewest year / month / day buckets.
+
+    Shared with the other bucketed structures so they all agree on which
+    births an age range includes.
+    """
+    buckets: list[tuple[str, object]] = []
+    d = lo
+    while d <= hi:
+        if d.month == 1 and d.day == 1 and date(d.year, 12, 31) <= hi:
+            buckets.append(("y", d.year))
+            d = date(d.year + 1, 1, 1)
+            continue
+        month_end = date(d.year, d.month, monthrange(d.year, d.month)[1])
+        if d.day == 1 and month_end <= hi:
+            buckets.append(("m", (d.year, d.month)))
+        else:
+            buckets.append(("d", d))
+            d += timedelta(days=1)
+            continue
+        d = month_end + timedelta(days=1)
+    return buckets
+
+
+class AttributeIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._confidence_min: float | None = None  # threshold of the current build
+        self._dirty: set[int] = set()
+        # field -> value -> bitmap, for every field except birth_date
+        self._postings: dict[str, dict[str, int]] = {}
+        # birth_date buckets: "y" -> year, "m" -> (year, month), "d" -> date
+        self._births: dict[str, dict] = {"y": {}, "m": {}, "d": {}}
+        self._odd_births: dict[str, int] = {}  # values that aren't ISO dates
+        self._user_values: dict[int, tuple[tuple[str, str], ...]] = {}
+
+    # --- maintenance -----------------------------------------------------
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def mark_stale(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._dirty.update(user_ids)
+
+    def _rows(self, db: Session):
+        return db.query(
+            VerificationData.user_id, VerificationData.field_name, VerificationData.field_value
+        ).filter(*current_confident())
+
+    def _build(self, db: Session) -> None:
+        self._clear()
+        per_user: dict[int, set[tuple[str, str]]] = defaultdict(set)
+        for user_id, field, value in self._rows(db).yield_per(5000):
+            per_user[user_id].add((field, value.strip().lower()))
+
+        grouped: dict[tuple, list[int]] = defaultdict(list)
+        odd: dict[str, list[int]] = defaultdict(list)
+        for user_id, pairs in per_user.items():
+            self._user_values[user_id] = tuple(pairs)
+            for field, value in pairs:
+                if field != FIELD_BIRTH_DATE:
+                    grouped[("p", field, value)].append(user_id)
+                elif (d := parse_iso_date(value)) is None:
+                    odd[value].append(user_id)
+                else:
+                    for bucket in (("y", d.year), ("m", (d.year, d.month)), ("d", d)):
+                        grouped[("b", *bucket)].append(user_id)
+
+        for gkey, ids in grouped.items():
+            if gkey[0] == "p":
+                self._postings.setdefault(gkey[1], {})[gkey[2]] = bitmap_from_ids(ids)
+            else:
+                self._births[gkey[1]][gkey[2]] = bitmap_from_ids(ids)
+        self._odd_births = {value: bitmap_from_ids(ids) for value, ids in odd.items()}
+        self._confidence_min = settings.MATCH_CONFIDENCE_MIN
+
+    def _flip(self, user_id: int, pairs: Iterable[tuple[str, str]], on: bool) -> None:
+        bit = 1 << user_id
+
+        def apply(table: dict, key) -> None:
+            bm = table.get(key, 0) | bit if on else table.get(key, 0) & ~bit
+            if bm:
+                table[key] = bm
+            else:
+                table.pop(key, None)
+
+        for field, value in pairs:
+            if field != FIELD_BIRTH_DATE:
+                apply(self._postings.setdefault(field, {}), value)
+            elif (d := parse_iso_date(value)) is None:
+                apply(self._odd_births, value)
+            else:
+                for kind, key in (("y", d.year), ("m", (d.year, d.month)), ("d", d)):
+                    apply(self._births[kind], key)
+
+    def _refresh(self, db: Session) -> None:
+        dirty = sorted(self._dirty)
+        self._dirty.clear()
+        for start in range(0, len(dirty), _REFRESH_CHUNK):
+            chunk = dirty[start : start + _REFRESH_CHUNK]
+            fresh: dict[int, set[tuple[str, str]]] = {uid: set() for uid in chunk}
+            for user_id, field, value in self._rows(db).filter(VerificationData.user_id.in_(chunk)):
+                fresh[user_id].add((field, value.strip().lower()))
+            for user_id, pairs in fresh.items():
+                self._flip(user_id, self._user_values.pop(user_id, ()), on=False)
+                if pairs:
+                    self._user_values[user_id] = tuple(pairs)
+                    self._flip(user_id, pairs, on=True)
+
+    def _ensure_current(self, db: Session) -> None:
+        if self._confidence_min != settings.MATCH_CONFIDENCE_MIN:
+            self._build(db)
+        elif self._dirty:
+            self._refresh(db)
+
+    # --- evaluation --------------------------------------------------------
+
+    def _value(self, field: str, value: str) -> int:
+        return self._postings.get(field, {}).get(value, 0)
+
+    def _births_between(self, earliest: str | None, latest: str | None) -> int:
+        bm = 0
+        for value, odd in self._odd_births.items():
+            if (earliest is None or value >= earliest) and (latest is None or value <= latest):
+                bm |= odd
+        years = self._births["y"]
+        if not years:
+            return bm
+        lo = parse_iso_date(earliest) if earliest else None
+        hi = parse_iso_date(latest) if latest else None
+        lo = max(lo or date.min, date(min(years), 1, 1))
+        hi = min(hi or date.max, date(max(years), 12, 31))
+        for kind, key in date_range_buckets(lo, hi):
+            bm |= self._births[kind].get(key, 0)
+        return bm
+
+    def _evaluate(self, pf: "ParsedFilters") -> int:
+        result: int | None = None
+
+        def narrow(bm: int) -> None:
+            nonlocal result
+            result = bm if result is None else result & bm
+
+        if pf.gender:
+            narrow(self._value(FIELD_GENDER, pf.gender))
+        if pf.birth_latest or pf.birth_earliest:
+            narrow(self._births_between(pf.birth_earliest, pf.birth_latest))
+        if pf.has_location:
+            location = 0
+            for city in pf.cities:
+                location |= self._value(FIELD_CITY, city)
+            for country, excluded_cities in pf.countries:
+                in_country = self._value(FIELD_COUNTRY, country)
+                for city in excluded_cities:
+                    in_country &= ~self._value(FIELD_CITY, city)
+                location |= in_country
+            narrow(location)
+        return result or 0
+
+    def match(self, db: Session, pf: "ParsedFilters") -> int:
+        """Bitmap of users passing a constrained filter.
+
+        Unconstrained filters match users with no attributes at all, which
+        this index never sees — callers answer those from the users table.
+        """
+        with self._lock:
+            self._ensure_current(db)
+            return self._evaluate(pf)
+
+
+_index = AttributeIndex()
+
+
+def get_index() -> AttributeIndex:
+    return _index
+
+
+events.subscribe(VerificationData, _index.mark_stale, key=lambda row: row.user_id)
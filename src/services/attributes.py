@@ -12,11 +12,23 @@ so both sides must import from here:
     gender             lowercase ("female", "male", ...)
 """
 
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date
+from itertools import chain
+
+from sqlalchemy import delete, event, insert, select
 from sqlalchemy.orm import Session
 
 from config import settings
 from db.base import utcnow
-from db.models import User, UserVerification, VerificationData, VerificationType
+from db.models import (
+    User,
+    UserAttributes,
+    UserVerification,
+    VerificationData,
+    VerificationType,
+)
 
 FIELD_COUNTRY = "location_country"
 FIELD_CITY = "location_city"
@@ -27,21 +39,35 @@ KNOWN_FIELDS = (FIELD_COUNTRY, FIELD_CITY, FIELD_BIRTH_DATE, FIELD_GENDER)
 
 DEV_SEED_VERIFICATION = "dev_seed"
 
+# field -> (user_attributes value column, confidence column)
+WIDE_COLUMNS = {
+    FIELD_GENDER: ("gender", "gender_confidence"),
+    FIELD_BIRTH_DATE: ("birth_date", "birth_date_confidence"),
+    FIELD_COUNTRY: ("country", "country_confidence"),
+    FIELD_CITY: ("city", "city_confidence"),
+}
+
+SNAPSHOT_CHUNK = 1000  # user ids per IN query in load_snapshots
 
-def load_snapshot(db: Session, user_id: int) -> dict[str, set[str]]:
-    """All current, confident attribute values for a user: field -> values.
+
+def current_confident() -> tuple:
+    """Row criteria every reader of verified attributes applies.
 
     NULL confidence counts as confident — the row exists because a
     verification accepted it; the score is optional metadata.
     """
+    return (
+        VerificationData.is_current.is_(True),
+        (VerificationData.confidence_score.is_(None))
+        | (VerificationData.confidence_score >= settings.MATCH_CONFIDENCE_MIN),
+    )
+
+
+def load_snapshot(db: Session, user_id: int) -> dict[str, set[str]]:
+    """All current, confident attribute values for a user: field -> values."""
     rows = (
         db.query(VerificationData.field_name, VerificationData.field_value)
-        .filter(
-            VerificationData.user_id == user_id,
-            VerificationData.is_current.is_(True),
-            (VerificationData.confidence_score.is_(None))
-            | (VerificationData.confidence_score >= settings.MATCH_CONFIDENCE_MIN),
-        )
+        .filter(VerificationData.user_id == user_id, *current_confident())
         .all()
     )
     snapshot: dict[str, set[str]] = {}
@@ -50,6 +76,146 @@ def load_snapshot(db: Session, user_id: int) -> dict[str, set[str]]:
     return snapshot
 
 
+@dataclass(frozen=True)
+class SnapshotColumns:
+    """Snapshots for a chunk of users, stored column-wise.
+
+    columns[field][i] holds user_ids[i]'s values for field (empty when
+    absent). Equal value sets are one shared frozenset, so a chunk costs
+    roughly one tuple slot per user per field.
+    """
+
+    user_ids: tuple[int, ...]
+    columns: dict[str, tuple[frozenset[str], ...]]
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def snapshot(self, i: int) -> dict[str, frozenset[str]]:
+        """Row i in load_snapshot's shape."""
+        return {field: col[i] for field, col in self.columns.items() if col[i]}
+
+    def __iter__(self) -> Iterator[tuple[int, dict[str, frozenset[str]]]]:
+        for i, user_id in enumerate(self.user_ids):
+            yield user_id, self.snapshot(i)
+
+
+def load_snapshots(
+    db: Session, user_ids: Iterable[int], chunk_size: int = SNAPSHOT_CHUNK
+) -> Iterator[SnapshotColumns]:
+    """load_snapshot for many users: one IN query per chunk of ids.
+
+    Streams one SnapshotColumns per chunk (ids deduplicated, ascending;
+    users without attributes included with empty columns), so memory stays
+    bounded by chunk_size however many ids are passed.
+    """
+    ids = sorted(set(user_ids))
+    empty: frozenset[str] = frozenset()
+    shared: dict[frozenset[str], frozenset[str]] = {}
+
+    def intern(values: set[str] | None) -> frozenset[str]:
+        if not values:
+            return empty
+        values = frozenset(values)
+        return shared.setdefault(values, values)
+
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start : start + chunk_size]
+        position = {user_id: i for i, user_id in enumerate(chunk)}
+        raw: dict[str, list[set[str] | None]] = {}
+        rows = (
+            db.query(
+                VerificationData.user_id,
+                VerificationData.field_name,
+                VerificationData.field_value,
+            )
+            .filter(VerificationData.user_id.in_(chunk), *current_confident())
+            .yield_per(chunk_size)
+        )
+        for user_id, field, value in rows:
+            col = raw.setdefault(field, [None] * len(chunk))
+            i = position[user_id]
+            if col[i] is None:
+                col[i] = set()
+            col[i].add(value.strip().lower())
+
+        columns = {field: tuple(map(intern, col)) for field, col in raw.items()}
+        yield SnapshotColumns(tuple(chunk), columns)
+
+
+def _wide_value(field: str, value: str):
+    value = value.strip().lower()
+    if field != FIELD_BIRTH_DATE:
+        return value
+    try:
+        return date.fromisoformat(value) if len(value) == 10 else None
+    except ValueError:
+        return None
+
+
+def sync_user_attributes(db: Session, user_ids: Iterable[int]) -> None:
+    """Rebuild these users' user_attributes rows from current verification_data.
+
+    Each field keeps its newest confident current row, else its newest
+    current row; users with several current rows in a field, or a non-ISO
+    birth_date, are flagged irregular (see UserAttributes).
+
+    Runs automatically after every flush that touches VerificationData
+    instances; writers that supersede rows with a Core UPDATE alone (no new
+    row for the user in the same flush) must call it themselves.
+    """
+    ids = sorted(set(user_ids))
+    conn = db.connection()
+    table = UserAttributes.__table__
+    for start in range(0, len(ids), SNAPSHOT_CHUNK):
+        chunk = ids[start : start + SNAPSHOT_CHUNK]
+        rows = conn.execute(
+            select(
+                VerificationData.user_id,
+                VerificationData.field_name,
+                VerificationData.field_value,
+                VerificationData.confidence_score,
+            )
+            .where(
+                VerificationData.user_id.in_(chunk),
+                VerificationData.is_current.is_(True),
+                VerificationData.field_name.in_(list(WIDE_COLUMNS)),
+            )
+            .order_by(VerificationData.id)
+        )
+        wide: dict[int, dict] = {}
+        stored: dict[int, dict[str, bool]] = {}  # user -> field -> stored row is confident
+        for user_id, field, value, confidence in rows:  # ascending id: newest wins
+            column, confidence_column = WIDE_COLUMNS[field]
+            row = wide.setdefault(user_id, {"user_id": user_id, "irregular": False})
+            fields = stored.setdefault(user_id, {})
+            wide_value = _wide_value(field, value)
+            if field in fields or wide_value is None:
+                row["irregular"] = True
+            confident = confidence is None or confidence >= settings.MATCH_CONFIDENCE_MIN
+            if fields.get(field) and not confident:
+                continue  # never hide a confident value behind an unconfident one
+            fields[field] = confident
+            row[column] = wide_value
+            row[confidence_column] = confidence if wide_value is not None else None
+        conn.execute(delete(table).where(table.c.user_id.in_(chunk)))
+        if wide:
+            # one executemany needs every row to carry the same keys
+            blank = {c: None for pair in WIDE_COLUMNS.values() for c in pair}
+            conn.execute(insert(table), [blank | row for row in wide.values()])
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_flushed(session: Session, _flush_context) -> None:
+    user_ids = {
+        obj.user_id
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if isinstance(obj, VerificationData)
+    }
+    if user_ids:
+        sync_user_attributes(session, user_ids)
+
+
 def grant_verified_attributes(
     db: Session, user: User, attrs: dict[str, str], confidence: float = 1.0
 ) -> None:
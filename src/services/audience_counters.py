@@ -0,0 +1,200 @@
+# filepath: src/services/audience_counters.py
+
+"""Incremental audience counters for the launch-wizard preview (matching C6).
+
+Users are counted in cells keyed by (gender, country) — None where the user
+has no confident value — and, inside a cell, by birth year, each year
+holding the sorted birth dates. A preview built from gender, age range and
+plain countries/regions is then a sum over the matching cells, with a
+bisect only at the two edge years: no per-user work, still exact.
+
+Cities aren't tracked: filters naming cities or city exceptions are not
+supported here and callers fall back (supports()). Users the cells can't
+represent exactly (several current values for a field, a birth_date that
+isn't an ISO date) are kept aside with their snapshot and checked with
+unmet_requirements on every count — the attribute contract makes them rare.
+
+Kept fresh from db.events like services/attribute_index.py: a committed
+VerificationData write marks its user stale, the next count re-reads only
+those users; changing MATCH_CONFIDENCE_MIN rebuilds.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date
+from typing import TYPE_CHECKING
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import events
+from db.models import VerificationData
+from services.attributes import (
+    FIELD_BIRTH_DATE,
+    FIELD_COUNTRY,
+    FIELD_GENDER,
+    current_confident,
+    load_snapshots,
+)
+
+if TYPE_CHECKING:
+    from services.matching import ParsedFilters
+
+_REFRESH_CHUNK = 500
+
+# (gender, country, birth ordinal) — None for a missing value
+_Key = tuple[str | None, str | None, int | None]
+
+
+def _ordinal(value: str) -> int | None:
+    try:
+        return date.fromisoformat(value).toordinal() if len(value) == 10 else None
+    except ValueError:
+        return None
+
+
+def _single(snapshot: dict, field_name: str) -> tuple[bool, str | None]:
+    values = snapshot.get(field_name) or ()
+    if len(values) > 1:
+        return False, None
+    return True, next(iter(values), None)
+
+
+def _cell_key(snapshot: dict) -> _Key | None:
+    """The user's cell, or None when the cells can't represent them."""
+    ok_gender, gender = _single(snapshot, FIELD_GENDER)
+    ok_country, country = _single(snapshot, FIELD_COUNTRY)
+    ok_birth, birth = _single(snapshot, FIELD_BIRTH_DATE)
+    if not (ok_gender and ok_country and ok_birth):
+        return None
+    ordinal = _ordinal(birth) if birth is not None else None
+    if birth is not None and ordinal is None:
+        return None
+    return gender, country, ordinal
+
+
+@dataclass
+class _Cell:
+    total: int = 0
+    years: dict[int, list[int]] = field(default_factory=dict)  # year -> sorted ordinals
+
+    def add(self, ordinal: int | None) -> None:
+        self.total += 1
+        if ordinal is not None:
+            births = self.years.setdefault(date.fromordinal(ordinal).year, [])
+            births.insert(bisect_right(births, ordinal), ordinal)
+
+    def remove(self, ordinal: int | None) -> None:
+        self.total -= 1
+        if ordinal is not None:
+            year = date.fromordinal(ordinal).year
+            births = self.years[year]
+            del births[bisect_left(births, ordinal)]
+            if not births:
+                del self.years[year]
+
+    def born_between(self, lo: date, hi: date) -> int:
+        n = 0
+        for year, births in self.years.items():
+            if lo.year < year < hi.year:
+                n += len(births)
+            elif lo.year <= year <= hi.year:
+                n += bisect_right(births, hi.toordinal()) - bisect_left(births, lo.toordinal())
+        return n
+
+
+class AudienceCounters:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._confidence_min: float | None = None  # threshold of the current build
+        self._dirty: set[int] = set()
+        self._cells: dict[tuple[str | None, str | None], _Cell] = {}
+        self._user_keys: dict[int, _Key] = {}
+        self._irregular: dict[int, dict] = {}  # user id -> snapshot
+
+    # --- maintenance -----------------------------------------------------
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def mark_stale(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._dirty.update(user_ids)
+
+    def _forget(self, user_id: int) -> None:
+        self._irregular.pop(user_id, None)
+        key = self._user_keys.pop(user_id, None)
+        if key is not None:
+            cell = self._cells[key[:2]]
+            cell.remove(key[2])
+            if not cell.total:
+                del self._cells[key[:2]]
+
+    def _place(self, user_id: int, snapshot: dict) -> None:
+        if not snapshot:
+            return
+        key = _cell_key(snapshot)
+        if key is None:
+            self._irregular[user_id] = snapshot
+            return
+        self._user_keys[user_id] = key
+        self._cells.setdefault(key[:2], _Cell()).add(key[2])
+
+    def _load(self, db: Session, user_ids: Iterable[int]) -> None:
+        for chunk in load_snapshots(db, user_ids, _REFRESH_CHUNK):
+            for user_id, snapshot in chunk:
+                self._forget(user_id)
+                self._place(user_id, snapshot)
+
+    def _ensure_current(self, db: Session) -> None:
+        if self._confidence_min != settings.MATCH_CONFIDENCE_MIN:
+            self._clear()
+            ids = db.query(VerificationData.user_id).filter(*current_confident()).distinct()
+            self._load(db, (user_id for (user_id,) in ids))
+            self._confidence_min = settings.MATCH_CONFIDENCE_MIN
+        elif self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            self._load(db, dirty)
+
+    # --- counting ----------------------------------------------------------
+
+    @staticmethod
+    def supports(pf: "ParsedFilters") -> bool:
+        """Constrained filters over gender, age and countries without exceptions."""
+        return not (pf.is_unconstrained or pf.cities or pf.excepted_countries)
+
+    def count(self, db: Session, pf: "ParsedFilters") -> int:
+        """Users passing pf; only for filters supports() accepts."""
+        from services.matching import unmet_requirements
+
+        lo = date.fromisoformat(pf.birth_earliest) if pf.birth_earliest else date.min
+        hi = date.fromisoformat(pf.birth_latest) if pf.birth_latest else date.max
+        aged = bool(pf.birth_earliest or pf.birth_latest)
+        countries = pf.free_countries if pf.has_location else None
+        with self._lock:
+            self._ensure_current(db)
+            n = 0
+            for (gender, country), cell in self._cells.items():
+                if pf.gender and gender != pf.gender:
+                    continue
+                if countries is not None and country not in countries:
+                    continue
+                n += cell.born_between(lo, hi) if aged else cell.total
+            n += sum(not unmet_requirements(pf, s) for s in self._irregular.values())
+            return n
+
+
+_counters = AudienceCounters()
+
+
+def get_counters() -> AudienceCounters:
+    return _counters
+
+
+events.subscribe(VerificationData, _counters.mark_stale, key=lambda row: row.user_id)
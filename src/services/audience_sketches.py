@@ -0,0 +1,225 @@
+# filepath: src/services/audience_sketches.py
+
+"""Approximate audience counts from theta sketches (matching C6).
+
+One theta (k-minimum-values) sketch per attribute value — gender, country,
+city, and birth_date by year / month / day bucket as in
+services/attribute_index.py. A sketch keeps the k smallest 64-bit hashes of
+its user ids below a threshold theta and estimates |set| as
+retained / (theta / 2^64). Sketches combine by union, intersection and
+difference (A not B), so a filter is evaluated like the bitmap index but
+over O(k) sketches instead of O(#users) bits: cost is independent of
+audience size.
+
+Error bounds (k = AUDIENCE_SKETCH_K): a sketch with fewer than k users is
+exact. Above that, a single value or a union has relative standard error
+about 1/sqrt(k) (k=4096: ~1.6%, ~3.1% at 95%). An intersection or
+difference is estimated from the retained sample of the union, so its
+standard error is about 1/sqrt(k * J) relative to its own size, J being its
+share of the union — small slices of big sets are noisier. Previews fall
+back to an exact count below AUDIENCE_SKETCH_MIN_COUNT for that reason.
+
+Sketches can't delete, so they are rebuilt instead of patched: a committed
+VerificationData write marks them stale, and a stale build older than
+AUDIENCE_SKETCH_MAX_AGE_SECONDS is rebuilt on the next estimate. Between
+rebuilds estimates may lag recent attribute changes — fine for a preview.
+"""
+
+import heapq
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import events
+from db.models import VerificationData
+from services.attribute_index import date_range_buckets, parse_iso_date
+from services.attributes import (
+    FIELD_BIRTH_DATE,
+    FIELD_CITY,
+    FIELD_COUNTRY,
+    FIELD_GENDER,
+    current_confident,
+)
+
+if TYPE_CHECKING:
+    from services.matching import ParsedFilters
+
+_MASK = (1 << 64) - 1
+_FULL = 1 << 64  # theta of an exact sketch: every hash is below it
+
+
+def hash_id(user_id: int) -> int:
+    """splitmix64 finalizer: sequential ids -> uniformly spread 64-bit hashes."""
+    z = (user_id + 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+@dataclass(frozen=True)
+class ThetaSketch:
+    theta: int  # every retained hash is < theta; _FULL = exact
+    hashes: frozenset[int]
+
+    @classmethod
+    def of(cls, hashes: Iterable[int], k: int) -> "ThetaSketch":
+        smallest = heapq.nsmallest(k + 1, set(hashes))
+        if len(smallest) <= k:
+            return cls(_FULL, frozenset(smallest))
+        return cls(smallest[k], frozenset(smallest[:k]))
+
+    @property
+    def exact(self) -> bool:
+        return self.theta == _FULL
+
+    def estimate(self) -> float:
+        return len(self.hashes) * _FULL / self.theta
+
+    def union(self, *others: "ThetaSketch", k: int) -> "ThetaSketch":
+        theta = min(s.theta for s in (self, *others))
+        pool = sorted({h for s in (self, *others) for h in s.hashes if h < theta})
+        if len(pool) > k:
+            theta, pool = pool[k], pool[:k]
+        return ThetaSketch(theta, frozenset(pool))
+
+    def intersect(self, other: "ThetaSketch") -> "ThetaSketch":
+        theta = min(self.theta, other.theta)
+        return ThetaSketch(theta, frozenset(h for h in self.hashes & other.hashes if h < theta))
+
+    def minus(self, other: "ThetaSketch") -> "ThetaSketch":
+        theta = min(self.theta, other.theta)
+        return ThetaSketch(theta, frozenset(h for h in self.hashes - other.hashes if h < theta))
+
+
+EMPTY = ThetaSketch(_FULL, frozenset())
+
+
+class AudienceSketches:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._built_at: float | None = None  # time.monotonic() of the current build
+        self._confidence_min: float | None = None
+        self._stale = False
+        self._k = settings.AUDIENCE_SKETCH_K
+        # (field, value) for plain fields, ("y"|"m"|"d", key) for ISO births
+        self._sketches: dict[tuple, ThetaSketch] = {}
+        self._odd_births: dict[str, ThetaSketch] = {}  # values that aren't ISO dates
+        self._years: tuple[int, int] | None = None  # min/max ISO birth year seen
+
+    # --- maintenance -----------------------------------------------------
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def mark_stale(self, _user_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._stale = True
+
+    def _build(self, db: Session) -> None:
+        self._clear()
+        members: dict[tuple, list[int]] = defaultdict(list)
+        odd: dict[str, list[int]] = defaultdict(list)
+        rows = db.query(
+            VerificationData.user_id, VerificationData.field_name, VerificationData.field_value
+        ).filter(*current_confident())
+        years: set[int] = set()
+        for user_id, field, value in rows.yield_per(5000):
+            h = hash_id(user_id)
+            value = value.strip().lower()
+            if field != FIELD_BIRTH_DATE:
+                members[(field, value)].append(h)
+            elif (d := parse_iso_date(value)) is None:
+                odd[value].append(h)
+            else:
+                years.add(d.year)
+                for bucket in (("y", d.year), ("m", (d.year, d.month)), ("d", d)):
+                    members[bucket].append(h)
+        self._sketches = {key: ThetaSketch.of(hs, self._k) for key, hs in members.items()}
+        self._odd_births = {value: ThetaSketch.of(hs, self._k) for value, hs in odd.items()}
+        self._years = (min(years), max(years)) if years else None
+        self._confidence_min = settings.MATCH_CONFIDENCE_MIN
+        self._built_at = time.monotonic()
+
+    def _ensure_current(self, db: Session) -> None:
+        if (
+            self._built_at is None
+            or self._confidence_min != settings.MATCH_CONFIDENCE_MIN
+            or self._k != settings.AUDIENCE_SKETCH_K
+            or (
+                self._stale
+                and time.monotonic() - self._built_at >= settings.AUDIENCE_SKETCH_MAX_AGE_SECONDS
+            )
+        ):
+            self._build(db)
+
+    # --- estimation --------------------------------------------------------
+
+    def _get(self, key: tuple) -> ThetaSketch:
+        return self._sketches.get(key, EMPTY)
+
+    def _union(self, sketches: list[ThetaSketch]) -> ThetaSketch:
+        return sketches[0].union(*sketches[1:], k=self._k) if sketches else EMPTY
+
+    def _births_between(self, earliest: str | None, latest: str | None) -> ThetaSketch:
+        parts = [
+            sketch
+            for value, sketch in self._odd_births.items()
+            if (earliest is None or value >= earliest) and (latest is None or value <= latest)
+        ]
+        if self._years is not None:
+            lo = parse_iso_date(earliest) if earliest else None
+            hi = parse_iso_date(latest) if latest else None
+            lo = max(lo or date.min, date(self._years[0], 1, 1))
+            hi = min(hi or date.max, date(self._years[1], 12, 31))
+            parts += [self._get(bucket) for bucket in date_range_buckets(lo, hi)]
+        return self._union(parts)
+
+    def _evaluate(self, pf: "ParsedFilters") -> ThetaSketch:
+        result: ThetaSketch | None = None
+
+        def narrow(sketch: ThetaSketch) -> None:
+            nonlocal result
+            result = sketch if result is None else result.intersect(sketch)
+
+        if pf.gender:
+            narrow(self._get((FIELD_GENDER, pf.gender)))
+        if pf.birth_latest or pf.birth_earliest:
+            narrow(self._births_between(pf.birth_earliest, pf.birth_latest))
+        if pf.has_location:
+            parts = [self._get((FIELD_CITY, city)) for city in pf.cities]
+            for country, excluded_cities in pf.countries:
+                in_country = self._get((FIELD_COUNTRY, country))
+                if excluded_cities:
+                    excluded = [self._get((FIELD_CITY, c)) for c in excluded_cities]
+                    in_country = in_country.minus(self._union(excluded))
+                parts.append(in_country)
+            narrow(self._union(parts))
+        return result or EMPTY
+
+    def estimate(self, db: Session, pf: "ParsedFilters") -> int:
+        """Estimated users passing a constrained pf."""
+        with self._lock:
+            self._ensure_current(db)
+            sketch = self._evaluate(pf)
+        return round(sketch.estimate())
+
+
+_sketches = AudienceSketches()
+
+
+def get_sketches() -> AudienceSketches:
+    return _sketches
+
+
+events.subscribe(VerificationData, _sketches.mark_stale, key=lambda row: row.user_id)
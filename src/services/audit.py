@@ -1,9 +1,39 @@
 # filepath: src/services/audit.py
 
+"""Audit log writer.
+
+AUDIT_SINK="session" (default) adds the AuditEvent to the request session,
+committed with the request transaction. "buffered" takes the insert off the
+request path: record() parks the row on the session, and only once that
+transaction commits is it handed to AuditWriter's in-memory buffer (a
+rollback discards it, as before). The writer inserts the buffer in batches
+of AUDIT_BATCH_SIZE — when a batch is full, or every AUDIT_FLUSH_SECONDS —
+from an asyncio task in the app lifespan, and flushes what is left when the
+app shuts down.
+
+The trade-off is durability: a process killed hard loses at most one flush
+interval of audit rows. flush() is synchronous, for tests and scripts.
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+from collections import deque
+from collections.abc import Callable
+
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
 
+from config import settings
+from db.base import utcnow
+from db.engine import SessionLocal
 from db.models import AuditEvent
 
+logger = logging.getLogger(__name__)
+
+_PENDING = "audit_events"
+
 
 def record(
     db: Session,
@@ -14,14 +44,134 @@ def record(
     payload: dict | None = None,
     request_id: str | None = None,
 ) -> None:
-    """Append one audit event. Committed with the surrounding request transaction."""
-    db.add(
-        AuditEvent(
-            event_type=event_type,
-            actor_id=actor_id,
-            target_type=target_type,
-            target_id=target_id,
-            payload=payload,
-            request_id=request_id,
-        )
-    )
+    """Append one audit event; it is written only if the surrounding transaction commits."""
+    row = {
+        "event_type": event_type,
+        "actor_id": actor_id,
+        "target_type": target_type,
+        "target_id": target_id,
+        "payload": payload,
+        "request_id": request_id,
+    }
+    if settings.AUDIT_SINK == "buffered":
+        row["created_at"] = utcnow()
+        db.info.setdefault(_PENDING, []).append(row)
+    else:
+        db.add(AuditEvent(**row))
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_over(session: Session) -> None:
+    rows = session.info.pop(_PENDING, None)
+    if rows:
+        _writer.add(rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+class AuditWriter:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._flushing = threading.Lock()  # one flush at a time keeps row order
+        self._buffer: deque[dict] = deque()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.written = self.dropped = 0
+
+    def add(self, rows: list[dict]) -> None:
+        with self._lock:
+            self._buffer.extend(rows)
+            overflow = len(self._buffer) - settings.AUDIT_BUFFER_MAX
+            for _ in range(max(overflow, 0)):  # the database is down for a while
+                self._buffer.popleft()
+            self.dropped += max(overflow, 0)
+            full = len(self._buffer) >= settings.AUDIT_BATCH_SIZE
+        if overflow > 0:
+            logger.warning("Audit buffer full: dropped %d oldest events", overflow)
+        if full:
+            self.wake()
+
+    def flush(self) -> int:
+        """Insert everything buffered now; returns the number of rows written."""
+        written = 0
+        with self._flushing:
+            while True:
+                with self._lock:
+                    n = min(len(self._buffer), settings.AUDIT_BATCH_SIZE)
+                    batch = [self._buffer.popleft() for _ in range(n)]
+                if not batch:
+                    return written
+                try:
+                    with self._session_factory() as db, db.begin():
+                        db.execute(insert(AuditEvent), batch)
+                except Exception:
+                    with self._lock:  # keep them for the next round
+                        self._buffer.extendleft(reversed(batch))
+                    raise
+                written += len(batch)
+                with self._lock:
+                    self.written += len(batch)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buffer.clear()
+            self.written = self.dropped = 0
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception:  # rows stay buffered and are retried next round
+                logger.exception("Audit flush failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.AUDIT_FLUSH_SECONDS)
+            except TimeoutError:
+                pass
+
+    def wake(self) -> None:
+        """A batch is ready. Safe from any thread."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._loop = self._wakeup = None
+        await asyncio.to_thread(self.flush)  # nothing buffered is lost on shutdown
+
+
+_writer = AuditWriter()
+
+
+def get_writer() -> AuditWriter:
+    return _writer
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    # processes without the app lifespan (scripts, the bot) still write their rows
+    if _writer.pending():
+        try:
+            _writer.flush()
+        except Exception:
+            logger.exception("Audit flush at exit failed")
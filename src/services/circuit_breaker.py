@@ -0,0 +1,125 @@
+# filepath: src/services/circuit_breaker.py
+
+"""Circuit breaker for calls to a flaky dependency (the clarifier LLM).
+
+closed     calls pass; outcomes land in a rolling window of window seconds.
+           Once it holds at least min_calls outcomes and the failure rate
+           (errors plus calls slower than slow_call seconds) reaches
+           failure_rate, the breaker opens.
+open       calls are refused at once for open_seconds.
+half_open  one probe call at a time is let through: success closes the
+           breaker with a fresh window, failure opens it again.
+
+allow() hands out a Ticket naming the breaker generation (bumped on every
+open and close) and whether the call is the probe; record() takes it back.
+Outcomes of calls let through before the last transition are counted in
+stats but never move the state — a slow call admitted while closed must
+not settle a later half-open probe.
+
+Thread-safe; the clock is injectable for tests. Knobs are read on every
+call, so settings changes apply without a restart.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+@dataclass(frozen=True)
+class Ticket:
+    generation: int
+    probe: bool = False
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    window: float  # seconds of outcomes considered
+    min_calls: int  # outcomes needed in the window before it can open
+    failure_rate: float  # 0..1
+    slow_call: float  # seconds; slower successes count as failures
+    open_seconds: float  # refusal period before a half-open probe
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        config: Callable[[], BreakerConfig],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._config, self._clock = config, clock
+        self._lock = threading.Lock()
+        self._outcomes: deque[tuple[float, bool]] = deque()  # (when, failed)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._generation = 0
+        self.stats: Counter[str] = Counter()  # calls | failures | slow | opened | refused
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._config().open_seconds:
+            self._state, self._probing = HALF_OPEN, False
+        return self._state
+
+    def allow(self) -> Ticket | None:
+        """May a call go out now? None if not; a ticket in half-open
+        reserves the probe. Pass the ticket to record()."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED or (state == HALF_OPEN and not self._probing):
+                self._probing = state == HALF_OPEN
+                self.stats["calls"] += 1
+                return Ticket(self._generation, probe=self._probing)
+            self.stats["refused"] += 1
+            return None
+
+    def record(self, ticket: Ticket, ok: bool, seconds: float) -> None:
+        """Outcome of a call that allow() let through with ticket."""
+        cfg = self._config()
+        slow = ok and seconds >= cfg.slow_call
+        failed = not ok or slow
+        with self._lock:
+            now = self._clock()
+            self.stats["failures"] += not ok
+            self.stats["slow"] += slow
+            if ticket.generation != self._generation:
+                return  # let through before the last open / close
+            if ticket.probe:
+                self._probing = False
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._generation += 1
+                    self._outcomes.clear()
+                return
+            if self._state != CLOSED:
+                return
+            self._outcomes.append((now, failed))
+            while self._outcomes and self._outcomes[0][0] <= now - cfg.window:
+                self._outcomes.popleft()
+            n = len(self._outcomes)
+            if n >= cfg.min_calls:
+                if sum(f for _t, f in self._outcomes) / n >= cfg.failure_rate:
+                    self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._state, self._opened_at = OPEN, now
+        self._generation += 1
+        self._outcomes.clear()
+        self.stats["opened"] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._outcomes.clear()
+            self._state, self._probing = CLOSED, False
+            self._generation += 1
+            self.stats.clear()
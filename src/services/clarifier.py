@@ -5,7 +5,7 @@
 One submission revision -> one recorded ClarifierRun:
 
     rate cap -> content hash (cached?) -> code executors -> single backend
-    pass -> merge (code authoritative) -> suppression -> ToS routing ->
+    pass (or its shared cache entry) -> merge (code authoritative) -> suppression -> ToS routing ->
     archetype -> persist run + detection records + draft status.
 
 Field-backed data (budget, slots, pay, deadlines) is NEVER re-asked — the
@@ -16,17 +16,13 @@ runner-set "not-evaluated" and never render (catalog §2.5).
 
 import hashlib
 import json
-from datetime import timedelta
 
-from fastapi import HTTPException
-from fastapi import status as http_status
 from sqlalchemy.orm import Session
 
 from config import settings
-from db.base import utcnow
 from db.models import ClarifierRun, DetectionRecord, DraftStatus, TaskDraft
 from schemas.clarifier import EntryResult, LLMOutput, NormalizedSlots, RunResult
-from services import audit
+from services import audit, clarifier_cache, rate_limiter
 from services import clarifier_registry as registry
 from services.clarifier_backend import ClarifierBackendError, get_backend
 
@@ -62,19 +58,13 @@ def submission_hash(payload: dict) -> str:
 
 
 def enforce_rate_cap(db: Session, owner_id: int) -> None:
-    """Token-abuse guard (BOM §0): runs per user per hour, 429 beyond."""
-    cutoff = utcnow() - timedelta(hours=1)
-    n = (
-        db.query(ClarifierRun)
-        .join(TaskDraft, ClarifierRun.draft_id == TaskDraft.id)
-        .filter(TaskDraft.owner_id == owner_id, ClarifierRun.created_at >= cutoff)
-        .count()
-    )
-    if n >= settings.CLARIFIER_RUNS_PER_USER_PER_HOUR:
-        raise HTTPException(
-            http_status.HTTP_429_TOO_MANY_REQUESTS,
-            "Clarifier rate cap reached — try again in a bit.",
-        )
+    """Token-abuse guard (BOM §0): runs per user per hour, 429 beyond.
+    Takes a slot; release_rate_cap gives it back when no run is recorded."""
+    rate_limiter.get_limiter().acquire(db, owner_id)
+
+
+def release_rate_cap(owner_id: int) -> None:
+    rate_limiter.get_limiter().release(owner_id)
 
 
 def _code_executor_results(desc: str) -> dict[str, EntryResult]:
@@ -221,35 +211,64 @@ _STATUS_BY_ARCHETYPE = {
 def run_clarifier(
     db: Session, draft: TaskDraft, *, request_id: str | None = None
 ) -> ClarifierRun:
-    """The single pass (BOM §4). Returns the cached run on identical content."""
+    """The single pass (BOM §4). Returns the cached run on identical content.
+
+    Synchronous — the backend call runs on the caller's thread. Request paths
+    use services/clarifier_runner.submit, which runs it on a bounded pool."""
     enforce_rate_cap(db, draft.owner_id)
 
     payload = draft.payload or {}
     desc = payload.get("desc", "")
     h = submission_hash(payload)
 
-    cached = (
-        db.query(ClarifierRun)
-        .filter(ClarifierRun.draft_id == draft.id, ClarifierRun.submission_hash == h)
-        .first()
-    )
+    cached = cached_run(db, draft, h)
     if cached is not None:
+        release_rate_cap(draft.owner_id)
         return cached
 
     backend = get_backend()
     llm_out: LLMOutput | None = None
-    degraded = False
+    degraded = cache_hit = False
     if backend is not None:
+        llm_out = clarifier_cache.lookup(db, h)
+        cache_hit = llm_out is not None
+    if backend is not None and not cache_hit:
         try:
             llm_out = backend.run(desc, payload)
+            clarifier_cache.store(db, h, llm_out)
         except ClarifierBackendError as e:
             degraded = True
-            audit.record(
-                db, "clarifier.skipped",
-                actor_id=draft.owner_id, target_type="task_draft", target_id=draft.id,
-                payload={"reason": str(e)[:200]}, request_id=request_id,
-            )
+            record_skipped(db, draft, str(e), request_id)
+
+    return record_run(db, draft, h, llm_out, degraded=degraded, cache_hit=cache_hit)
+
 
+def cached_run(db: Session, draft: TaskDraft, h: str) -> ClarifierRun | None:
+    return (
+        db.query(ClarifierRun)
+        .filter(ClarifierRun.draft_id == draft.id, ClarifierRun.submission_hash == h)
+        .first()
+    )
+
+
+def record_skipped(
+    db: Session, draft: TaskDraft, reason: str, request_id: str | None = None
+) -> None:
+    """Audit a backend failure that degraded the run to code-only."""
+    audit.record(
+        db, "clarifier.skipped",
+        actor_id=draft.owner_id, target_type="task_draft", target_id=draft.id,
+        payload={"reason": reason[:200]}, request_id=request_id,
+    )
+
+
+def record_run(
+    db: Session, draft: TaskDraft, h: str, llm_out: LLMOutput | None, *,
+    degraded: bool = False, cache_hit: bool = False,
+) -> ClarifierRun:
+    """Merge the backend judgments with the code executors, route, and
+    persist run + detection records + draft status."""
+    desc = (draft.payload or {}).get("desc", "")
     merged = _merge_results(llm_out, _code_executor_results(desc), degraded)
     _apply_suppression(merged)
     tos_category = llm_out.tos_category if llm_out else None
@@ -265,6 +284,7 @@ def run_clarifier(
         llm_output=llm_out.model_dump() if llm_out else None,
         normalized_slots=llm_out.slots.model_dump() if llm_out else None,
         tos_category=tos_category,
+        cache_hit=cache_hit,
     )
     db.add(run)
     db.flush()
@@ -305,6 +325,7 @@ def run_result(run: ClarifierRun) -> RunResult:
         slots=NormalizedSlots.model_validate(run.normalized_slots or {}),
         restatement=llm.restatement if llm else None,
         tos_category=run.tos_category,
+        cache_hit=bool(run.cache_hit),
         worst_severity=worst,  # type: ignore[arg-type]
         archetype=archetype,  # type: ignore[arg-type]
     )
@@ -19,14 +19,23 @@ context, returns judgments; it cannot reach the world).
 Failure contract: backends retry ONCE internally, then raise
 ClarifierBackendError; the engine converts that to a degraded (code-only)
 run with a visible notice + audit event (BOM §0 failure posture).
+
+get_backend() wraps the backend in GuardedBackend: a circuit breaker
+(services/circuit_breaker.py) and a global in-flight cap. During a vendor
+outage, or with CLARIFIER_MAX_IN_FLIGHT calls already out, a run is shed —
+ClarifierBackendError at once, so it degrades to code-only in milliseconds
+instead of queuing behind two timed-out attempts.
 """
 
 import re
+import threading
 import time
+from collections.abc import Iterable
 
 from config import settings
 from schemas.clarifier import EntryResult, LLMOutput, NormalizedSlots
 from services import clarifier_registry as registry
+from services.circuit_breaker import BreakerConfig, CircuitBreaker
 
 
 class ClarifierBackendError(Exception):
@@ -34,14 +43,85 @@ class ClarifierBackendError(Exception):
 
 
 def get_backend():
-    """Settings -> backend instance, or None when the clarifier is off."""
+    """Settings -> guarded backend instance, or None when the clarifier is off."""
     if settings.CLARIFIER_BACKEND == "mock":
-        return MockClarifierBackend()
+        return GuardedBackend(MockClarifierBackend())
     if settings.CLARIFIER_BACKEND == "real":
-        return RealClarifierBackend()
+        return GuardedBackend(RealClarifierBackend())
     return None  # "off"
 
 
+# --- breaker + in-flight cap (shared by every backend instance) ---------------
+
+
+def _breaker_config() -> BreakerConfig:
+    return BreakerConfig(
+        window=settings.CLARIFIER_BREAKER_WINDOW_SECONDS,
+        min_calls=settings.CLARIFIER_BREAKER_MIN_CALLS,
+        failure_rate=settings.CLARIFIER_BREAKER_FAILURE_RATE,
+        slow_call=settings.CLARIFIER_BREAKER_SLOW_CALL_SECONDS,
+        open_seconds=settings.CLARIFIER_BREAKER_OPEN_SECONDS,
+    )
+
+
+_breaker = CircuitBreaker(_breaker_config)
+_in_flight_lock = threading.Lock()
+_in_flight = 0
+_shed_busy = 0
+
+
+class GuardedBackend:
+    """Sheds calls while the breaker is open or the in-flight cap is reached;
+    records every call's outcome and latency into the breaker."""
+
+    def __init__(self, inner) -> None:
+        self.inner = inner
+
+    def run(self, desc: str, wizard_context: dict | None = None) -> LLMOutput:
+        global _in_flight, _shed_busy
+        with _in_flight_lock:
+            if _in_flight >= settings.CLARIFIER_MAX_IN_FLIGHT:
+                _shed_busy += 1
+                raise ClarifierBackendError("backend saturated (in-flight cap)")
+            ticket = _breaker.allow()
+            if ticket is None:
+                raise ClarifierBackendError("backend circuit open")
+            _in_flight += 1
+        t0, ok = time.monotonic(), False
+        try:
+            out = self.inner.run(desc, wizard_context)
+            ok = True
+            return out
+        finally:
+            _breaker.record(ticket, ok, time.monotonic() - t0)
+            with _in_flight_lock:
+                _in_flight -= 1
+
+
+def backend_stats() -> dict:
+    """Breaker state and counters (served at /health/clarifier)."""
+    with _in_flight_lock:
+        in_flight, shed_busy = _in_flight, _shed_busy
+    stats = _breaker.stats
+    return {
+        "state": _breaker.state,
+        "in_flight": in_flight,
+        "calls": stats["calls"],
+        "failures": stats["failures"],
+        "slow_calls": stats["slow"],
+        "opened": stats["opened"],
+        "shed_open": stats["refused"],
+        "shed_busy": shed_busy,
+    }
+
+
+def reset_guard() -> None:
+    global _shed_busy
+    _breaker.reset()
+    with _in_flight_lock:
+        _shed_busy = 0
+
+
 # --- prompt builder (CONTRACT only — BOM §3) -------------------------------
 # A registry-rendered skeleton kept as the prompt-builder CONTRACT. The
 # PRODUCTION prompt text now lives explicitly in services/prompts/
@@ -87,6 +167,79 @@ _REVIEW_SURFACES = ("google maps", "app store", "play store", "yelp", "trustpilo
                     "amazon", "tripadvisor")
 _STEERING = ("ignore your rules", "ignore the rules", "skip all checks",
              "mark this approved", "approve this task", "you are now")
+_OFF_SCREEN = ("hand out flyers", "in person", "downtown", "door to door")
+_CREDENTIALS = ("log into my", "my login", "my password", "use my account")
+_OWN_SURFACE = ("my site", "my website", "my landing page")
+_REVIEW_WORDS = (" review", " rating", " stars")
+_FAKE_PURCHASE = ("claiming you bought", "say you bought", "pretend you bought")
+_POLITICAL = ("campaign", "election", "vote for", "political")
+_IMPOSSIBLE = ("famous", "go viral", "make me popular")
+_VAGUE_GOAL = ("boost", "help me grow")
+_LANGUAGES = (" german", " french", " spanish")
+_UNBOUNDED = ("every day", "daily", "each day", "as many as you can")
+_ONE_SESSION = ("one session", "one sitting")
+_PATH_EXACT = ("exactly", "pixel", "hover", "scroll slowly", "use chrome")
+_VERB_FAMILIES = ("like", "review", "comment", "follow", "subscribe", "watch", "write", "dm")
+# Verbs match at a word start (" like" also hits "likes"); the rest anywhere.
+_ACTION_KEYS = frozenset(f" {v}" for v in _ACTION_VERBS)
+_ENGAGEMENT_KEYS = frozenset(f" {v}" for v in _ENGAGEMENT_VERBS)
+_FAMILY_KEYS = {f" {v}": v for v in _VERB_FAMILIES}
+
+_DM_AT_SCALE = re.compile(r"\b(dm|message)\s+\d{2,}")
+_TARGET = re.compile(r"(https?://\S+|www\.\S+|@\w+|\S+\.com\S*)")
+_HEADCOUNT = re.compile(r"(\d+)\s*(people|persons|jumpers)")
+_DIGIT = re.compile(r"\d")
+_ACTION_SPLIT = re.compile(r"\band\b|,")
+
+
+class PhraseMatcher:
+    """Every vocabulary phrase occurring in a text, found in one regex pass.
+
+    The phrases compile (once) into a trie-shaped pattern inside a lookahead:
+    the scan visits each text position once and follows the trie only as far
+    as the text allows, so the cost grows with the text, not the vocabulary.
+    At each position the pattern yields the longest phrase; the phrases that
+    are prefixes of it occur there too and are added from a table.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = frozenset(phrases)
+        trie: dict = {}
+        for phrase in self.phrases:
+            node = trie
+            for ch in phrase:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self._pattern = re.compile(f"(?=({self._compile(trie)}))")
+        self._prefixes: dict[str, frozenset[str]] = {}
+        self._collect(trie, "", ())
+
+    @classmethod
+    def _compile(cls, node: dict) -> str:
+        alts = [re.escape(ch) + cls._compile(child) for ch, child in node.items() if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else f"(?:{'|'.join(alts)})"
+        return f"(?:{body})?" if "" in node else body
+
+    def _collect(self, node: dict, path: str, above: tuple[str, ...]) -> None:
+        if "" in node:
+            above = (*above, path)
+            self._prefixes[path] = frozenset(above)
+        for ch, child in node.items():
+            if ch:
+                self._collect(child, path + ch, above)
+
+    def hits(self, text: str) -> set[str]:
+        return set().union(*(self._prefixes[p] for p in set(self._pattern.findall(text))))
+
+
+_MATCHER = PhraseMatcher((
+    *_ACTION_KEYS, *_ENGAGEMENT_KEYS, *_FAMILY_KEYS, *_PLATFORM_WORDS, *_REVIEW_SURFACES,
+    *_STEERING, *_OFF_SCREEN, *_CREDENTIALS, *_OWN_SURFACE, *_REVIEW_WORDS, *_FAKE_PURCHASE,
+    *_POLITICAL, *_IMPOSSIBLE, *_VAGUE_GOAL, *_LANGUAGES, *_UNBOUNDED, *_ONE_SESSION,
+    *_PATH_EXACT, "strangers", " until ", "translate",
+))
 
 
 class MockClarifierBackend:
@@ -101,6 +254,11 @@ class MockClarifierBackend:
             time.sleep(settings.CLARIFIER_MOCK_LATENCY_MS / 1000)
         ctx = wizard_context or {}
         t = f" {desc.lower().strip()} "
+        hits = _MATCHER.hits(t)
+
+        def has(phrases: Iterable[str]) -> bool:
+            return not hits.isdisjoint(phrases)
+
         results: dict[str, EntryResult] = {
             e.code: EntryResult(code=e.code, result="clear", entry_version=e.version)
             for e in registry.entries_in_order()
@@ -115,74 +273,73 @@ class MockClarifierBackend:
             )
 
         # --- channel ---
-        steering = [s for s in _STEERING if s in t]
+        steering = [s for s in _STEERING if s in hits]
         if steering:
             fire("CJ-X1", evidence=f"steering content: {steering[0]!r}",
                  value={"escalate": len(desc) < 80})
-        has_verb = any(f" {v}" in t for v in _ACTION_VERBS)
-        if not has_verb:
+        if not has(_ACTION_KEYS):
             fire("CJ-X3", evidence="no recognizable work-intent")
 
         # --- kind ---
-        if any(w in t for w in ("hand out flyers", "in person", "downtown", "door to door")):
+        if has(_OFF_SCREEN):
             fire("CJ-K1", evidence="off-screen work")
-        if any(w in t for w in ("log into my", "my login", "my password", "use my account")):
+        if has(_CREDENTIALS):
             fire("CJ-K2", evidence="needs the Launcher's credentials",
                  value={"repair": "descope the credential step"})
 
         tos_category = "neutral"
-        own_surface = any(w in t for w in ("my site", "my website", "my landing page"))
-        is_review = any(w in t for w in (" review", " rating", " stars"))
-        if any(w in t for w in ("claiming you bought", "say you bought", "pretend you bought")):
+        own_surface = has(_OWN_SURFACE)
+        is_review = has(_REVIEW_WORDS)
+        if has(_FAKE_PURCHASE):
             fire("CJ-K3", evidence="deception: fake purchase claim")
             tos_category = "fraud_adjacent"
-        elif is_review and any(s in t for s in _REVIEW_SURFACES):
+        elif is_review and has(_REVIEW_SURFACES):
             fire("CJ-K3", evidence="incentivized public review (ToS matrix row 2)",
                  value={"repair": "private-feedback task: Jumpers send impressions to you"})
             tos_category = "public_review"
-        elif re.search(r"\b(dm|message)\s+\d{2,}", t) or "strangers" in t:
+        elif _DM_AT_SCALE.search(t) or "strangers" in hits:
             fire("CJ-K3", evidence="unsolicited contact at scale (ToS matrix row 3)")
             tos_category = "spam"
-        elif any(w in t for w in ("campaign", "election", "vote for", "political")):
+        elif has(_POLITICAL):
             fire("CJ-K3", result="uncertain",
                  evidence="political/coordinated engagement (ToS matrix row 4)")
             tos_category = "political"
-        if any(w in t for w in ("famous", "go viral", "make me popular")):
+        if has(_IMPOSSIBLE):
             fire("CJ-K4", evidence="no on-screen completion exists for this outcome")
 
         # --- instance ---
         slots = NormalizedSlots()
-        engagement = any(f" {v}" in t for v in _ENGAGEMENT_VERBS)
-        if "boost" in t or "help me grow" in t:
+        engagement = has(_ENGAGEMENT_KEYS)
+        platform = has(_PLATFORM_WORDS)
+        if has(_VAGUE_GOAL):
             fire("CJ-I1", evidence="goal stated as vague outcome",
                  value="more visible engagement on your page")
             slots.goal = "more visible engagement on your page"
-        target_match = re.search(r"(https?://\S+|www\.\S+|@\w+|\S+\.com\S*)", desc.lower())
+        target_match = _TARGET.search(desc.lower())
         if target_match:
             slots.target = target_match.group(1)
-        elif any(p in t for p in _PLATFORM_WORDS) or own_surface:
+        elif platform or own_surface:
             fire("CJ-I2", evidence="platform named but no exact target")
-        if engagement and not re.search(r"\d", desc):
+        if engagement and not _DIGIT.search(desc):
             fire("CJ-I3", evidence="actions not enumerated",
                  value=["like the 3 most recent photos"])
             slots.actions = ["like the 3 most recent photos"]
         elif engagement:
-            slots.actions = [w.strip() for w in re.split(r"\band\b|,", desc) if w.strip()][:3]
-        if " until " in t:
+            slots.actions = [w.strip() for w in _ACTION_SPLIT.split(desc) if w.strip()][:3]
+        if " until " in hits:
             slots.end_state = desc.lower().split(" until ", 1)[1].strip().rstrip(".")
         elif engagement or is_review:
             fire("CJ-I4", evidence="no on-screen end state named",
                  value=["all photos show a filled heart", "the follow button shows Following"])
-        if any(w in t for w in (" german", " french", " spanish")):
+        if has(_LANGUAGES):
             fire("CJ-I5", evidence="language skill beyond filters",
                  value={"filter": "language"})
-        if any(w in t for w in ("every day", "daily", "each day", "as many as you can")):
+        if has(_UNBOUNDED):
             fire("CJ-I6", evidence="not finishable in one session",
                  value="one sitting, ~10 min")
-        elif "one session" in t or "one sitting" in t:
+        elif has(_ONE_SESSION):
             slots.bound = "one session"
-        verb_families = {v for v in ("like", "review", "comment", "follow", "subscribe",
-                                     "watch", "write", "dm") if f" {v}" in t}
+        verb_families = {v for k, v in _FAMILY_KEYS.items() if k in hits}
         if {"like", "review"} <= verb_families or {"like", "write"} <= verb_families:
             fire("CJ-I7", evidence="two distinct per-Jumper jobs bundled",
                  value={"splits": ["like task", "review/write task"]})
@@ -192,27 +349,27 @@ class MockClarifierBackend:
                  value={"splits": ["follow task", "like task"], "keep_as_one": True})
 
         # --- composition ---
-        m = re.search(r"(\d+)\s*(people|persons|jumpers)", t)
+        m = _HEADCOUNT.search(t)
         if m and ctx.get("num_jumpers") and int(m.group(1)) != int(ctx["num_jumpers"]):
             fire("CJ-C1", evidence=f"desc says {m.group(1)}, fields say {ctx['num_jumpers']}")
-        if any(w in t for w in ("exactly", "pixel", "hover", "scroll slowly", "use chrome")):
+        if has(_PATH_EXACT):
             fire("CJ-C2", evidence="path-exact demands exceed the end-state")
-        if "translate" in t and ctx.get("you_earn") is not None and ctx["you_earn"] <= 0.5:
+        if "translate" in hits and ctx.get("you_earn") is not None and ctx["you_earn"] <= 0.5:
             fire("CJ-C3", evidence="~60 min of work for the offered pay",
                  value={"minutes": 60})
         filters = ctx.get("filters") or {}
-        if isinstance(filters, dict) and filters.get("location") and " german" in t:
+        if isinstance(filters, dict) and filters.get("location") and " german" in hits:
             fire("CJ-C4", evidence="audience filter vs task language mismatch")
 
         # --- tos category + CJ-C5 (the disclosure half) ---
         if tos_category == "neutral":
-            if engagement and (any(p in t for p in _PLATFORM_WORDS) or target_match):
+            if engagement and (platform or target_match):
                 tos_category = "engagement"
-            elif engagement or "boost" in t:
+            elif engagement or "boost" in hits:
                 tos_category = "unknown"
         if registry.tos_disposition(tos_category) == "warn":
             fire("CJ-C5", evidence=f"tos row: {tos_category}",
-                 value={"platform": next((p.strip() for p in _PLATFORM_WORDS if p in t),
+                 value={"platform": next((p.strip() for p in _PLATFORM_WORDS if p in hits),
                                          "the platform")})
 
         restatement = None
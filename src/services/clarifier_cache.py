@@ -0,0 +1,84 @@
+# filepath: src/services/clarifier_cache.py
+
+"""Content-addressed cache of clarifier backend outputs (db ClarifierCache).
+
+run_clarifier already reuses a run when the SAME draft resubmits the same
+text. This cache sits one level lower and is shared by every draft and
+user: key (submission_hash, CATALOG_VERSION, backend, model) -> LLMOutput.
+A hit skips the backend call entirely; the run is recorded as usual with
+cache_hit=True. Persisted, so it survives restarts and is shared across
+workers; a catalog bump or model change simply misses.
+"""
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.base import utcnow
+from db.models import ClarifierCache
+from schemas.clarifier import LLMOutput
+from services import clarifier_registry as registry
+
+
+def _key(submission_hash: str) -> dict:
+    backend = settings.CLARIFIER_BACKEND
+    return {
+        "submission_hash": submission_hash,
+        "catalog_version": registry.CATALOG_VERSION,
+        "backend": backend,
+        "model": (settings.CLARIFIER_MODEL or "") if backend == "real" else "",
+    }
+
+
+def lookup(db: Session, submission_hash: str) -> LLMOutput | None:
+    if settings.CLARIFIER_CACHE_SIZE <= 0:
+        return None
+    key = _key(submission_hash)
+    row = db.execute(
+        select(ClarifierCache.id, ClarifierCache.llm_output).where(
+            *(getattr(ClarifierCache, k) == v for k, v in key.items())
+        )
+    ).first()
+    if row is None:
+        return None  # a miss writes nothing: the caller's backend call holds no lock
+    db.execute(
+        update(ClarifierCache)
+        .where(ClarifierCache.id == row.id)
+        .values(hits=ClarifierCache.hits + 1, last_used_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return LLMOutput.model_validate(row.llm_output)
+
+
+def store(db: Session, submission_hash: str, output: LLMOutput) -> None:
+    """Remember a successful backend output; a concurrent store of the same
+    key wins silently. Evicts least recently used rows beyond the cap."""
+    size = settings.CLARIFIER_CACHE_SIZE
+    if size <= 0:
+        return
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    db.execute(
+        insert(ClarifierCache)
+        .values(
+            **_key(submission_hash),
+            llm_output=output.model_dump(),
+            hits=0,
+            created_at=utcnow(),
+            last_used_at=utcnow(),
+        )
+        .on_conflict_do_nothing(
+            index_elements=["submission_hash", "catalog_version", "backend", "model"]
+        )
+    )
+    stale = (
+        select(ClarifierCache.id)
+        .order_by(ClarifierCache.last_used_at.desc(), ClarifierCache.id.desc())
+        .offset(size)
+    )
+    db.execute(
+        delete(ClarifierCache)
+        .where(ClarifierCache.id.in_(stale.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,190 @@
+# filepath: src/services/clarifier_runner.py
+
+"""Clarifier runs off the request thread (BOM §4 engine, async edge).
+
+run_clarifier is synchronous: with the real backend a submission holds an
+API worker thread — and its DB session — for the whole LLM call, retries
+included. submit() instead answers at once:
+
+- identical content (same draft + hash), the shared output cache, or the
+  backend being off need no backend call: the run is recorded inline;
+- otherwise the draft moves to "checking", the request's transaction is
+  committed, and the backend call goes to a pool of CLARIFIER_WORKERS
+  threads. When it returns, the run is recorded in a short session of its
+  own. A call still running after CLARIFIER_RUN_TIMEOUT_SECONDS lands as a
+  degraded (code-only) run, like any backend failure; its late answer
+  still fills the output cache, so a resubmission hits.
+
+At most CLARIFIER_QUEUE_MAX backend calls are queued or running in the pool
+at once — counted until the call itself returns, not until its run lands,
+so calls a hung backend never finishes keep their place. Beyond that
+submit() answers 503 with Retry-After, nothing queued. A call whose run
+already timed out while it waited in the queue is dropped unstarted.
+In-process: a restart drops in-flight runs and leaves their drafts
+"checking" — submit() accepts those again.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.engine import SessionLocal
+from db.models import ClarifierRun, DraftStatus, TaskDraft
+from schemas.clarifier import LLMOutput
+from services import clarifier, clarifier_cache
+from services.clarifier_backend import get_backend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Job:
+    draft_id: int
+    submission_hash: str
+    request_id: str | None
+    landed: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    timer: threading.Timer | None = None
+
+
+class ClarifierRunner:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self._session_factory = session_factory
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.CLARIFIER_WORKERS, thread_name_prefix="clarifier"
+        )
+        self._idle = threading.Condition()
+        self._in_flight = 0  # submitted runs not landed yet
+        self._occupied = 0  # backend calls queued or running in the pool
+        self.stats = {"submitted": 0, "landed": 0, "timed_out": 0, "rejected": 0}
+
+    def submit(
+        self, db: Session, draft: TaskDraft, *, request_id: str | None = None
+    ) -> ClarifierRun | None:
+        """Start a run for the draft's current content. Returns the run when
+        it could be recorded at once; None when it was queued (the draft is
+        "checking" and committed)."""
+        clarifier.enforce_rate_cap(db, draft.owner_id)
+        payload = draft.payload or {}
+        h = clarifier.submission_hash(payload)
+        cached = clarifier.cached_run(db, draft, h)
+        if cached is not None:
+            clarifier.release_rate_cap(draft.owner_id)
+            return cached
+        backend = get_backend()
+        if backend is None:
+            return clarifier.record_run(db, draft, h, None)
+        hit = clarifier_cache.lookup(db, h)
+        if hit is not None:
+            return clarifier.record_run(db, draft, h, hit, cache_hit=True)
+
+        with self._idle:
+            if self._occupied >= settings.CLARIFIER_QUEUE_MAX:
+                self.stats["rejected"] += 1
+                clarifier.release_rate_cap(draft.owner_id)
+                raise HTTPException(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    "The clarifier is busy — try again in a moment.",
+                    headers={"Retry-After": "5"},
+                )
+            self._in_flight += 1
+            self._occupied += 1
+            self.stats["submitted"] += 1
+        draft.status = DraftStatus.CHECKING.value
+        db.commit()  # the worker's session must see the checking draft
+
+        job = _Job(draft.id, h, request_id)
+        job.timer = threading.Timer(settings.CLARIFIER_RUN_TIMEOUT_SECONDS, self._land, (job,))
+        job.timer.daemon = True
+        job.timer.start()
+        future = self._pool.submit(self._call, job, backend, payload)
+        future.add_done_callback(lambda f: self._finish(job, f))
+        return None
+
+    @staticmethod
+    def _call(job: _Job, backend, payload: dict) -> LLMOutput | None:
+        if job.landed:
+            return None  # timed out while queued: nobody waits for this call
+        return backend.run(payload.get("desc", ""), payload)
+
+    def _finish(self, job: _Job, future: Future) -> None:
+        try:
+            self._land(job, future)
+        finally:
+            with self._idle:
+                self._occupied -= 1
+                self._idle.notify_all()
+
+    def _land(self, job: _Job, future: Future | None = None) -> None:
+        """Record the run once: from the finished call, or degraded on timeout."""
+        llm_out: LLMOutput | None = None
+        reason = f"backend timed out after {settings.CLARIFIER_RUN_TIMEOUT_SECONDS:g}s"
+        if future is not None:
+            try:
+                llm_out, reason = future.result(), ""
+            except Exception as e:  # ClarifierBackendError or anything unexpected
+                reason = str(e) or type(e).__name__
+        with job.lock:
+            late, job.landed = job.landed, True
+        if late and llm_out is None:
+            return  # nothing to record or cache
+        try:
+            with self._session_factory() as db, db.begin():
+                if llm_out is not None:
+                    clarifier_cache.store(db, job.submission_hash, llm_out)
+                if not late:
+                    self._record(db, job, llm_out, reason)
+        except Exception:
+            logger.exception("Clarifier run for draft %s failed to land", job.draft_id)
+        if late:
+            return
+        if job.timer is not None:
+            job.timer.cancel()
+        with self._idle:
+            self._in_flight -= 1
+            self.stats["landed"] += 1
+            self.stats["timed_out"] += future is None
+            self._idle.notify_all()
+
+    def _record(self, db: Session, job: _Job, llm_out: LLMOutput | None, reason: str) -> None:
+        draft = db.get(TaskDraft, job.draft_id)
+        if (
+            draft is None
+            or draft.status != DraftStatus.CHECKING.value
+            or clarifier.submission_hash(draft.payload or {}) != job.submission_hash
+            or clarifier.cached_run(db, draft, job.submission_hash) is not None
+        ):
+            return  # revised, cancelled or already recorded meanwhile
+        if llm_out is None:
+            clarifier.record_skipped(db, draft, reason, job.request_id)
+        clarifier.record_run(db, draft, job.submission_hash, llm_out, degraded=llm_out is None)
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """Block until every submitted run has landed and every backend call
+        has returned (tests, shutdown)."""
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: self._in_flight == 0 and self._occupied == 0, timeout
+            )
+
+
+_runner: ClarifierRunner | None = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> ClarifierRunner:
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ClarifierRunner()
+        return _runner
+
+
+def submit(db: Session, draft: TaskDraft, *, request_id: str | None = None) -> ClarifierRun | None:
+    return get_runner().submit(db, draft, request_id=request_id)
@@ -0,0 +1,226 @@
+# filepath: src/services/dispatcher.py
+
+"""Background notification dispatcher (NOTIFY_DISPATCH=outbox).
+
+Requests only write pending ledger rows (services/notifications.notify);
+this drains them. Each round claims up to NOTIFY_DISPATCH_BATCH rows —
+pending -> sending in one conditional UPDATE, so several workers can run
+dispatchers against the same table without sending a row twice — then
+sends them with up to NOTIFY_DISPATCH_CONCURRENCY sends in flight and
+writes back sent/failed + provider_ref in one statement.
+
+Digests: events in notifications.DIGEST_EVENTS (task.matched) are held for
+NOTIFY_DIGEST_WINDOW_SECONDS. Once a user's oldest held row is due, all of
+that user's pending rows of the event are claimed together and sent as one
+digest message ("5 new tasks for you"); every row keeps its own ledger entry
+and dedupe_key and is marked sent with the digest's provider_ref. A claimed
+digest row whose task is no longer open — filled, closed or deleted while
+the row was held — is marked skipped (task_closed) instead of sent.
+
+Runs as an asyncio task in the API process (app lifespan). A committed
+Notification wakes it through db.events; rows committed by other workers
+are picked up by the NOTIFY_DISPATCH_POLL_SECONDS idle poll. A row left in
+sending by a crash is retried after NOTIFY_SENDING_TIMEOUT_SECONDS —
+delivery is at-least-once.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
+from sqlalchemy import and_, not_, or_, select, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import events
+from db.base import utcnow
+from db.engine import SessionLocal
+from db.models import Notification, Task, TaskStatus, User
+from services import notifications
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _Job:
+    ids: tuple[int, ...]  # ledger rows covered by this one send
+    chat_id: str
+    text: str
+
+
+class NotificationDispatcher:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self._session_factory = session_factory
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    # --- database (sync; run in a worker thread) ----------------------------
+
+    def _claimable(self, hold: bool = False):
+        now = utcnow()
+        cutoff = now - timedelta(seconds=settings.NOTIFY_SENDING_TIMEOUT_SECONDS)
+        pending = Notification.status == "pending"
+        if hold and settings.NOTIFY_DIGEST_WINDOW_SECONDS > 0:
+            window = now - timedelta(seconds=settings.NOTIFY_DIGEST_WINDOW_SECONDS)
+            held = and_(
+                Notification.event_type.in_(notifications.DIGEST_EVENTS),
+                Notification.created_at > window,
+            )
+            pending = and_(pending, not_(held))
+        return or_(
+            pending,
+            and_(Notification.status == "sending", Notification.claimed_at < cutoff),
+        )
+
+    def _with_digest_rows(self, db: Session, ids: list[int]) -> list[int]:
+        """Add the still-held digest rows of every user with a due digest row."""
+        due_users = select(Notification.user_id).where(
+            Notification.id.in_(ids), Notification.event_type.in_(notifications.DIGEST_EVENTS)
+        )
+        held = db.scalars(
+            select(Notification.id).where(
+                Notification.status == "pending",
+                Notification.id.not_in(ids),
+                Notification.event_type.in_(notifications.DIGEST_EVENTS),
+                Notification.user_id.in_(due_users),
+            )
+        ).all()
+        return ids + list(held)
+
+    def claim(self, limit: int) -> list[_Job]:
+        """Take up to limit due rows for sending, oldest first, plus the held
+        rows that join their digests."""
+        with self._session_factory() as db, db.begin():
+            ids = db.scalars(
+                select(Notification.id)
+                .where(self._claimable(hold=True))
+                .order_by(Notification.id)
+                .limit(limit)
+            ).all()
+            if not ids:
+                return []
+            ids = self._with_digest_rows(db, list(ids))
+            # re-check the condition: another dispatcher may have claimed them
+            claimed = db.scalars(
+                update(Notification)
+                .where(Notification.id.in_(ids), self._claimable())
+                .values(status="sending", claimed_at=utcnow())
+                .returning(Notification.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            is_digest = Notification.event_type.in_(notifications.DIGEST_EVENTS)
+            rows = db.execute(
+                select(Notification, User.telegram_id, Task.status)
+                .join(User, User.id == Notification.user_id)
+                .outerjoin(
+                    Task, and_(is_digest, Task.id == Notification.payload["task_id"].as_integer())
+                )
+                .where(Notification.id.in_(claimed))
+                .order_by(Notification.id)
+            ).all()
+            jobs, digests, closed = [], {}, []
+            for row, telegram_id, task_status in rows:
+                chat_id = telegram_id or str(row.user_id)
+                if row.event_type in notifications.DIGEST_EVENTS:
+                    if task_status != TaskStatus.OPEN.value:
+                        closed.append(row.id)  # nobody can jump any more
+                        continue
+                    digests.setdefault((chat_id, row.event_type), []).append(row)
+                else:
+                    jobs.append(_Job(ids=(row.id,), chat_id=chat_id, text=row.text or ""))
+            for (chat_id, _event_type), group in digests.items():
+                if len(group) == 1:
+                    text = group[0].text or ""
+                else:
+                    text = notifications.digest_text(db, group)
+                jobs.append(_Job(ids=tuple(r.id for r in group), chat_id=chat_id, text=text))
+            if closed:
+                db.execute(
+                    update(Notification)
+                    .where(Notification.id.in_(closed))
+                    .values(status="skipped", skip_reason="task_closed")
+                    .execution_options(synchronize_session=False)
+                )
+            return jobs
+
+    def finish(self, results: dict[int, str | None]) -> None:
+        """Write back provider refs; None = failed."""
+        now = utcnow()
+        with self._session_factory() as db, db.begin():
+            db.execute(
+                update(Notification),
+                [
+                    {"id": nid, "status": "failed"}
+                    if ref is None
+                    else {"id": nid, "status": "sent", "provider_ref": ref, "sent_at": now}
+                    for nid, ref in results.items()
+                ],
+            )
+
+    # --- sending ------------------------------------------------------------
+
+    async def _send(self, job: _Job, limit: asyncio.Semaphore) -> str | None:
+        async with limit:
+            return await asyncio.to_thread(notifications.deliver, job.chat_id, job.text)
+
+    async def drain(self) -> int:
+        """Send everything claimable now; returns the number of rows handled."""
+        limit = asyncio.Semaphore(settings.NOTIFY_DISPATCH_CONCURRENCY)
+        handled = 0
+        while jobs := await asyncio.to_thread(self.claim, settings.NOTIFY_DISPATCH_BATCH):
+            refs = await asyncio.gather(*(self._send(job, limit) for job in jobs))
+            await asyncio.to_thread(
+                self.finish,
+                {nid: ref for job, ref in zip(jobs, refs, strict=True) for nid in job.ids},
+            )
+            handled += sum(len(job.ids) for job in jobs)
+        return handled
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.drain()
+            except Exception:  # keep dispatching; the rows stay claimable
+                logger.exception("Notification dispatch round failed")
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.NOTIFY_DISPATCH_POLL_SECONDS
+                )
+            except TimeoutError:
+                pass
+
+    def wake(self, _ids: set | None = None) -> None:
+        """Post-commit hook: new rows are waiting. Safe from any thread."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # --- lifecycle ----------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._loop = self._wakeup = None
+
+
+_dispatcher = NotificationDispatcher()
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    return _dispatcher
+
+
+events.subscribe(Notification, _dispatcher.wake, key=lambda row: row.id)
@@ -0,0 +1,211 @@
+# filepath: src/services/fanout.py
+
+"""Task-matched fan-out as a paced background job (matching C7).
+
+A launch only creates a FanOutJob. The job walks the task's matched
+audience (matching.audience_query) newest account first in keyset batches
+of FANOUT_BATCH_SIZE, writes the task.matched ledger rows for each batch
+(services/dispatcher.py sends them) and waits batch / FANOUT_RATE_PER_SECOND
+seconds before the next, so a large audience is dripped instead of flooded.
+It stops early once the task is no longer open — its still-pending
+task.matched rows are skipped — or after MATCH_NOTIFY_CAP recipients when a
+cap is set.
+
+Batches run in FanOutWorker (app lifespan). The job row carries the cursor,
+so a restart resumes where it stopped, and a batch is taken with a
+conditional UPDATE on next_run_at, so several workers never run the same
+batch. With NOTIFY_DISPATCH=inline the whole job runs inside the launch
+request, unpaced.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from datetime import timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import events
+from db.base import utcnow
+from db.engine import SessionLocal
+from db.models import FanOutJob, Notification, Task, TaskStatus, User
+from services import matching, notifications
+
+logger = logging.getLogger(__name__)
+
+_LEASE = timedelta(minutes=1)  # a taken batch is not retaken for this long
+
+
+def matched_key_prefix(task_id: int) -> str:
+    return f"task.matched:{task_id}:"
+
+
+def start(db: Session, task: Task) -> FanOutJob:
+    job = FanOutJob(task_id=task.id)
+    db.add(job)
+    db.flush()
+    if settings.NOTIFY_DISPATCH == "inline":
+        while run_batch(db, job):
+            pass
+    return job
+
+
+def _finish(db: Session, job: FanOutJob, outcome: str, reason: str | None = None) -> None:
+    job.status, job.stop_reason, job.finished_at = outcome, reason, utcnow()
+    if reason in ("full", "closed"):
+        # nobody can jump any more: don't advertise the task
+        db.execute(
+            update(Notification)
+            .where(
+                Notification.dedupe_key.startswith(matched_key_prefix(job.task_id)),
+                Notification.status == "pending",
+            )
+            .values(status="skipped", skip_reason="task_closed")
+            .execution_options(synchronize_session=False)
+        )
+
+
+def run_batch(db: Session, job: FanOutJob) -> bool:
+    """Enqueue the job's next batch. False once the job has finished."""
+    task = db.get(Task, job.task_id)
+    if task is None or task.status != TaskStatus.OPEN.value:
+        full = task is not None and task.status == TaskStatus.FULL.value
+        _finish(db, job, "stopped", "full" if full else "closed")
+        return False
+
+    size = settings.FANOUT_BATCH_SIZE
+    if settings.MATCH_NOTIFY_CAP is not None:
+        size = min(size, settings.MATCH_NOTIFY_CAP - job.matched)
+        if size <= 0:
+            _finish(db, job, "stopped", "cap")
+            return False
+
+    q, _warnings = matching.audience_query(db, task.filters)
+    q = q.filter(User.id != task.owner_id)
+    if job.last_user_id is not None:
+        q = q.filter(User.id < job.last_user_id)
+    recipients = q.order_by(User.id.desc()).limit(size).all()
+
+    text = notifications.TASK_MATCHED.format(desc=task.desc[:80], you_earn=task.you_earn)
+    inserted = notifications.notify_many(
+        db,
+        [
+            notifications.Outgoing(
+                user,
+                "task.matched",
+                text,
+                dedupe_key=f"{matched_key_prefix(task.id)}{user.id}",
+                payload={"task_id": task.id},
+            )
+            for user in recipients
+        ],
+    )
+    job.notified += len(inserted)
+    job.matched += len(recipients)
+    if recipients:
+        job.last_user_id = recipients[-1].id
+
+    if len(recipients) < size:
+        _finish(db, job, "done")
+        return False
+    job.next_run_at = utcnow() + timedelta(seconds=size / settings.FANOUT_RATE_PER_SECOND)
+    return True
+
+
+def get_progress(db: Session, task: Task, owner: User) -> dict:
+    """Job counters plus how many of its rows were delivered so far."""
+    if task.owner_id != owner.id:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Only the Launcher can see the fan-out")
+    job = db.query(FanOutJob).filter(FanOutJob.task_id == task.id).first()
+    if job is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "No fan-out for this task")
+    sent = db.scalar(
+        select(func.count(Notification.id)).where(
+            Notification.dedupe_key.startswith(matched_key_prefix(job.task_id)),
+            Notification.status == "sent",
+        )
+    )
+    return {
+        "status": job.status,
+        "stop_reason": job.stop_reason,
+        "matched": job.matched,
+        "notified": job.notified,
+        "sent": sent,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+class FanOutWorker:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self._session_factory = session_factory
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def step(self) -> bool:
+        """Run one due batch of one job; False when nothing was due."""
+        now = utcnow()
+        with self._session_factory() as db, db.begin():
+            due = (FanOutJob.status == "running", FanOutJob.next_run_at <= now)
+            job_id = db.scalar(
+                select(FanOutJob.id).where(*due).order_by(FanOutJob.next_run_at).limit(1)
+            )
+            if job_id is None:
+                return False
+            # take the batch; a worker racing us for it updates nothing
+            taken = db.execute(
+                update(FanOutJob)
+                .where(FanOutJob.id == job_id, *due)
+                .values(next_run_at=now + _LEASE)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if taken:
+                run_batch(db, db.get(FanOutJob, job_id))
+            return True
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                while await asyncio.to_thread(self.step):
+                    pass
+            except Exception:  # the job stays due and is retried next round
+                logger.exception("Fan-out batch failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.FANOUT_POLL_SECONDS)
+            except TimeoutError:
+                pass
+
+    def wake(self, _ids: set | None = None) -> None:
+        """Post-commit hook: a job was created or changed. Safe from any thread."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._loop = self._wakeup = None
+
+
+_worker = FanOutWorker()
+
+
+def get_worker() -> FanOutWorker:
+    return _worker
+
+
+events.subscribe(FanOutJob, _worker.wake, key=lambda row: row.id)
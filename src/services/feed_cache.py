@@ -0,0 +1,113 @@
+# filepath: src/services/feed_cache.py
+
+"""Short-lived per-viewer cache of eligible feed ids (matching C3).
+
+The bot pages one card at a time, so a viewer walking the feed would
+otherwise reload their snapshot and re-run the reverse index on every tap.
+The first page stores the viewer's full eligible id list here; later pages
+are a dict lookup plus a primary-key fetch of the page.
+
+Bounded (LRU over FEED_CACHE_SIZE entries) and short-lived
+(FEED_CACHE_TTL_SECONDS). Invalidated from db.events: a committed Task
+insert, delete, or change to a field the feed selects or sorts on drops
+every entry (a task opened, filled, cancelled or re-filtered can move in or
+out of anyone's feed); slot counter bumps from jumps don't, since pages are
+re-fetched by id. A committed VerificationData change drops that viewer's
+entries. A fill computed from state older than the latest
+invalidation is never stored. Single-process, like the indexes it fronts.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+
+from config import settings
+from db import events
+from db.models import Task, VerificationData
+
+
+@dataclass(frozen=True)
+class FeedEntry:
+    ids: tuple[int, ...]  # eligible task ids, newest first
+    positions: dict[int, int]  # task id -> index in ids
+    expires_at: float
+
+
+class FeedCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._entries: OrderedDict[tuple, FeedEntry] = OrderedDict()
+        self._generation = 0  # bumped on every invalidation
+
+    # --- maintenance -----------------------------------------------------
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def invalidate_all(self, _keys: Iterable[Hashable] = ()) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def invalidate_viewers(self, viewer_ids: Iterable[int]) -> None:
+        viewer_ids = set(viewer_ids)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] in viewer_ids]:
+                del self._entries[key]
+            self._generation += 1
+
+    # --- lookup ------------------------------------------------------------
+
+    def get(self, key: tuple) -> FeedEntry | None:
+        """Cached entry for (viewer_id, *feed params), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def load(self, key: tuple, loader: Callable[[], Iterable[int]]) -> FeedEntry:
+        """Cached entry for key, filling it from loader() on a miss."""
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            generation = self._generation
+        ids = tuple(loader())
+        entry = FeedEntry(
+            ids,
+            {task_id: pos for pos, task_id in enumerate(ids)},
+            time.monotonic() + settings.FEED_CACHE_TTL_SECONDS,
+        )
+        with self._lock:
+            # a commit landed while loading: the result may predate it
+            if generation == self._generation and settings.FEED_CACHE_TTL_SECONDS > 0:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > settings.FEED_CACHE_SIZE:
+                    self._entries.popitem(last=False)
+        return entry
+
+
+_cache = FeedCache()
+
+
+def get_cache() -> FeedCache:
+    return _cache
+
+
+# what task_index.eligible selects and orders on
+_FEED_FIELDS = ("status", "category", "you_earn", "filters", "creation_date")
+
+events.subscribe(Task, _cache.invalidate_all, key=lambda task: task.id, fields=_FEED_FIELDS)
+events.subscribe(VerificationData, _cache.invalidate_viewers, key=lambda row: row.user_id)
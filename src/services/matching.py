@@ -3,9 +3,19 @@
 """Filter Expression Evaluator (matching concept 1).
 
 One parser, two evaluation modes that must always agree:
-- SQL mode: a predicate over users for set queries (audience count, fan-out)
+- SQL mode: a predicate over users for set queries (audience count, fan-out),
+  plain column predicates over the user_attributes projection (EXISTS over
+  verification_data for the few users it flags irregular)
 - snapshot mode: pure-Python eval against one user's attribute snapshot
   (jump gate, task feed) — one DB read per user, then zero queries per task
+- index mode: bitmap AND/OR/AND-NOT over services/attribute_index.py
+  (audience counts) — no per-user work at all
+- counter mode: summed cells in services/audience_counters.py (previews
+  over gender, age and countries) — no per-user work either
+- sketch mode: theta-sketch set algebra in services/audience_sketches.py
+  (approximate previews) — cost independent of audience size
+- vectorized mode: services/vector_match.py, snapshot mode over a NumPy
+  matrix for re-matching one filter against a whole population
 
 Semantics per devdocs/filter_design.md: AND across fields, OR within
 location entries, exceptions subtract from their parent entry, missing
@@ -13,46 +23,59 @@ attribute = no match. A location filter with only a raw_statement is
 ADVISORY (decision 1): it constrains nothing and produces a warning.
 """
 
-from dataclasses import dataclass, field
+import json
+from dataclasses import dataclass
 from datetime import date, timedelta
+from functools import lru_cache
 
 from sqlalchemy import and_, exists, or_, true
 from sqlalchemy.orm import Session
 
 from config import settings
-from db.models import User, VerificationData
+from db.models import User, UserAttributes, VerificationData
+from services.attribute_index import get_index
 from services.attributes import (
     FIELD_BIRTH_DATE,
     FIELD_CITY,
     FIELD_COUNTRY,
     FIELD_GENDER,
+    WIDE_COLUMNS,
+    current_confident,
     load_snapshot,
 )
+from services.audience_counters import get_counters
+from services.audience_sketches import get_sketches
 from services.regions import resolve_region
 
 WARN_RAW_LOCATION = "Location is free text only — it won't constrain matching until parsed"
 WARN_ADVANCED = "Advanced filters are not evaluated yet (deferred)"
 
 
-@dataclass
+@dataclass(frozen=True)
 class ParsedFilters:
+    """Compiled, immutable filter — one instance is shared by every task,
+    viewer and thread that uses the same filter JSON (compile_filters)."""
+
     gender: str | None = None
     # age translated to birth-date bounds (ISO strings, lexicographic-safe)
     birth_latest: str | None = None  # age >= min  ->  birth_date <= this
     birth_earliest: str | None = None  # age <= max  ->  birth_date >= this
-    cities: list[str] = field(default_factory=list)
-    # (country, [excluded cities]) — direct entries and region expansions
-    countries: list[tuple[str, list[str]]] = field(default_factory=list)
+    cities: frozenset[str] = frozenset()
+    # (country, excluded cities) — direct entries and region expansions
+    countries: tuple[tuple[str, frozenset[str]], ...] = ()
+    # the same entries split for snapshot mode: plain set membership for
+    # countries without exceptions, a loop only over those that have some
+    free_countries: frozenset[str] = frozenset()
+    excepted_countries: tuple[tuple[str, frozenset[str]], ...] = ()
     has_location: bool = False
-    warnings: list[str] = field(default_factory=list)
+    warnings: tuple[str, ...] = ()
 
     @property
     def is_unconstrained(self) -> bool:
         return not (self.gender or self.birth_latest or self.birth_earliest or self.has_location)
 
 
-def _years_ago(years: int) -> date:
-    today = date.today()
+def _years_ago(years: int, today: date) -> date:
     try:
         return today.replace(year=today.year - years)
     except ValueError:  # Feb 29
@@ -63,83 +86,159 @@ def _lc(value) -> str:
     return str(value).strip().lower()
 
 
-def parse_filters(filters: dict | None) -> ParsedFilters:
-    pf = ParsedFilters()
+def parse_filters(filters: dict | None, today: date | None = None) -> ParsedFilters:
+    """Uncached parse. Hot paths go through compile_filters."""
     if not isinstance(filters, dict):
-        return pf
+        return ParsedFilters()
+    today = today or date.today()
+    gender = birth_latest = birth_earliest = None
+    cities: list[str] = []
+    countries: list[tuple[str, frozenset[str]]] = []
+    warnings: list[str] = []
 
     basic = filters.get("basic_filters")
     if isinstance(filters.get("advanced_filters"), dict) and filters["advanced_filters"]:
-        pf.warnings.append(WARN_ADVANCED)
+        warnings.append(WARN_ADVANCED)
     if not isinstance(basic, dict):
-        return pf
+        return ParsedFilters(warnings=tuple(warnings))
 
     if basic.get("gender"):
-        pf.gender = _lc(basic["gender"])
+        gender = _lc(basic["gender"])
 
     age = basic.get("age_range")
     if isinstance(age, dict):
         if isinstance(age.get("min"), int):
-            pf.birth_latest = _years_ago(age["min"]).isoformat()
+            birth_latest = _years_ago(age["min"], today).isoformat()
         if isinstance(age.get("max"), int):
-            pf.birth_earliest = (_years_ago(age["max"] + 1) + timedelta(days=1)).isoformat()
+            birth_earliest = (_years_ago(age["max"] + 1, today) + timedelta(days=1)).isoformat()
 
     loc = basic.get("location_filter")
     if isinstance(loc, dict):
         for entry in loc.get("cities") or []:
             if isinstance(entry, dict) and entry.get("name"):
-                pf.cities.append(_lc(entry["name"]))
+                cities.append(_lc(entry["name"]))
 
-        def _excluded_cities(entry: dict) -> list[str]:
+        def _excluded_cities(entry: dict) -> frozenset[str]:
             exc = entry.get("exceptions") or {}
-            return [_lc(c) for c in (exc.get("cities") or []) if c]
+            return frozenset(_lc(c) for c in (exc.get("cities") or []) if c)
 
         for entry in loc.get("countries") or []:
             if isinstance(entry, dict) and entry.get("name"):
-                pf.countries.append((_lc(entry["name"]), _excluded_cities(entry)))
+                countries.append((_lc(entry["name"]), _excluded_cities(entry)))
 
         for entry in loc.get("regions") or []:
             if not (isinstance(entry, dict) and entry.get("name")):
                 continue
-            countries = resolve_region(entry["name"])
-            if countries is None:
-                pf.warnings.append(f"Unknown region '{entry['name']}' — entry ignored")
+            region = resolve_region(entry["name"])
+            if region is None:
+                warnings.append(f"Unknown region '{entry['name']}' — entry ignored")
                 continue
             exc = entry.get("exceptions") or {}
             excluded_countries = {_lc(c) for c in (exc.get("countries") or []) if c}
-            excluded_cities = [_lc(c) for c in (exc.get("cities") or []) if c]
-            for country in countries:
+            excluded_cities = _excluded_cities(entry)
+            for country in region:
                 if country not in excluded_countries:
-                    pf.countries.append((country, excluded_cities))
+                    countries.append((country, excluded_cities))
+
+        if loc.get("raw_statement") and not (cities or countries):
+            warnings.append(WARN_RAW_LOCATION)
+
+    return ParsedFilters(
+        gender=gender,
+        birth_latest=birth_latest,
+        birth_earliest=birth_earliest,
+        cities=frozenset(cities),
+        countries=tuple(countries),
+        free_countries=frozenset(c for c, excluded in countries if not excluded),
+        excepted_countries=tuple((c, excluded) for c, excluded in countries if excluded),
+        has_location=bool(cities or countries),
+        warnings=tuple(warnings),
+    )
+
+
+_UNCONSTRAINED = ParsedFilters()
+
 
-        pf.has_location = bool(pf.cities or pf.countries)
-        if loc.get("raw_statement") and not pf.has_location:
-            pf.warnings.append(WARN_RAW_LOCATION)
+@lru_cache(maxsize=settings.FILTER_CACHE_SIZE)
+def _compile(canonical: str, today: date) -> ParsedFilters:
+    return parse_filters(json.loads(canonical), today)
 
-    return pf
+
+def compile_filters(filters: dict | None) -> ParsedFilters:
+    """parse_filters memoized on the canonical filter JSON (LRU).
+
+    Content-addressed, so an edited task simply compiles under a new key.
+    Today's date is part of the key because age bounds are relative to it.
+    """
+    if not isinstance(filters, dict) or not filters:
+        return _UNCONSTRAINED
+    canonical = json.dumps(filters, sort_keys=True, separators=(",", ":"), default=str)
+    return _compile(canonical, date.today())
 
 
 # --- SQL mode -----------------------------------------------------------
+# Column predicates over the user_attributes projection (one row per user,
+# maintained from verification_data); callers outer-join it onto User.
+# Users the projection flags irregular (several current values in a field,
+# or a non-ISO birth_date) get the exact EXISTS form instead, which compares
+# birth dates as strings like snapshot mode does.
 
 
-def _confidence_ok():
+def _confident(confidence_column):
     return or_(
-        VerificationData.confidence_score.is_(None),
-        VerificationData.confidence_score >= settings.MATCH_CONFIDENCE_MIN,
+        confidence_column.is_(None),
+        confidence_column >= settings.MATCH_CONFIDENCE_MIN,
     )
 
 
-def _attr_exists(field_name: str, *value_conds):
+def _has(field: str, *value_conds):
+    column, confidence = (getattr(UserAttributes, c) for c in WIDE_COLUMNS[field])
+    return and_(column.is_not(None), *value_conds, _confident(confidence))
+
+
+def _column_predicate(pf: ParsedFilters):
+    conds = []
+    if pf.gender:
+        conds.append(_has(FIELD_GENDER, UserAttributes.gender == pf.gender))
+
+    birth_conds = []
+    if pf.birth_latest:
+        birth_conds.append(UserAttributes.birth_date <= date.fromisoformat(pf.birth_latest))
+    if pf.birth_earliest:
+        birth_conds.append(UserAttributes.birth_date >= date.fromisoformat(pf.birth_earliest))
+    if birth_conds:
+        conds.append(_has(FIELD_BIRTH_DATE, *birth_conds))
+
+    if pf.has_location:
+        alternatives = []
+        if pf.cities:
+            alternatives.append(_has(FIELD_CITY, UserAttributes.city.in_(sorted(pf.cities))))
+        if pf.free_countries:
+            alternatives.append(
+                _has(FIELD_COUNTRY, UserAttributes.country.in_(sorted(pf.free_countries)))
+            )
+        for country, excluded_cities in pf.excepted_countries:
+            alternatives.append(
+                and_(
+                    _has(FIELD_COUNTRY, UserAttributes.country == country),
+                    ~_has(FIELD_CITY, UserAttributes.city.in_(sorted(excluded_cities))),
+                )
+            )
+        conds.append(or_(*alternatives))
+
+    return and_(*conds)
+
+
+def _attr_exists(field: str, *value_conds):
     return exists().where(
         VerificationData.user_id == User.id,
-        VerificationData.field_name == field_name,
-        VerificationData.is_current.is_(True),
-        _confidence_ok(),
+        VerificationData.field_name == field,
+        *current_confident(),
         *value_conds,
     )
 
 
-def sql_predicate(pf: ParsedFilters):
+def _exact_predicate(pf: ParsedFilters):
     conds = []
     if pf.gender:
         conds.append(_attr_exists(FIELD_GENDER, VerificationData.field_value == pf.gender))
@@ -154,19 +253,45 @@ def sql_predicate(pf: ParsedFilters):
 
     if pf.has_location:
         alternatives = []
-        for city in pf.cities:
-            alternatives.append(_attr_exists(FIELD_CITY, VerificationData.field_value == city))
-        for country, excluded_cities in pf.countries:
-            cond = _attr_exists(FIELD_COUNTRY, VerificationData.field_value == country)
-            if excluded_cities:
-                cond = and_(
-                    cond,
-                    ~_attr_exists(FIELD_CITY, VerificationData.field_value.in_(excluded_cities)),
+        if pf.cities:
+            alternatives.append(
+                _attr_exists(FIELD_CITY, VerificationData.field_value.in_(sorted(pf.cities)))
+            )
+        if pf.free_countries:
+            alternatives.append(
+                _attr_exists(
+                    FIELD_COUNTRY, VerificationData.field_value.in_(sorted(pf.free_countries))
                 )
-            alternatives.append(cond)
+            )
+        for country, excluded_cities in pf.excepted_countries:
+            alternatives.append(
+                and_(
+                    _attr_exists(FIELD_COUNTRY, VerificationData.field_value == country),
+                    ~_attr_exists(
+                        FIELD_CITY, VerificationData.field_value.in_(sorted(excluded_cities))
+                    ),
+                )
+            )
         conds.append(or_(*alternatives))
 
-    return and_(*conds) if conds else true()
+    return and_(*conds)
+
+
+def sql_predicate(pf: ParsedFilters):
+    if pf.is_unconstrained:
+        return true()
+    return or_(
+        and_(UserAttributes.irregular.is_not(True), _column_predicate(pf)),
+        and_(UserAttributes.irregular.is_(True), _exact_predicate(pf)),
+    )
+
+
+def _audience(db: Session, pf: ParsedFilters):
+    return (
+        db.query(User)
+        .outerjoin(UserAttributes, UserAttributes.user_id == User.id)
+        .filter(sql_predicate(pf))
+    )
 
 
 # --- snapshot mode -------------------------------------------------------
@@ -192,9 +317,13 @@ def unmet_requirements(pf: ParsedFilters, snapshot: dict[str, set[str]]) -> list
     if pf.has_location:
         user_cities = snapshot.get(FIELD_CITY, set())
         user_countries = snapshot.get(FIELD_COUNTRY, set())
-        ok = any(city in user_cities for city in pf.cities) or any(
-            country in user_countries and not (user_cities & set(excluded))
-            for country, excluded in pf.countries
+        ok = (
+            not pf.cities.isdisjoint(user_cities)
+            or not pf.free_countries.isdisjoint(user_countries)
+            or any(
+                country in user_countries and user_cities.isdisjoint(excluded)
+                for country, excluded in pf.excepted_countries
+            )
         )
         if not ok:
             unmet.append("location")
@@ -207,7 +336,7 @@ def unmet_requirements(pf: ParsedFilters, snapshot: dict[str, set[str]]) -> list
 
 def user_matches(db: Session, filters: dict | None, user_id: int) -> tuple[bool, list[str]]:
     """Snapshot-mode check for one user. Returns (ok, unmet field names)."""
-    pf = parse_filters(filters)
+    pf = compile_filters(filters)
     if pf.is_unconstrained:
         return True, []
     unmet = unmet_requirements(pf, load_snapshot(db, user_id))
@@ -216,14 +345,50 @@ def user_matches(db: Session, filters: dict | None, user_id: int) -> tuple[bool,
 
 def audience_query(db: Session, filters: dict | None):
     """SQL-mode query over matching users. Returns (query, warnings)."""
-    pf = parse_filters(filters)
-    return db.query(User).filter(sql_predicate(pf)), pf.warnings
+    pf = compile_filters(filters)
+    return _audience(db, pf), list(pf.warnings)
 
 
 def audience_count(
     db: Session, filters: dict | None, exclude_user_id: int | None = None
 ) -> tuple[int, list[str]]:
-    q, warnings = audience_query(db, filters)
+    """Index mode when enabled (and the filter constrains anything), else SQL."""
+    pf = compile_filters(filters)
+    if settings.ATTRIBUTE_INDEX_ENABLED and not pf.is_unconstrained:
+        bitmap = get_index().match(db, pf)
+        if exclude_user_id is not None:
+            bitmap &= ~(1 << exclude_user_id)
+        return bitmap.bit_count(), list(pf.warnings)
+
+    q = _audience(db, pf)
     if exclude_user_id is not None:
         q = q.filter(User.id != exclude_user_id)
-    return q.count(), warnings
+    return q.count(), list(pf.warnings)
+
+
+def preview_count(
+    db: Session,
+    filters: dict | None,
+    exclude_user_id: int | None = None,
+    approximate: bool = False,
+) -> tuple[int, list[str], str]:
+    """audience_count for the launch-wizard preview, plus where the number
+    came from: "sketch" (approximate, services/audience_sketches.py) when
+    asked for and the estimate is large enough to trust, else "counters"
+    (summed counter cells) when they support the filter, else "index" or
+    "sql". Everything but "sketch" is exact."""
+    pf = compile_filters(filters)
+    if approximate and not pf.is_unconstrained:
+        # exclude_user_id is one user — well inside the estimate's error
+        n = get_sketches().estimate(db, pf)
+        if n >= settings.AUDIENCE_SKETCH_MIN_COUNT:
+            return n, list(pf.warnings), "sketch"
+    counters = get_counters()
+    if settings.AUDIENCE_COUNTERS_ENABLED and counters.supports(pf):
+        n = counters.count(db, pf)
+        if exclude_user_id is not None and user_matches(db, filters, exclude_user_id)[0]:
+            n -= 1
+        return n, list(pf.warnings), "counters"
+    count, warnings = audience_count(db, filters, exclude_user_id)
+    indexed = settings.ATTRIBUTE_INDEX_ENABLED and not pf.is_unconstrained
+    return count, warnings, "index" if indexed else "sql"
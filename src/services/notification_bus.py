@@ -0,0 +1,77 @@
+# filepath: src/services/notification_bus.py
+
+"""In-process pub/sub for live notification streams (web client).
+
+The SSE and long-poll endpoints in routers/users.py subscribe per user id
+and sleep on an asyncio.Event; a committed Notification (db.events) sets
+the events of its user's subscribers, and only then does a stream query
+the ledger. An idle tab therefore costs no database work at all.
+
+Signals, not payloads: subscribers re-read rows after their last seen id,
+so a missed or coalesced wake-up loses nothing. Single-process like the
+other db.events consumers: rows committed by another worker reach a stream
+here only with the next local wake-up.
+"""
+
+import asyncio
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from db import events
+from db.models import Notification
+
+
+class Subscription:
+    def __init__(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.changed = asyncio.Event()
+
+
+class NotificationBus:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: dict[int, set[Subscription]] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._subscribers.clear()
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[Subscription]:
+        """Call from the event loop; the subscription ends with the block."""
+        sub = Subscription()
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(sub)
+        try:
+            yield sub
+        finally:
+            with self._lock:
+                subs = self._subscribers.get(user_id, set())
+                subs.discard(sub)
+                if not subs:
+                    self._subscribers.pop(user_id, None)
+
+    def publish(self, user_ids: Iterable[int]) -> None:
+        """Post-commit hook: these users have new rows. Safe from any thread."""
+        with self._lock:
+            subs = [s for uid in user_ids for s in self._subscribers.get(uid, ())]
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.changed.set)
+            except RuntimeError:  # loop already closed; the stream is gone
+                pass
+
+    def listeners(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+_bus = NotificationBus()
+
+
+def get_bus() -> NotificationBus:
+    return _bus
+
+
+events.subscribe(Notification, _bus.publish, key=lambda row: row.user_id)
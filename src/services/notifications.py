@@ -1,20 +1,27 @@
 # filepath: src/services/notifications.py
 
-"""Notification ledger + event fan-out (matching C7 + C9).
+"""Notification ledger + event notifications (matching C9; C7 fan-out is
+services/fanout.py).
 
 Every outbound message gets a ledger row first; dedupe_key makes events
-idempotent. Delivery failures mark the row failed and never break the
-request that triggered them.
+idempotent. With NOTIFY_DISPATCH=outbox (the default) the row is all a
+request writes — it stays pending and services/dispatcher.py sends it after
+the commit, so no request waits on a provider. Delivery failures mark the
+row failed and never break the request that triggered them.
 """
 
 import logging
+from dataclasses import dataclass
 
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from config import settings
+from db import events
 from db.base import utcnow
 from db.models import Jump, Notification, Task, User
-from services import matching
 from services.notifier import get_notifier
 
 logger = logging.getLogger(__name__)
@@ -24,6 +31,12 @@ JUMP_APPROVED = "✅ You were approved for task #{task_id}! Perform it and submi
 JUMP_REJECTED = "❌ The Launcher declined your application for task #{task_id}."
 JUMP_PENDING = "⏳ A Jumper applied to your task #{task_id} — approve or decline in /mytasks"
 TASK_FULL = "🔵 Your task #{task_id} is full — all {num_jumpers} slot(s) taken."
+TASK_MATCHED_DIGEST = "🐦 {count} new tasks for you:\n{lines}\nSee /browse"
+TASK_MATCHED_LINE = '• "{desc}" — earn {you_earn} USDT each'
+DIGEST_MAX_LINES = 10  # longer digests end with "…and N more"
+
+# coalesced per user by services/dispatcher.py (NOTIFY_DIGEST_WINDOW_SECONDS)
+DIGEST_EVENTS = ("task.matched",)
 
 
 def notify(
@@ -34,7 +47,7 @@ def notify(
     dedupe_key: str | None = None,
     payload: dict | None = None,
 ) -> Notification | None:
-    """Ledger + deliver. Returns None when deduped, the row otherwise."""
+    """Ledger (+ deliver when inline). Returns None when deduped, the row otherwise."""
     if dedupe_key is not None:
         exists = db.query(Notification).filter(Notification.dedupe_key == dedupe_key).first()
         if exists is not None:
@@ -53,36 +66,103 @@ def notify(
         row.status, row.skip_reason = "skipped", "no_channel"
         return row
 
-    chat_id = user.telegram_id or str(user.id)
-    try:
-        row.provider_ref = get_notifier().send(chat_id, text)
-        row.status = "sent"
-        row.sent_at = utcnow()
-    except Exception as e:  # delivery must never break the triggering request
-        logger.warning("Notification %s to user %s failed: %s", event_type, user.id, e)
-        row.status = "failed"
-    return row
-
-
-def fan_out_task_matched(db: Session, task: Task) -> int:
-    """Notify matched Jumpers on launch (C7), capped, newest accounts first."""
-    q, _warnings = matching.audience_query(db, task.filters)
-    recipients = (
-        q.filter(User.id != task.owner_id)
-        .order_by(User.created_at.desc(), User.id.desc())
-        .limit(settings.MATCH_NOTIFY_CAP)
-        .all()
-    )
-    for user in recipients:
-        notify(
-            db,
-            user,
-            "task.matched",
-            TASK_MATCHED.format(desc=task.desc[:80], you_earn=task.you_earn),
-            dedupe_key=f"task.matched:{task.id}:{user.id}",
-            payload={"task_id": task.id},
+    if settings.NOTIFY_DISPATCH == "inline":
+        row.provider_ref = deliver(chat_id_for(user), text)
+        if row.provider_ref is None:
+            row.status = "failed"
+        else:
+            row.status, row.sent_at = "sent", utcnow()
+    return row  # outbox: still pending, the dispatcher sends it after commit
+
+
+@dataclass(frozen=True)
+class Outgoing:
+    user: User
+    event_type: str
+    text: str
+    dedupe_key: str | None = None
+    payload: dict | None = None
+
+
+def notify_many(db: Session, batch: list[Outgoing]) -> list[int]:
+    """Bulk notify(): one INSERT ... ON CONFLICT (dedupe_key) DO NOTHING
+    RETURNING per few hundred rows instead of a SELECT + INSERT each.
+    Returns the ids of the rows actually inserted (deduped ones are not)."""
+    if not batch:
+        return []
+    now = utcnow()
+    rows = []
+    for item in batch:
+        status, skip_reason = "pending", None
+        if item.user.notifications_muted:
+            status, skip_reason = "skipped", "muted"
+        elif settings.NOTIFY_BACKEND == "telegram" and not item.user.telegram_id:
+            status, skip_reason = "skipped", "no_channel"
+        rows.append(
+            {
+                "user_id": item.user.id,
+                "event_type": item.event_type,
+                "text": item.text,
+                "payload": item.payload,
+                "dedupe_key": item.dedupe_key,
+                "status": status,
+                "skip_reason": skip_reason,
+                "created_at": now,
+            }
         )
-    return len(recipients)
+
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = (
+        insert(Notification)
+        .on_conflict_do_nothing(index_elements=[Notification.dedupe_key])
+        .returning(Notification.id, Notification.user_id, Notification.status, Notification.text)
+    )
+    inserted = db.execute(stmt, rows).all()
+    for row in inserted:
+        events.touch(db, row, Notification)
+
+    if settings.NOTIFY_DISPATCH == "inline":
+        users = {item.user.id: item.user for item in batch}
+        results = []
+        for row in inserted:
+            if row.status != "pending":
+                continue
+            ref = deliver(chat_id_for(users[row.user_id]), row.text)
+            results.append(
+                {"id": row.id, "status": "failed"}
+                if ref is None
+                else {"id": row.id, "status": "sent", "provider_ref": ref, "sent_at": utcnow()}
+            )
+        if results:
+            db.execute(update(Notification), results)
+    return [row.id for row in inserted]
+
+
+def chat_id_for(user: User) -> str:
+    return user.telegram_id or str(user.id)
+
+
+def deliver(chat_id: str, text: str) -> str | None:
+    """Send one message: the provider ref, or None when delivery failed."""
+    try:
+        return get_notifier().send(chat_id, text)
+    except Exception as e:  # delivery must never break the caller
+        logger.warning("Notification to chat %s failed: %s", chat_id, e)
+        return None
+
+
+def digest_text(db: Session, rows: list[Notification]) -> str:
+    """One task.matched message for several ledger rows of the same user."""
+    task_ids = [(r.payload or {}).get("task_id") for r in rows]
+    tasks = {t.id: t for t in db.query(Task).filter(Task.id.in_(task_ids))}
+    listed = [tasks[tid] for tid in task_ids if tid in tasks]  # the count matches the lines
+    lines = [
+        TASK_MATCHED_LINE.format(desc=t.desc[:80], you_earn=t.you_earn)
+        for t in listed[:DIGEST_MAX_LINES]
+    ]
+    if len(listed) > DIGEST_MAX_LINES:
+        lines.append(f"…and {len(listed) - DIGEST_MAX_LINES} more")
+    return TASK_MATCHED_DIGEST.format(count=len(listed), lines="\n".join(lines))
 
 
 def notify_jump_pending(db: Session, task: Task, jump: Jump) -> None:
@@ -4,10 +4,19 @@
 
 - console (default): logs + records to an outbox tests can read.
 - telegram: the API process sends DIRECTLY via the Bot API (httpx) — the
-  bot process stays a pure client and is not involved in delivery.
+  bot process stays a pure client and is not involved in delivery. One
+  shared backend per process: a pooled keep-alive client, a global token
+  bucket (TELEGRAM_RATE_PER_SECOND) plus per-chat spacing, a process-wide
+  pause on 429 retry_after, and retries with backoff for transient
+  failures. A blocked recipient (403) and other 4xx are permanent.
 """
 
 import logging
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
 from dataclasses import dataclass
 
 import httpx
@@ -44,29 +53,145 @@ class ConsoleNotifierBackend:
         cls.outbox.clear()
 
 
+class TokenBucket:
+    """Thread-safe token bucket; reserve() says how long the caller must wait.
+
+    Tokens may go negative: each reservation queues behind the previous ones,
+    so concurrent senders are spread at `rate` instead of all retrying at once.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self._rate, self._burst, self._clock = rate, burst, clock
+        self._tokens = float(burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self._burst, self._tokens + (now - self._last) * self._rate)
+            self._last = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+
+
+class ChatPacer:
+    """Minimum spacing between messages to the same chat."""
+
+    _PRUNE_AT = 10_000  # tracked chats before past reservations are dropped
+
+    def __init__(self, interval: float, clock: Callable[[], float] = time.monotonic):
+        self._interval, self._clock = interval, clock
+        self._next: dict[str, float] = {}  # chat id -> earliest next send
+        self._lock = threading.Lock()
+
+    def reserve(self, chat_id: str, not_before: float = 0.0) -> float:
+        """Wait before sending to chat_id, given the caller must already wait
+        not_before seconds; spacing is counted from that actual send time."""
+        with self._lock:
+            now = self._clock()
+            if len(self._next) >= self._PRUNE_AT:
+                self._next = {c: t for c, t in self._next.items() if t > now}
+            at = max(now + not_before, self._next.get(chat_id, now))
+            self._next[chat_id] = at + self._interval
+            return at - now
+
+
 class TelegramNotifierBackend:
-    def __init__(self, bot_token: str):
-        self._url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+    def __init__(
+        self,
+        bot_token: str,
+        *,
+        transport: httpx.BaseTransport | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.bot_token = bot_token
+        self._client = httpx.Client(
+            base_url=f"{settings.TELEGRAM_API_BASE}/bot{bot_token}",
+            timeout=httpx.Timeout(15.0, connect=5.0),
+            limits=httpx.Limits(
+                max_connections=settings.TELEGRAM_POOL_SIZE,
+                max_keepalive_connections=settings.TELEGRAM_POOL_SIZE,
+            ),
+            transport=transport,
+        )
+        self._sleep, self._clock = sleep, clock
+        self._bucket = TokenBucket(
+            settings.TELEGRAM_RATE_PER_SECOND, settings.TELEGRAM_BURST, clock
+        )
+        self._pacer = ChatPacer(settings.TELEGRAM_CHAT_INTERVAL_SECONDS, clock)
+        self._paused_until = 0.0  # clock() deadline of the last 429 retry_after
+        self.stats: Counter[str] = Counter()  # sent | retried | rate_limited | failed
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _wait_turn(self, chat_id: str) -> None:
+        wait = max(self._bucket.reserve(), self._paused_until - self._clock())
+        wait = self._pacer.reserve(chat_id, not_before=wait)
+        if wait > 0:
+            self._sleep(wait)
+
+    def _pause(self, seconds: float) -> None:
+        # retry_after applies to the bot, not the chat: hold every sender
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return min(8.0, 0.5 * 2**attempt) * random.uniform(0.5, 1.0)
 
     def send(self, chat_id: str, text: str) -> str:
-        try:
-            r = httpx.post(
-                self._url,
-                json={"chat_id": chat_id, "text": text, "parse_mode": "HTML"},
-                timeout=15.0,
-            )
-        except httpx.HTTPError as e:
-            raise NotifyDeliveryError(f"Telegram unreachable: {e}") from None
-        if r.status_code == 403:
-            raise RecipientBlockedError(chat_id)
-        if r.status_code >= 400:
-            raise NotifyDeliveryError(f"Telegram error {r.status_code}: {r.text[:200]}")
-        return str(r.json()["result"]["message_id"])
+        error: NotifyDeliveryError | None = None
+        for attempt in range(settings.TELEGRAM_MAX_RETRIES + 1):
+            if attempt:
+                self.stats["retried"] += 1
+            self._wait_turn(chat_id)
+            try:
+                r = self._client.post(
+                    "/sendMessage",
+                    json={"chat_id": chat_id, "text": text, "parse_mode": "HTML"},
+                )
+            except httpx.HTTPError as e:
+                error = NotifyDeliveryError(f"Telegram unreachable: {e}")
+                self._sleep(self._backoff(attempt))
+                continue
+            if r.status_code == 200:
+                self.stats["sent"] += 1
+                return str(r.json()["result"]["message_id"])
+            if r.status_code == 403:
+                self.stats["failed"] += 1
+                raise RecipientBlockedError(chat_id)
+            error = NotifyDeliveryError(f"Telegram error {r.status_code}: {r.text[:200]}")
+            if r.status_code == 429:
+                self.stats["rate_limited"] += 1
+                self._pause(_retry_after(r))
+            elif r.status_code >= 500:
+                self._sleep(self._backoff(attempt))
+            else:
+                break  # other 4xx (bad chat id, bad markup): retrying won't help
+        self.stats["failed"] += 1
+        raise error
+
+
+def _retry_after(r: httpx.Response) -> float:
+    try:
+        return float(r.json()["parameters"]["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return 1.0
+
+
+_telegram: TelegramNotifierBackend | None = None
+_telegram_lock = threading.Lock()
 
 
 def get_notifier():
+    global _telegram
     if settings.NOTIFY_BACKEND == "telegram":
         if not settings.BOT_TOKEN:
             raise NotifyDeliveryError("NOTIFY_BACKEND=telegram but BOT_TOKEN is not set")
-        return TelegramNotifierBackend(settings.BOT_TOKEN)
+        with _telegram_lock:  # one pooled client and one rate limit per process
+            if _telegram is None or _telegram.bot_token != settings.BOT_TOKEN:
+                _telegram = TelegramNotifierBackend(settings.BOT_TOKEN)
+            return _telegram
     return ConsoleNotifierBackend()
@@ -0,0 +1,138 @@
+# filepath: src/services/rate_limiter.py
+
+"""Clarifier run rate cap (BOM §0 token-abuse guard): at most
+CLARIFIER_RUNS_PER_USER_PER_HOUR runs per owner in any rolling hour, 429
+beyond.
+
+Checked first on every submission, before the content hash or the cached
+run lookup. A submission takes a slot up front; one that turns out to need
+no new run (identical content already recorded, or refused as busy) gives
+it back, so only recorded runs count — as before.
+
+Backends (CLARIFIER_RATE_LIMITER):
+
+- "memory": a sliding log per owner — the start times of their last
+  limit-many runs, oldest first. A check drops expired entries from the
+  front and compares the length to the limit: O(1) amortized, no database,
+  and taking the slot is atomic, so a burst of concurrent submissions
+  cannot overshoot. Per-process and forgotten on restart: with N workers an
+  owner can get up to N x limit.
+- "db": counts the owner's runs of the last hour in clarifier_runs — exact
+  across processes, one JOIN + COUNT per submission; concurrent submissions
+  may each see room for the last slot.
+
+Another backend implements acquire / release / reset / stats and is
+returned by get_limiter().
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from datetime import timedelta
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.base import utcnow
+from db.models import ClarifierRun, TaskDraft
+
+WINDOW_SECONDS = 3600.0
+_SWEEP_EVERY = 1024  # acquires between sweeps of idle owners
+
+
+def _limited(retry_after: float | None = None) -> HTTPException:
+    headers = {"Retry-After": str(max(1, math.ceil(retry_after)))} if retry_after else None
+    return HTTPException(
+        status.HTTP_429_TOO_MANY_REQUESTS,
+        "Clarifier rate cap reached — try again in a bit.",
+        headers=headers,
+    )
+
+
+class MemoryRateLimiter:
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._logs: dict[int, deque[float]] = {}
+        self._since_sweep = 0
+        self._counts = {"allowed": 0, "limited": 0, "released": 0}
+
+    def acquire(self, db: Session, owner_id: int) -> None:
+        """Take one of owner_id's slots or raise 429 (with Retry-After)."""
+        limit = settings.CLARIFIER_RUNS_PER_USER_PER_HOUR
+        with self._lock:
+            now = self._clock()
+            self._since_sweep += 1
+            if self._since_sweep >= _SWEEP_EVERY:
+                self._sweep(now)
+            log = self._logs.setdefault(owner_id, deque())
+            while log and log[0] <= now - WINDOW_SECONDS:
+                log.popleft()
+            while len(log) > limit:  # the limit was lowered meanwhile
+                log.popleft()
+            if len(log) >= limit:
+                self._counts["limited"] += 1
+                raise _limited(log[0] + WINDOW_SECONDS - now if log else WINDOW_SECONDS)
+            log.append(now)
+            self._counts["allowed"] += 1
+
+    def release(self, owner_id: int) -> None:
+        """Give back the slot acquire() took: no run was recorded for it."""
+        with self._lock:
+            log = self._logs.get(owner_id)
+            if log:
+                log.pop()
+                self._counts["released"] += 1
+
+    def _sweep(self, now: float) -> None:
+        self._since_sweep = 0
+        cutoff = now - WINDOW_SECONDS
+        for owner_id in [o for o, log in self._logs.items() if not log or log[-1] <= cutoff]:
+            del self._logs[owner_id]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._logs.clear()
+            self._since_sweep = 0
+            self._counts = dict.fromkeys(self._counts, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "owners": len(self._logs), **self._counts}
+
+
+class DbRateLimiter:
+    """CLARIFIER_RATE_LIMITER=db: the recorded runs are the log."""
+
+    def acquire(self, db: Session, owner_id: int) -> None:
+        cutoff = utcnow() - timedelta(seconds=WINDOW_SECONDS)
+        n = (
+            db.query(ClarifierRun)
+            .join(TaskDraft, ClarifierRun.draft_id == TaskDraft.id)
+            .filter(TaskDraft.owner_id == owner_id, ClarifierRun.created_at >= cutoff)
+            .count()
+        )
+        if n >= settings.CLARIFIER_RUNS_PER_USER_PER_HOUR:
+            raise _limited()
+
+    def release(self, owner_id: int) -> None:
+        pass
+
+    def reset(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "db"}
+
+
+_memory = MemoryRateLimiter()
+_db = DbRateLimiter()
+
+
+def get_limiter() -> MemoryRateLimiter | DbRateLimiter:
+    if settings.CLARIFIER_RATE_LIMITER == "db":
+        return _db
+    return _memory
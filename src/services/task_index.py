@@ -0,0 +1,217 @@
+# filepath: src/services/task_index.py
+
+"""Reverse matching index: which tasks can this viewer see (matching C3).
+
+Tasks are bucketed per filter dimension — gender value, location (city or
+country named by any entry), birth-year band — plus an "unconstrained"
+bucket per dimension. A viewer's candidates are the intersection over
+dimensions of (unconstrained ∪ buckets the snapshot hits). Buckets only
+ever over-approximate, so every candidate still goes through
+matching.unmet_requirements: the feed is exactly what a full scan would
+return, with no scan window.
+
+Kept fresh from db.events (any committed Task change re-reads that task on
+the next lookup) and rebuilt when the date changes, since age bounds are
+relative to today.
+"""
+
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from db import events
+from db.models import Task
+from services import matching
+from services.attributes import FIELD_BIRTH_DATE, FIELD_CITY, FIELD_COUNTRY, FIELD_GENDER
+
+_REFRESH_CHUNK = 500
+_YEAR_FLOOR = 1900  # birth years are clamped into [floor, this year + 1]
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def sort_key(creation_date: datetime, task_id: int) -> tuple[int, int]:
+    """Feed order key: (epoch microseconds, id). Naive datetimes (SQLite) are UTC."""
+    if creation_date.tzinfo is None:
+        creation_date = creation_date.replace(tzinfo=UTC)
+    return (creation_date - _EPOCH) // timedelta(microseconds=1), task_id
+
+
+def from_sort_key(key: tuple[int, int]) -> tuple[datetime, int]:
+    return _EPOCH + timedelta(microseconds=key[0]), key[1]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    id: int
+    sort_key: tuple[int, int]
+    status: str
+    category: str | None
+    you_earn: float
+    pf: matching.ParsedFilters
+
+
+def _clamp_year(year: int) -> int:
+    return min(max(year, _YEAR_FLOOR), date.today().year + 1)
+
+
+def _birth_year(value: str) -> int | None:
+    try:
+        return _clamp_year(int(value[:4])) if len(value) == 10 else None
+    except ValueError:
+        return None
+
+
+class TaskIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._built_on: date | None = None
+        self._dirty: set[int] = set()
+        self._entries: dict[int, _Entry] = {}
+        # dimension -> bucket key -> task ids; key None = unconstrained
+        self._buckets: dict[str, dict[object, set[int]]] = {
+            "gender": defaultdict(set),
+            "location": defaultdict(set),
+            "age": defaultdict(set),
+        }
+
+    # --- maintenance -----------------------------------------------------
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def mark_stale(self, task_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._dirty.update(task_ids)
+
+    @staticmethod
+    def _keys(pf: matching.ParsedFilters) -> dict[str, list]:
+        keys: dict[str, list] = {
+            "gender": [pf.gender] if pf.gender else [None],
+            "location": [None],
+            "age": [None],
+        }
+        if pf.has_location:
+            keys["location"] = [(FIELD_CITY, c) for c in pf.cities] + [
+                (FIELD_COUNTRY, c) for c, _excluded in pf.countries
+            ]
+        if pf.birth_earliest or pf.birth_latest:
+            lo = _clamp_year(int(pf.birth_earliest[:4])) if pf.birth_earliest else _YEAR_FLOOR
+            hi = _clamp_year(int(pf.birth_latest[:4])) if pf.birth_latest else _clamp_year(9999)
+            # "*" collects every age-constrained task for births that aren't ISO dates
+            keys["age"] = ["*", *range(lo, hi + 1)]
+        return keys
+
+    def _place(self, entry: _Entry, on: bool) -> None:
+        for dimension, keys in self._keys(entry.pf).items():
+            buckets = self._buckets[dimension]
+            for key in keys:
+                if on:
+                    buckets[key].add(entry.id)
+                else:
+                    buckets[key].discard(entry.id)
+                    if not buckets[key]:
+                        del buckets[key]
+
+    def _load(self, db: Session, ids: list[int] | None = None) -> None:
+        q = db.query(
+            Task.id, Task.creation_date, Task.status, Task.category, Task.you_earn, Task.filters
+        )
+        if ids is not None:
+            q = q.filter(Task.id.in_(ids))
+        for task_id, created, status, category, you_earn, filters in q.yield_per(1000):
+            entry = _Entry(
+                task_id,
+                sort_key(created, task_id),
+                status,
+                category,
+                you_earn,
+                matching.compile_filters(filters),
+            )
+            self._entries[task_id] = entry
+            self._place(entry, on=True)
+
+    def _ensure_current(self, db: Session) -> None:
+        if self._built_on != date.today():
+            self._clear()
+            self._load(db)
+            self._built_on = date.today()
+            return
+        if not self._dirty:
+            return
+        dirty = sorted(self._dirty)
+        self._dirty.clear()
+        for task_id in dirty:
+            old = self._entries.pop(task_id, None)
+            if old is not None:
+                self._place(old, on=False)
+        for start in range(0, len(dirty), _REFRESH_CHUNK):
+            self._load(db, dirty[start : start + _REFRESH_CHUNK])
+
+    # --- lookup ------------------------------------------------------------
+
+    def _candidates(self, snapshot: dict[str, set[str]]) -> set[int]:
+        wanted = {
+            "gender": [None, *snapshot.get(FIELD_GENDER, ())],
+            "location": [
+                None,
+                *((FIELD_CITY, c) for c in snapshot.get(FIELD_CITY, ())),
+                *((FIELD_COUNTRY, c) for c in snapshot.get(FIELD_COUNTRY, ())),
+            ],
+            "age": [None],
+        }
+        for value in snapshot.get(FIELD_BIRTH_DATE, ()):
+            wanted["age"].append(_birth_year(value) or "*")
+
+        result: set[int] | None = None
+        for dimension, keys in wanted.items():
+            buckets = self._buckets[dimension]
+            hit: set[int] = set()
+            for key in keys:
+                hit |= buckets.get(key, set())
+            result = hit if result is None else result & hit
+        return result or set()
+
+    def eligible(
+        self,
+        db: Session,
+        snapshot: dict[str, set[str]],
+        *,
+        status_filter: str | None = None,
+        category: str | None = None,
+        min_you_earn: float | None = None,
+        after: tuple[int, int] | None = None,
+    ) -> Iterator[int]:
+        """Ids of tasks the snapshot passes, newest first, strictly after the
+        `after` sort key. Lazy: residual checks run only as far as the caller
+        consumes, so a keyset page costs about one page of checks."""
+        with self._lock:
+            self._ensure_current(db)
+            entries = [self._entries[i] for i in self._candidates(snapshot)]
+        entries = [
+            e
+            for e in entries
+            if (status_filter is None or e.status == status_filter)
+            and (category is None or e.category == category)
+            and (min_you_earn is None or e.you_earn >= min_you_earn)
+            and (after is None or e.sort_key < after)
+        ]
+        entries.sort(key=lambda e: e.sort_key, reverse=True)
+        return (e.id for e in entries if not matching.unmet_requirements(e.pf, snapshot))
+
+
+_index = TaskIndex()
+
+
+def get_index() -> TaskIndex:
+    return _index
+
+
+events.subscribe(Task, _index.mark_stale, key=lambda task: task.id)
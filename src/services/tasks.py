@@ -1,14 +1,21 @@
 # filepath: src/services/tasks.py
 
+import base64
+import binascii
+from collections.abc import Iterator
+from itertools import islice
+
 from fastapi import HTTPException, status
-from sqlalchemy import func
+from sqlalchemy import and_, case, or_, update
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from config import settings
+from db import events
 from db.base import utcnow
 from db.models import Jump, JumpStatus, Task, TaskStatus, User
 from schemas.task import TaskCreate
-from services import matching
+from services import feed_cache, matching, task_index
 from services.attributes import load_snapshot
 
 # Jump states that consume a Jumper slot.
@@ -45,6 +52,22 @@ def get_task(db: Session, task_id: int) -> Task:
     return task
 
 
+def encode_cursor(task: Task) -> str:
+    """Opaque keyset cursor: the feed sort key (creation_date, id) of the last
+    item served. Kept short — the bot carries it in 64-byte callback data."""
+    micros, task_id = task_index.sort_key(task.creation_date, task.id)
+    return base64.urlsafe_b64encode(f"{micros}.{task_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        micros, _, task_id = raw.partition(".")
+        return int(micros), int(task_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, "Invalid cursor") from None
+
+
 def browse_tasks(
     db: Session,
     *,
@@ -54,7 +77,48 @@ def browse_tasks(
     min_you_earn: float | None = None,
     page: int = 1,
     size: int = 20,
-) -> tuple[list[Task], int]:
+    cursor: str | None = None,
+) -> tuple[list[Task], int | None, str | None]:
+    """One page of the feed plus (total, next_cursor).
+
+    With a cursor the page resumes strictly after it and total is None —
+    nothing is counted or evaluated past the page. next_cursor is None on
+    the last page.
+    """
+    after = decode_cursor(cursor) if cursor is not None else None
+    if viewer_id is not None:
+        # Eligible feed (matching C3): per-task filters mean eligibility can't
+        # be one WHERE clause — load the viewer's snapshot once, look up the
+        # candidate tasks in the reverse index, then paginate the eligible ids.
+        # The full list is cached per viewer so paging on is a lookup.
+        def eligible(after: tuple[int, int] | None = None) -> Iterator[int]:
+            return task_index.get_index().eligible(
+                db,
+                load_snapshot(db, viewer_id),
+                status_filter=status_filter,
+                category=category,
+                min_you_earn=min_you_earn,
+                after=after,
+            )
+
+        cache = feed_cache.get_cache()
+        key = (viewer_id, status_filter, category, min_you_earn, settings.MATCH_CONFIDENCE_MIN)
+        if after is None:
+            entry = cache.load(key, eligible)
+            total = len(entry.ids)
+            ids = entry.ids[(page - 1) * size : page * size + 1]
+        else:
+            total = None
+            entry = cache.get(key)
+            pos = entry.positions.get(after[1]) if entry is not None else None
+            if pos is not None:
+                ids = entry.ids[pos + 1 : pos + size + 2]
+            else:  # cold cursor: resume lazily, evaluating only this page
+                ids = tuple(islice(eligible(after), size + 1))
+        items = _load_ordered(db, list(ids[:size]))
+        return items, total, encode_cursor(items[-1]) if len(ids) > size and items else None
+
+    # unfiltered path (internal callers)
     q = db.query(Task)
     if status_filter is not None:
         q = q.filter(Task.status == status_filter)
@@ -62,23 +126,30 @@ def browse_tasks(
         q = q.filter(Task.category == category)
     if min_you_earn is not None:
         q = q.filter(Task.you_earn >= min_you_earn)
-    q = q.order_by(Task.creation_date.desc(), Task.id.desc())
+    if after is not None:
+        created, task_id = task_index.from_sort_key(after)
+        keyset = q.filter(
+            or_(
+                Task.creation_date < created,
+                and_(Task.creation_date == created, Task.id < task_id),
+            )
+        )
+        rows = keyset.order_by(Task.creation_date.desc(), Task.id.desc()).limit(size + 1).all()
+        total = None
+    else:
+        ordered = q.order_by(Task.creation_date.desc(), Task.id.desc())
+        rows = ordered.offset((page - 1) * size).limit(size + 1).all()
+        total = q.count()
+    items = rows[:size]
+    return items, total, encode_cursor(items[-1]) if len(rows) > size else None
 
-    if viewer_id is None:
-        # unfiltered path (internal callers)
-        return q.offset((page - 1) * size).limit(size).all(), q.count()
 
-    # Eligible feed (matching C3): per-task filters mean eligibility can't be
-    # one WHERE clause — load the viewer's snapshot once, evaluate in Python
-    # over a bounded scan, then paginate the eligible list.
-    candidates = q.limit(settings.BROWSE_SCAN_LIMIT).all()
-    snapshot = load_snapshot(db, viewer_id)
-    eligible = [
-        t
-        for t in candidates
-        if not matching.unmet_requirements(matching.parse_filters(t.filters), snapshot)
-    ]
-    return eligible[(page - 1) * size : page * size], len(eligible)
+def _load_ordered(db: Session, task_ids: list[int]) -> list[Task]:
+    """Tasks by primary key, in the order given."""
+    if not task_ids:
+        return []
+    by_id = {t.id: t for t in db.query(Task).filter(Task.id.in_(task_ids))}
+    return [by_id[i] for i in task_ids if i in by_id]
 
 
 def my_tasks(db: Session, owner_id: int) -> list[Task]:
@@ -100,12 +171,56 @@ def participated(db: Session, jumper_id: int) -> list[Jump]:
     )
 
 
-def _occupied_slots(db: Session, task_id: int) -> int:
-    return (
-        db.query(func.count(Jump.id))
-        .filter(Jump.task_id == task_id, Jump.status.in_(_SLOT_STATES))
-        .scalar()
-    )
+def _claim_slot(db: Session, task: Task, *where) -> bool:
+    """Compare-and-increment occupied_slots against num_jumpers in one UPDATE;
+    the task flips to full with the last slot. False = no slot left (or an
+    extra where condition failed). Two racing requests can never both take
+    the last slot, whatever they read before."""
+    row = db.execute(
+        update(Task)
+        .where(Task.id == task.id, Task.occupied_slots < Task.num_jumpers, *where)
+        .values(
+            occupied_slots=Task.occupied_slots + 1,
+            status=case(
+                (Task.occupied_slots + 1 >= Task.num_jumpers, TaskStatus.FULL.value),
+                else_=Task.status,
+            ),
+        )
+        .returning(Task.occupied_slots, Task.status)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        return False
+    _sync_slots(db, task, *row)
+    return True
+
+
+def _release_slot(db: Session, task: Task) -> None:
+    """Give a slot back; a freed slot reopens a full task."""
+    row = db.execute(
+        update(Task)
+        .where(Task.id == task.id, Task.occupied_slots > 0)
+        .values(
+            occupied_slots=Task.occupied_slots - 1,
+            status=case(
+                (Task.status == TaskStatus.FULL.value, TaskStatus.OPEN.value),
+                else_=Task.status,
+            ),
+        )
+        .returning(Task.occupied_slots, Task.status)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is not None:
+        _sync_slots(db, task, *row)
+
+
+def _sync_slots(db: Session, task: Task, occupied: int, task_status: str) -> None:
+    # the UPDATE bypassed the unit of work: mirror it onto the loaded task
+    # without dirtying it, and tell the post-commit feed the task changed
+    changed = ["occupied_slots"] if task.status == task_status else ["occupied_slots", "status"]
+    set_committed_value(task, "occupied_slots", occupied)
+    set_committed_value(task, "status", task_status)
+    events.touch(db, task, changed=changed)
 
 
 def jump_on_task(db: Session, task: Task, jumper: User) -> Jump:
@@ -129,7 +244,8 @@ def jump_on_task(db: Session, task: Task, jumper: User) -> Jump:
     if task.accept_jumpers_manually:
         jump = Jump(task_id=task.id, jumper_id=jumper.id, status=JumpStatus.PENDING.value)
     else:
-        if _occupied_slots(db, task.id) >= task.num_jumpers:
+        # re-check openness in the UPDATE too: task may be a stale read
+        if not _claim_slot(db, task, Task.status == TaskStatus.OPEN.value):
             raise HTTPException(status.HTTP_409_CONFLICT, "Task is full")
         jump = Jump(
             task_id=task.id,
@@ -139,9 +255,6 @@ def jump_on_task(db: Session, task: Task, jumper: User) -> Jump:
         )
     db.add(jump)
     db.flush()
-
-    if _occupied_slots(db, task.id) >= task.num_jumpers:
-        task.status = TaskStatus.FULL.value
     return jump
 
 
@@ -179,15 +292,12 @@ def approve_jump(db: Session, task: Task, owner: User, jump_id: int) -> Jump:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Jump not found")
     if jump.status != JumpStatus.PENDING.value:
         raise HTTPException(status.HTTP_409_CONFLICT, f"Jump is {jump.status}, not pending")
-    if _occupied_slots(db, task.id) >= task.num_jumpers:
+    if not _claim_slot(db, task):
         raise HTTPException(status.HTTP_409_CONFLICT, "Task is full")
 
     jump.status = JumpStatus.ACTIVE.value
     jump.approved_at = utcnow()
     db.flush()
-
-    if _occupied_slots(db, task.id) >= task.num_jumpers:
-        task.status = TaskStatus.FULL.value
     return jump
 
 
@@ -198,11 +308,11 @@ def forfeit_jump(db: Session, task: Task, jumper: User) -> Jump:
     if jump.status not in (JumpStatus.PENDING.value, JumpStatus.ACTIVE.value):
         raise HTTPException(status.HTTP_409_CONFLICT, f"Cannot forfeit a {jump.status} jump")
 
+    held_slot = jump.status in _SLOT_STATES
     jump.status = JumpStatus.FORFEITED.value
     jump.resolved_at = utcnow()
     db.flush()
 
-    # A freed slot reopens a full task.
-    if task.status == TaskStatus.FULL.value and _occupied_slots(db, task.id) < task.num_jumpers:
-        task.status = TaskStatus.OPEN.value
+    if held_slot:
+        _release_slot(db, task)
     return jump
@@ -0,0 +1,174 @@
+# filepath: src/services/vector_match.py
+
+"""Vectorized snapshot mode over a NumPy attribute matrix (matching concept 1).
+
+For re-matching one filter against a whole population: each user is a row
+of integer codes — gender, country and city as vocabulary codes (-1 =
+missing), birth_date as YYYYMMDD (ordering of ISO strings and of these
+integers is the same) — and a ParsedFilters becomes a few vectorized
+comparisons and isin() masks instead of one unmet_requirements call per
+user.
+
+Results are identical to unmet_requirements by construction: users the
+codes can't represent exactly (several current values for one field, a
+birth_date that isn't a plain ISO date) keep their snapshot and are
+evaluated by unmet_requirements itself.
+
+numpy is an optional dependency, lazy-imported: this module stays
+importable without it; building a matrix is what needs it.
+"""
+
+import re
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from sqlalchemy.orm import Session
+
+from db.models import VerificationData
+from services.attributes import (
+    FIELD_BIRTH_DATE,
+    FIELD_CITY,
+    FIELD_COUNTRY,
+    FIELD_GENDER,
+    SnapshotColumns,
+    current_confident,
+    load_snapshots,
+)
+from services.matching import ParsedFilters, unmet_requirements
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_CODED = (FIELD_GENDER, FIELD_COUNTRY, FIELD_CITY)
+_MISSING = -1
+
+
+def _numpy():
+    import numpy  # lazy: optional dependency
+
+    return numpy
+
+
+def _birth_code(value: str) -> int:
+    return int(value[:4] + value[5:7] + value[8:10])
+
+
+class AttributeMatrix:
+    """Columnar snapshot of a population; evaluate filters with match()."""
+
+    def __init__(
+        self,
+        user_ids: "np.ndarray",
+        codes: dict[str, "np.ndarray"],
+        births: "np.ndarray",
+        vocab: dict[str, dict[str, int]],
+        overflow: dict[int, dict[str, frozenset[str]]],
+    ) -> None:
+        self.user_ids = user_ids
+        self._codes = codes
+        self._births = births
+        self._vocab = vocab
+        self._overflow = overflow  # row -> snapshot, for rows codes can't represent
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    @classmethod
+    def from_snapshots(cls, chunks: Iterable[SnapshotColumns]) -> "AttributeMatrix":
+        np = _numpy()
+        vocab: dict[str, dict[str, int]] = {field: {} for field in _CODED}
+        user_ids: list[int] = []
+        codes: dict[str, list[int]] = {field: [] for field in _CODED}
+        births: list[int] = []
+        overflow: dict[int, dict[str, frozenset[str]]] = {}
+
+        for chunk in chunks:
+            base = len(user_ids)
+            user_ids.extend(chunk.user_ids)
+            for field in _CODED:
+                column = chunk.columns.get(field)
+                out = codes[field]
+                if column is None:
+                    out.extend([_MISSING] * len(chunk))
+                    continue
+                values = vocab[field]
+                for i, vs in enumerate(column):
+                    if not vs:
+                        out.append(_MISSING)
+                    elif len(vs) == 1:
+                        out.append(values.setdefault(next(iter(vs)), len(values)))
+                    else:
+                        out.append(_MISSING)
+                        overflow[base + i] = chunk.snapshot(i)
+            column = chunk.columns.get(FIELD_BIRTH_DATE)
+            for i in range(len(chunk)):
+                vs = column[i] if column is not None else ()
+                if not vs:
+                    births.append(_MISSING)
+                    continue
+                value = next(iter(vs))
+                if len(vs) == 1 and _ISO_DATE.fullmatch(value):
+                    births.append(_birth_code(value))
+                else:
+                    births.append(_MISSING)
+                    overflow[base + i] = chunk.snapshot(i)
+
+        return cls(
+            np.array(user_ids, dtype=np.int64),
+            {field: np.array(col, dtype=np.int32) for field, col in codes.items()},
+            np.array(births, dtype=np.int32),
+            vocab,
+            overflow,
+        )
+
+    @classmethod
+    def load(cls, db: Session, chunk_size: int = 10_000) -> "AttributeMatrix":
+        """Every user with at least one current, confident attribute."""
+        ids = (
+            user_id
+            for (user_id,) in db.query(VerificationData.user_id)
+            .filter(*current_confident())
+            .distinct()
+        )
+        return cls.from_snapshots(load_snapshots(db, ids, chunk_size))
+
+    # --- evaluation --------------------------------------------------------
+
+    def _isin(self, field: str, values: Iterable[str]) -> "np.ndarray":
+        np = _numpy()
+        wanted = [self._vocab[field][v] for v in values if v in self._vocab[field]]
+        if not wanted:
+            return np.zeros(len(self), dtype=bool)
+        if len(wanted) == 1:
+            return self._codes[field] == wanted[0]
+        return np.isin(self._codes[field], wanted)
+
+    def mask(self, pf: ParsedFilters) -> "np.ndarray":
+        """Boolean row mask: True where unmet_requirements(pf, row) is empty."""
+        np = _numpy()
+        ok = np.ones(len(self), dtype=bool)
+        if pf.gender:
+            ok &= self._isin(FIELD_GENDER, (pf.gender,))
+        if pf.birth_latest or pf.birth_earliest:
+            births = self._births
+            ok &= births != _MISSING
+            if pf.birth_latest:
+                ok &= births <= _birth_code(pf.birth_latest)
+            if pf.birth_earliest:
+                ok &= births >= _birth_code(pf.birth_earliest)
+        if pf.has_location:
+            location = self._isin(FIELD_CITY, pf.cities)
+            location |= self._isin(FIELD_COUNTRY, pf.free_countries)
+            for country, excluded in pf.excepted_countries:
+                location |= self._isin(FIELD_COUNTRY, (country,)) & ~self._isin(
+                    FIELD_CITY, excluded
+                )
+            ok &= location
+        for row, snapshot in self._overflow.items():
+            ok[row] = not unmet_requirements(pf, snapshot)
+        return ok
+
+    def match(self, pf: ParsedFilters) -> "np.ndarray":
+        """Ids of matching users, ascending."""
+        return self.user_ids[self.mask(pf)]
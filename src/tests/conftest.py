@@ -8,25 +8,54 @@ _TMPDIR = tempfile.mkdtemp(prefix="cj_test_")
 os.environ["DATABASE_URL"] = f"sqlite:///{_TMPDIR}/test.db"
 os.environ.setdefault("SECRET_KEY", "test-secret-key-not-for-production-0000000000")
 os.environ.setdefault("BOT_BRIDGE_SECRET", "test-bridge-secret")
+# Deliver inside the request so tests see sent rows; outbox tests opt in.
+os.environ["NOTIFY_DISPATCH"] = "inline"
 
 import pytest  # noqa: E402
 from fastapi.testclient import TestClient  # noqa: E402
 
 import db.models  # noqa: F401, E402  (register tables on Base.metadata)
 from app import app  # noqa: E402
+from db import query_stats  # noqa: E402
 from db.base import Base  # noqa: E402
 from db.engine import SessionLocal, engine  # noqa: E402
+from services import (  # noqa: E402
+    admission,
+    attribute_index,
+    audience_counters,
+    audience_sketches,
+    audit,
+    clarifier_backend,
+    clarifier_runner,
+    feed_cache,
+    notification_bus,
+    rate_limiter,
+    task_index,
+)
 
 Base.metadata.create_all(engine)
 
 
 @pytest.fixture(autouse=True)
 def _clean_db():
-    """Each test starts from an empty database."""
+    """Each test starts from an empty database (and empty in-process indexes,
+    which the raw table deletes below bypass)."""
     yield
+    clarifier_runner.get_runner().wait_idle(timeout=10)  # no writes after the wipe
     with engine.begin() as conn:
         for table in reversed(Base.metadata.sorted_tables):
             conn.execute(table.delete())
+    attribute_index.get_index().reset()
+    audience_counters.get_counters().reset()
+    audience_sketches.get_sketches().reset()
+    task_index.get_index().reset()
+    feed_cache.get_cache().reset()
+    admission.get_admission().reset()
+    notification_bus.get_bus().reset()
+    audit.get_writer().reset()
+    query_stats.get_metrics().reset()
+    clarifier_backend.reset_guard()
+    rate_limiter.get_limiter().reset()
 
 
 @pytest.fixture()
@@ -52,3 +81,17 @@ def register(client):
         return {"Authorization": f"Bearer {pair['access_token']}"}, pair
 
     return _register
+
+
+@pytest.fixture()
+def query_budget(client):
+    """Returns a helper: query_budget(budget, method, url, **kw) -> response,
+    failing when the request runs more than budget SQL statements."""
+
+    def _request(budget: int, method: str, url: str, **kwargs):
+        r = client.request(method, url, **kwargs)
+        used = int(r.headers["X-DB-Queries"])
+        assert used <= budget, f"{method} {url} ran {used} SQL statements, budget {budget}"
+        return r
+
+    return _request
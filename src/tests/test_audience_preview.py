@@ -3,7 +3,7 @@
 """Audience preview endpoint (matching C4) + advisory warnings (C6)."""
 
 from db.models import User
-from services.attributes import FIELD_GENDER, grant_verified_attributes
+from services.attributes import FIELD_CITY, FIELD_GENDER, grant_verified_attributes
 
 FEMALE_ONLY = {"basic_filters": {"gender": "female"}}
 
@@ -34,6 +34,32 @@ def test_preview_exact_above_floor(client, register, db_session):
     body = r.json()
     assert body["eligible_count"] == 12
     assert body["display"] == "12"
+    assert body["source"] == "counters"
+
+
+def test_preview_approximate_for_large_audiences(client, register, db_session, monkeypatch):
+    from config import settings
+
+    headers, _ = register("launcher@example.com")
+    _grant_many(db_session, 12, **{FIELD_GENDER: "female"})
+    body = {"filters": FEMALE_ONLY, "approximate": True}
+
+    # small audiences are recounted exactly
+    r = client.post("/tasks/audience-preview", headers=headers, json=body).json()
+    assert (r["source"], r["approximate"], r["display"]) == ("counters", False, "12")
+
+    monkeypatch.setattr(settings, "AUDIENCE_SKETCH_MIN_COUNT", 10)
+    r = client.post("/tasks/audience-preview", headers=headers, json=body).json()
+    assert (r["source"], r["approximate"], r["display"]) == ("sketch", True, "~12")
+
+
+def test_preview_with_cities_falls_back(client, register, db_session):
+    headers, _ = register("launcher@example.com")
+    _grant_many(db_session, 12, **{FIELD_GENDER: "female", FIELD_CITY: "berlin"})
+    filters = {"basic_filters": {"location_filter": {"cities": [{"name": "Berlin"}]}}}
+    body = client.post("/tasks/audience-preview", headers=headers, json={"filters": filters}).json()
+    assert body["eligible_count"] == 12
+    assert body["source"] == "index"
 
 
 def test_preview_excludes_the_launcher_themselves(client, register, db_session):
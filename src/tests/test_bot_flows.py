@@ -29,9 +29,15 @@ class FakeMessage:
         self.video = None
         self.document = None
         self.sent: list[str] = []
+        self.markup = None
 
     async def answer(self, text: str, reply_markup=None, **kwargs):
         self.sent.append(text)
+        self.markup = reply_markup
+
+    async def edit_text(self, text: str, reply_markup=None, **kwargs):
+        self.sent.append(text)
+        self.markup = reply_markup
 
     @property
     def last(self) -> str:
@@ -218,6 +224,38 @@ async def test_jump_and_launcher_approval_via_handlers(api):
     assert any("Can't jump" in a for a in q3.answers)
 
 
+async def test_browse_next_follows_the_cursor(api):
+    from bot.flows import browse
+
+    launcher, jumper = FakeUser(32005), FakeUser(32006)
+    for desc in ("first", "second", "third"):
+        await api.launch_task(
+            launcher.id, {"desc": desc, "total_budget": 5, "you_earn": 5, "num_jumpers": 1}
+        )
+
+    msg = FakeMessage("/browse", jumper)
+    await browse.cmd_browse(msg, api)
+    assert "Task 1 of 3" in msg.last and "third" in msg.last
+
+    cards = []
+    while True:
+        nav = [b.callback_data for b in msg.markup.inline_keyboard[0]]
+        nexts = [d for d in nav if d.startswith(browse.NEXT_PREFIX)]
+        if not nexts:
+            break
+        assert len(nexts[0]) <= 64  # Telegram callback_data limit
+        await browse.cb_next(FakeQuery(nexts[0], jumper, msg), api)
+        cards.append(msg.last)
+    assert len(cards) == 2
+    assert "Task 2 of 3" in cards[0] and "second" in cards[0]
+    assert "Task 3 of 3" in cards[1] and "first" in cards[1]
+
+    # malformed or stale callback data is ignored, not raised
+    for data in (f"{browse.NEXT_PREFIX}2", f"{browse.NEXT_PREFIX}x:y:z"):
+        await browse.cb_next(FakeQuery(data, jumper, msg), api)
+    assert msg.last == cards[-1]
+
+
 async def test_forfeit_via_handler(api):
     launcher, jumper = FakeUser(32003), FakeUser(32004)
     task = await api.launch_task(
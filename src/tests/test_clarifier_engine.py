@@ -15,6 +15,7 @@ from services import clarifier_registry as registry
 from services.clarifier_backend import (
     ClarifierBackendError,
     MockClarifierBackend,
+    PhraseMatcher,
     build_system_prompt,
 )
 
@@ -165,6 +166,13 @@ def test_neutral_work_no_disclosure(db_session):
 # --- engine mechanics ---
 
 
+def test_phrase_matcher_finds_every_substring_hit():
+    vocab = (" like", " like the", "like", "ike t", " review", "review", "my site", "x")
+    m = PhraseMatcher(vocab)
+    for text in (" like the review on my site ", " unlike the reviews ", " nothing here "):
+        assert m.hits(text) == {p for p in vocab if p in text}, text
+
+
 def test_idempotency_cached_run_and_revision(db_session):
     d = _draft(db_session, "like the photos on instagram.com/x until done, one session")
     r1 = clarifier.run_clarifier(db_session, d)
@@ -176,6 +184,39 @@ def test_idempotency_cached_run_and_revision(db_session):
     assert r3.id != r1.id
 
 
+def test_shared_cache_across_drafts_skips_backend(db_session, monkeypatch):
+    calls = []
+    real_run = MockClarifierBackend.run
+
+    def _counting(self, desc, ctx=None):
+        calls.append(desc)
+        return real_run(self, desc, ctx)
+
+    monkeypatch.setattr(MockClarifierBackend, "run", _counting)
+    text = "like the photos on instagram.com/x until done, one session"
+    r1 = clarifier.run_clarifier(db_session, _draft(db_session, text))
+    r2 = clarifier.run_clarifier(db_session, _draft(db_session, text))
+    assert len(calls) == 1  # the second draft never reached the backend
+    assert (r1.cache_hit, r2.cache_hit) == (False, True)
+    assert r2.llm_output == r1.llm_output
+    assert _results(db_session, r2) == _results(db_session, r1)
+    assert clarifier.run_result(r2).cache_hit
+
+    monkeypatch.setattr(registry, "CATALOG_VERSION", "next")  # new catalog -> miss
+    r3 = clarifier.run_clarifier(db_session, _draft(db_session, text))
+    assert len(calls) == 2 and not r3.cache_hit
+
+
+def test_shared_cache_is_size_bounded(db_session, monkeypatch):
+    from db.models import ClarifierCache
+    monkeypatch.setattr(settings, "CLARIFIER_CACHE_SIZE", 2)
+    for desc in ("watch the video on youtube.com/a until 30s elapsed",
+                 "watch the video on youtube.com/b until 30s elapsed",
+                 "watch the video on youtube.com/c until 30s elapsed"):
+        clarifier.run_clarifier(db_session, _draft(db_session, desc))
+    assert db_session.query(ClarifierCache).count() == 2
+
+
 def test_degraded_run_on_backend_failure(db_session, monkeypatch):
     def _boom(self, desc, ctx=None):
         raise ClarifierBackendError("simulated outage")
@@ -189,6 +230,8 @@ def test_degraded_run_on_backend_failure(db_session, monkeypatch):
     from db.models import AuditEvent
     events = db_session.query(AuditEvent).filter_by(event_type="clarifier.skipped").all()
     assert len(events) == 1
+    from db.models import ClarifierCache
+    assert db_session.query(ClarifierCache).count() == 0  # failures are never cached
 
 
 def test_backend_off_marks_llm_entries_not_evaluated(db_session, monkeypatch):
@@ -199,6 +242,172 @@ def test_backend_off_marks_llm_entries_not_evaluated(db_session, monkeypatch):
     assert _results(db_session, run)["CJ-I1"] == "not-evaluated"
 
 
+def test_runner_answers_at_once_and_lands_later(db_session, monkeypatch):
+    import time
+
+    from services.clarifier_runner import get_runner
+    monkeypatch.setattr(settings, "CLARIFIER_MOCK_LATENCY_MS", 300)
+    d = _draft(db_session, "like the photos on instagram.com/x until done, one session")
+    t0 = time.monotonic()
+    assert get_runner().submit(db_session, d) is None
+    assert time.monotonic() - t0 < 0.2  # the request never waits on the backend
+    assert d.status == DraftStatus.CHECKING.value
+
+    assert get_runner().wait_idle(timeout=5)
+    db_session.expire_all()
+    assert d.status == DraftStatus.AWAITING_APPROVAL.value
+    (run,) = d.runs
+    assert run.status == "complete"
+    assert get_runner().submit(db_session, d).id == run.id  # same content -> same run
+
+
+def test_runner_timeout_lands_degraded_and_late_answer_fills_cache(db_session, monkeypatch):
+    import time
+
+    from db.models import AuditEvent, ClarifierCache
+    from services.clarifier_runner import get_runner
+    monkeypatch.setattr(settings, "CLARIFIER_MOCK_LATENCY_MS", 300)
+    monkeypatch.setattr(settings, "CLARIFIER_RUN_TIMEOUT_SECONDS", 0.05)
+    d = _draft(db_session, "watch the video on youtube.com/x until 30s elapsed")
+    assert get_runner().submit(db_session, d) is None
+    assert get_runner().wait_idle(timeout=5)
+    db_session.expire_all()
+    (run,) = d.runs
+    assert run.status == "degraded"
+    (event,) = db_session.query(AuditEvent).filter_by(event_type="clarifier.skipped")
+    assert "timed out" in event.payload["reason"]
+
+    deadline = time.monotonic() + 5
+    while not db_session.query(ClarifierCache).count() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert db_session.query(ClarifierCache).count() == 1
+
+
+def test_runner_sheds_beyond_queue_max(db_session, monkeypatch):
+    from services.clarifier_runner import get_runner
+    monkeypatch.setattr(settings, "CLARIFIER_MOCK_LATENCY_MS", 200)
+    monkeypatch.setattr(settings, "CLARIFIER_QUEUE_MAX", 1)
+    get_runner().submit(db_session, _draft(db_session, "watch youtube.com/a until 30s elapsed"))
+    with pytest.raises(HTTPException) as exc:
+        get_runner().submit(db_session, _draft(db_session, "watch youtube.com/b until 30s elapsed"))
+    assert exc.value.status_code == 503
+    db_session.rollback()  # as get_db does; frees SQLite's write lock for the worker
+    assert get_runner().wait_idle(timeout=5)
+
+
+def test_runner_queue_stays_bounded_while_the_backend_hangs(db_session, monkeypatch):
+    import threading
+    import time
+
+    from services import clarifier_runner
+    release, calls = threading.Event(), []
+
+    class Hanging:
+        def run(self, desc, ctx=None):
+            calls.append(desc)
+            release.wait(5)
+            raise ClarifierBackendError("vendor hung")
+
+    monkeypatch.setattr(clarifier_runner, "get_backend", lambda: Hanging())
+    monkeypatch.setattr(settings, "CLARIFIER_WORKERS", 1)
+    monkeypatch.setattr(settings, "CLARIFIER_QUEUE_MAX", 2)
+    monkeypatch.setattr(settings, "CLARIFIER_RUN_TIMEOUT_SECONDS", 0.05)
+    runner = clarifier_runner.ClarifierRunner()
+    drafts = [_draft(db_session, f"watch youtube.com/{c} until 30s elapsed") for c in "abc"]
+    db_session.commit()
+    try:
+        for d in drafts[:2]:  # one hangs in the worker, one queues behind it
+            runner.submit(db_session, d)
+        deadline = time.monotonic() + 5  # both runs land on their timeouts; the calls don't
+        while True:
+            db_session.expire_all()
+            statuses = [r.status for d in drafts[:2] for r in d.runs]
+            if statuses == ["degraded", "degraded"] or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+        assert statuses == ["degraded", "degraded"]
+        assert not runner.wait_idle(timeout=0)
+        with pytest.raises(HTTPException) as exc:  # the timeouts freed no pool slot
+            runner.submit(db_session, drafts[2])
+        assert exc.value.status_code == 503
+    finally:
+        release.set()
+    assert runner.wait_idle(timeout=5)
+    assert len(calls) == 1  # the queued call had timed out: dropped unstarted
+    assert runner.submit(db_session, drafts[2]) is None
+    assert runner.wait_idle(timeout=5)
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    from services.circuit_breaker import BreakerConfig, CircuitBreaker
+    now = [0.0]
+    cfg = BreakerConfig(window=60, min_calls=4, failure_rate=0.5, slow_call=10,
+                        open_seconds=30)
+    b = CircuitBreaker(lambda: cfg, clock=lambda: now[0])
+    for ok, seconds in ((True, 1), (True, 1), (False, 1), (True, 12)):  # slow = failed
+        b.record(b.allow(), ok, seconds)
+    assert b.state == "open" and not b.allow()
+
+    now[0] += 30
+    assert b.state == "half_open"
+    probe = b.allow()
+    assert probe.probe and not b.allow()  # one probe at a time
+    b.record(probe, False, 1)
+    assert b.state == "open"
+    now[0] += 30
+    b.record(b.allow(), True, 1)
+    assert b.state == "closed" and b.allow()
+    assert (b.stats["opened"], b.stats["slow"], b.stats["refused"]) == (2, 1, 2)
+
+
+def test_circuit_breaker_ignores_calls_from_before_it_opened():
+    from services.circuit_breaker import BreakerConfig, CircuitBreaker
+    now = [0.0]
+    cfg = BreakerConfig(window=60, min_calls=2, failure_rate=0.5, slow_call=100,
+                        open_seconds=30)
+    b = CircuitBreaker(lambda: cfg, clock=lambda: now[0])
+    slow_call = b.allow()  # a long LLM call, still running
+    for _ in range(2):
+        b.record(b.allow(), False, 1)
+    assert b.state == "open"
+
+    now[0] += 30
+    probe = b.allow()
+    assert probe.probe
+    b.record(slow_call, True, 5)  # finishes while the probe is out
+    assert b.state == "half_open" and not b.allow()  # still one probe, no close
+    b.record(probe, True, 1)
+    assert b.state == "closed"
+
+
+def test_outage_sheds_runs_to_code_only_without_backend_calls(
+    client, db_session, monkeypatch
+):
+    calls = []
+
+    def _down(self, desc, ctx=None):
+        calls.append(desc)
+        raise ClarifierBackendError("vendor 503")
+
+    monkeypatch.setattr(MockClarifierBackend, "run", _down)
+    monkeypatch.setattr(settings, "CLARIFIER_BREAKER_MIN_CALLS", 2)
+    for i in range(3):
+        run = clarifier.run_clarifier(
+            db_session, _draft(db_session, f"watch youtube.com/{i} until 30s elapsed"))
+        assert run.status == "degraded"
+    assert len(calls) == 2  # the third run never reached the vendor
+    stats = client.get("/health/clarifier").json()
+    assert (stats["state"], stats["failures"], stats["shed_open"]) == ("open", 2, 1)
+
+
+def test_in_flight_cap_sheds(db_session, monkeypatch):
+    from services.clarifier_backend import backend_stats
+    monkeypatch.setattr(settings, "CLARIFIER_MAX_IN_FLIGHT", 0)
+    run = clarifier.run_clarifier(db_session, _draft(db_session, "watch youtube.com/x until 30s"))
+    assert run.status == "degraded"
+    assert backend_stats()["shed_busy"] == 1
+
+
 def test_rate_cap_429(db_session, monkeypatch):
     monkeypatch.setattr(settings, "CLARIFIER_RUNS_PER_USER_PER_HOUR", 1)
     d = _draft(db_session, "like the photos on instagram.com/x until done, one session")
@@ -208,6 +417,52 @@ def test_rate_cap_429(db_session, monkeypatch):
     with pytest.raises(HTTPException) as exc:
         clarifier.run_clarifier(db_session, d)
     assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) > 0
+
+
+def test_rate_cap_counts_recorded_runs_only(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "CLARIFIER_RUNS_PER_USER_PER_HOUR", 2)
+    d = _draft(db_session, "like the photos on instagram.com/x until done, one session")
+    first = clarifier.run_clarifier(db_session, d)
+    for _ in range(3):  # identical content: the cached run, no slot used
+        assert clarifier.run_clarifier(db_session, d).id == first.id
+    d.payload = {**d.payload, "desc": "watch the video on youtube.com/x until 30s elapsed"}
+    db_session.flush()
+    clarifier.run_clarifier(db_session, d)
+    d.payload = {**d.payload, "desc": "watch the video on youtube.com/y until 30s elapsed"}
+    db_session.flush()
+    with pytest.raises(HTTPException) as exc:
+        clarifier.run_clarifier(db_session, d)
+    assert exc.value.status_code == 429
+
+
+def test_memory_rate_limiter_window_slides(monkeypatch):
+    from services.rate_limiter import WINDOW_SECONDS, MemoryRateLimiter
+    monkeypatch.setattr(settings, "CLARIFIER_RUNS_PER_USER_PER_HOUR", 2)
+    now = [0.0]
+    limiter = MemoryRateLimiter(clock=lambda: now[0])
+    limiter.acquire(None, 1)
+    now[0] = 10.0
+    limiter.acquire(None, 1)
+    limiter.acquire(None, 2)  # owners are independent
+    with pytest.raises(HTTPException) as exc:
+        limiter.acquire(None, 1)
+    assert exc.value.headers["Retry-After"] == str(int(WINDOW_SECONDS) - 10)
+    now[0] = WINDOW_SECONDS  # the first run ages out
+    limiter.acquire(None, 1)
+    assert limiter.stats()["limited"] == 1
+
+
+def test_db_rate_limiter_counts_runs(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "CLARIFIER_RATE_LIMITER", "db")
+    monkeypatch.setattr(settings, "CLARIFIER_RUNS_PER_USER_PER_HOUR", 1)
+    d = _draft(db_session, "like the photos on instagram.com/x until done, one session")
+    clarifier.run_clarifier(db_session, d)
+    d.payload = {**d.payload, "desc": "watch the video on youtube.com/x until 30s elapsed"}
+    db_session.flush()
+    with pytest.raises(HTTPException) as exc:
+        clarifier.run_clarifier(db_session, d)
+    assert exc.value.status_code == 429
 
 
 def test_prompt_builder_contract_renders_registry():
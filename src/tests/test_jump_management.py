@@ -1,5 +1,7 @@
 # filepath: src/tests/test_jump_management.py
 
+import pytest
+
 
 def _launch_manual(client, headers, num_jumpers=2):
     r = client.post(
@@ -87,3 +89,245 @@ def test_reject_active_jump_refused(client, register):
 
     r = client.post(f"/tasks/{tid}/jumps/{jump['id']}/reject", headers=launcher)
     assert r.status_code == 409
+
+
+def test_slot_counter_follows_jumps(client, register, db_session):
+    from db.models import Task
+
+    launcher, _ = register("launcher@example.com")
+    j1, _ = register("jumper1@example.com")
+    j2, _ = register("jumper2@example.com")
+    j3, _ = register("jumper3@example.com")
+
+    tid = _launch_manual(client, launcher, num_jumpers=2)
+    jumps = [client.post(f"/tasks/{tid}/jump", headers=h).json() for h in (j1, j2, j3)]
+
+    def slots():
+        db_session.expire_all()
+        task = db_session.get(Task, tid)
+        return task.occupied_slots, task.status
+
+    assert slots() == (0, "open")  # pending jumps hold no slot
+    client.post(f"/tasks/{tid}/jumps/{jumps[0]['id']}/approve", headers=launcher)
+    assert slots() == (1, "open")
+    client.post(f"/tasks/{tid}/jumps/{jumps[1]['id']}/approve", headers=launcher)
+    assert slots() == (2, "full")
+
+    r = client.post(f"/tasks/{tid}/jumps/{jumps[2]['id']}/approve", headers=launcher)
+    assert r.status_code == 409
+    assert slots() == (2, "full")
+
+    assert client.post(f"/tasks/{tid}/forfeit", headers=j1).status_code == 200
+    assert slots() == (1, "open")
+
+    # forfeiting a pending jump frees nothing
+    assert client.post(f"/tasks/{tid}/forfeit", headers=j3).status_code == 200
+    assert slots() == (1, "open")
+
+
+def test_stale_reads_cannot_oversubscribe_last_slot(client, register):
+    from fastapi import HTTPException
+
+    from db.engine import SessionLocal
+    from db.models import Task, User
+    from services import tasks as task_service
+
+    launcher, _ = register("launcher@example.com")
+    register("jumper1@example.com")
+    register("jumper2@example.com")
+    r = client.post(
+        "/tasks",
+        headers=launcher,
+        json={"desc": "one slot", "total_budget": 5, "you_earn": 5, "num_jumpers": 1},
+    )
+    tid = r.json()["id"]
+
+    # both requests read the task while it still looks open
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        task_a, task_b = first.get(Task, tid), second.get(Task, tid)
+        assert task_a.status == task_b.status == "open"
+        user_a = first.query(User).filter(User.email == "jumper1@example.com").one()
+        user_b = second.query(User).filter(User.email == "jumper2@example.com").one()
+
+        task_service.jump_on_task(first, task_a, user_a)
+        first.commit()
+        assert task_a.status == "full"
+
+        with pytest.raises(HTTPException) as exc:
+            task_service.jump_on_task(second, task_b, user_b)
+        assert exc.value.status_code == 409
+        second.rollback()
+    finally:
+        first.close()
+        second.close()
+
+    task = client.get(f"/tasks/{tid}", headers=launcher).json()
+    assert task["status"] == "full"
+    assert len(client.get(f"/tasks/{tid}/jumps", headers=launcher).json()) == 1
+
+
+def _launch_auto(client, headers, num_jumpers):
+    r = client.post(
+        "/tasks",
+        headers=headers,
+        json={
+            "desc": "rush task",
+            "total_budget": 5 * num_jumpers,
+            "you_earn": 5,
+            "num_jumpers": num_jumpers,
+        },
+    )
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def test_full_task_rejected_from_memory_until_forfeit(client, register, monkeypatch):
+    from services import tasks as task_service
+
+    launcher, _ = register("launcher@example.com")
+    j1, _ = register("jumper1@example.com")
+    j2, _ = register("jumper2@example.com")
+    tid = _launch_auto(client, launcher, num_jumpers=1)
+    assert client.post(f"/tasks/{tid}/jump", headers=j1).status_code == 201
+
+    def no_db(*_args, **_kwargs):
+        raise AssertionError("full task reached the database")
+
+    with monkeypatch.context() as m:
+        m.setattr(task_service, "get_task", no_db)
+        r = client.post(f"/tasks/{tid}/jump", headers=j2)
+    assert r.status_code == 409
+    assert r.json()["detail"] == "Task is full"
+
+    stats = client.get("/health/admission").json()
+    assert stats["full"] == [tid]
+    assert stats["rejected_full"] == 1
+
+    # a forfeit reopens the task here, without waiting for the mark to expire
+    assert client.post(f"/tasks/{tid}/forfeit", headers=j1).status_code == 200
+    assert client.post(f"/tasks/{tid}/jump", headers=j2).status_code == 201
+
+
+def test_admission_queue_overflow_is_busy(client, register, monkeypatch):
+    from config import settings
+
+    launcher, _ = register("launcher@example.com")
+    j1, _ = register("jumper1@example.com")
+    tid = _launch_auto(client, launcher, num_jumpers=3)
+
+    monkeypatch.setattr(settings, "ADMISSION_QUEUE_MAX", 0)
+    r = client.post(f"/tasks/{tid}/jump", headers=j1)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+
+
+def test_admission_hands_the_turn_on_in_order(monkeypatch):
+    import asyncio
+
+    from fastapi import HTTPException
+
+    from config import settings
+    from services.admission import MemoryAdmission
+
+    gate, order = MemoryAdmission(), []
+    monkeypatch.setattr(settings, "ADMISSION_WAIT_SECONDS", 0.2)
+
+    async def request(name, hold=0.0):
+        try:
+            async with gate.admit(1):
+                order.append(name)
+                await asyncio.sleep(hold)
+        except HTTPException as e:
+            order.append((name, e.status_code))
+
+    async def main():
+        first = asyncio.create_task(request("a", hold=0.05))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(request("cancelled"))
+        rest = [asyncio.create_task(request(n)) for n in ("b", "c")]
+        await asyncio.sleep(0)
+        cancelled.cancel()  # a client gone while queued gives up its place
+        await asyncio.gather(first, *rest, return_exceptions=True)
+        # the holder outlasts the wait: the queued request is turned away
+        slow = asyncio.create_task(request("slow", hold=0.5))
+        await asyncio.sleep(0)
+        await request("late")
+        await slow
+
+    asyncio.run(main())
+    assert order == ["a", "b", "c", "slow", ("late", 503)]
+    assert gate.stats()["queued"] == {}
+
+
+def test_admission_forgets_expired_full_marks():
+    from config import settings
+    from services.admission import MemoryAdmission
+
+    now = [1000.0]
+    gate = MemoryAdmission(clock=lambda: now[0])
+    for task_id in (1, 2, 3):  # filled, then never asked about again
+        gate.mark_full(task_id)
+    assert gate.stats()["full"] == [1, 2, 3]
+
+    now[0] += settings.ADMISSION_FULL_TTL_SECONDS + 1
+    gate.mark_full(4)
+    gate.mark_full(5)
+    assert set(gate._gates) == {4, 5}  # expired, idle gates evicted; live ones kept
+    assert gate.stats()["full"] == [4, 5]
+
+
+def test_queued_jump_holds_no_connection(client, register):
+    import asyncio
+    import threading
+    import time
+
+    from db.engine import engine
+    from services.admission import get_admission
+
+    launcher, _ = register("launcher@example.com")
+    jumper, _ = register("jumper1@example.com")
+    tid = _launch_auto(client, launcher, num_jumpers=1)
+
+    held, release = threading.Event(), threading.Event()
+
+    async def hold_turn():
+        async with get_admission().admit(tid):
+            held.set()
+            await asyncio.to_thread(release.wait, 5)
+
+    holder = threading.Thread(target=asyncio.run, args=(hold_turn(),))
+    holder.start()
+    assert held.wait(5)
+    codes = []
+    waiter = threading.Thread(
+        target=lambda: codes.append(client.post(f"/tasks/{tid}/jump", headers=jumper).status_code)
+    )
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while get_admission().stats()["queued"].get(tid) != 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert get_admission().stats()["queued"][tid] == 2
+    assert engine.pool.checkedout() == 0  # authenticated, queued, connection returned
+    release.set()
+    holder.join(5)
+    waiter.join(5)
+    assert codes == [201]
+
+
+def test_concurrent_jumps_fill_exactly(client, register):
+    from concurrent.futures import ThreadPoolExecutor
+
+    launcher, _ = register("launcher@example.com")
+    jumpers = [register(f"jumper{i}@example.com")[0] for i in range(8)]
+    tid = _launch_auto(client, launcher, num_jumpers=3)
+
+    with ThreadPoolExecutor(max_workers=len(jumpers)) as pool:
+        codes = list(
+            pool.map(lambda h: client.post(f"/tasks/{tid}/jump", headers=h).status_code, jumpers)
+        )
+
+    assert sorted(codes) == [201] * 3 + [409] * 5
+    task = client.get(f"/tasks/{tid}", headers=launcher).json()
+    assert task["status"] == "full"
+    assert len(client.get(f"/tasks/{tid}/jumps", headers=launcher).json()) == 3
@@ -4,8 +4,9 @@
 
 from datetime import date
 
-from db.models import User
+from db.models import User, VerificationData
 from services import matching
+from services.attribute_index import get_index
 from services.attributes import (
     FIELD_BIRTH_DATE,
     FIELD_CITY,
@@ -13,6 +14,7 @@ from services.attributes import (
     FIELD_GENDER,
     grant_verified_attributes,
     load_snapshot,
+    load_snapshots,
 )
 from services.regions import resolve_region
 
@@ -37,11 +39,14 @@ def FILTERS(**basic) -> dict:
 
 
 def both_modes(db, filters, user) -> bool:
-    """Assert SQL mode and snapshot mode agree, return the verdict."""
+    """Assert SQL, snapshot and index modes agree, return the verdict."""
     ok, _unmet = matching.user_matches(db, filters, user.id)
     q, _ = matching.audience_query(db, filters)
     in_set = any(u.id == user.id for u in q.all())
     assert ok == in_set, f"snapshot={ok} but sql={in_set} for {filters}"
+    pf = matching.parse_filters(filters)
+    in_index = pf.is_unconstrained or bool(get_index().match(db, pf) >> user.id & 1)
+    assert ok == in_index, f"snapshot={ok} but index={in_index} for {filters}"
     return ok
 
 
@@ -73,6 +78,72 @@ def test_low_confidence_rows_dont_count(db_session):
     assert FIELD_GENDER not in load_snapshot(db_session, user.id)
 
 
+def test_wide_row_follows_verification_writes(db_session):
+    from db.models import UserAttributes
+
+    user = _user(
+        db_session, "wide@x.com", **{FIELD_COUNTRY: "Germany", FIELD_BIRTH_DATE: "1990-05-01"}
+    )
+    row = db_session.get(UserAttributes, user.id)
+    assert (row.country, row.birth_date, row.city) == ("germany", date(1990, 5, 1), None)
+
+    grant_verified_attributes(db_session, user, {FIELD_COUNTRY: "france"}, confidence=0.5)
+    db_session.commit()
+    db_session.refresh(row)
+    assert (row.country, row.country_confidence) == ("france", 0.5)
+
+    # an ORM-only supersede (no grant helper) is picked up the same way
+    current = (
+        db_session.query(VerificationData)
+        .filter_by(user_id=user.id, field_name=FIELD_BIRTH_DATE, is_current=True)
+        .one()
+    )
+    current.is_current = False
+    db_session.commit()
+    db_session.refresh(row)
+    assert row.birth_date is None and row.country == "france"
+
+
+def test_sql_mode_is_plain_column_predicates():
+    pf = matching.parse_filters(
+        FILTERS(
+            gender="female",
+            age_range={"min": 18},
+            location_filter={
+                "countries": [{"name": "germany", "exceptions": {"cities": ["berlin"]}}]
+            },
+        )
+    )
+    column_sql = str(matching._column_predicate(pf).compile(compile_kwargs={"literal_binds": True}))
+    assert "EXISTS" not in column_sql and "verification_data" not in column_sql
+    assert "user_attributes.birth_date <=" in column_sql
+    sql = str(matching.sql_predicate(pf).compile(compile_kwargs={"literal_binds": True}))
+    assert "user_attributes.irregular IS NOT" in sql  # EXISTS only for flagged users
+
+
+def test_batch_snapshots_match_single_loads(db_session):
+    users = [
+        _user(db_session, "a@x.com", **{FIELD_COUNTRY: "Germany", FIELD_GENDER: "female"}),
+        _user(db_session, "b@x.com"),
+        _user(db_session, "c@x.com", **{FIELD_COUNTRY: "germany", FIELD_GENDER: "female"}),
+        _user(db_session, "d@x.com", **{FIELD_CITY: "Berlin"}),
+    ]
+    grant_verified_attributes(db_session, users[3], {FIELD_GENDER: "male"}, confidence=0.5)
+    db_session.commit()
+    ids = [u.id for u in reversed(users)] + [users[0].id]  # order and duplicates don't matter
+
+    chunks = list(load_snapshots(db_session, ids, chunk_size=3))
+    assert [len(c) for c in chunks] == [3, 1]
+    got = dict(pair for chunk in chunks for pair in chunk)
+    assert list(got) == sorted(u.id for u in users)
+    for u in users:
+        assert got[u.id] == load_snapshot(db_session, u.id)
+
+    # equal value sets share one object per chunk
+    first = chunks[0].columns[FIELD_COUNTRY]
+    assert first[0] is first[2]
+
+
 def test_region_resolution():
     assert "germany" in resolve_region("EMEA")
     assert "germany" in resolve_region("emea")
@@ -185,6 +256,58 @@ def test_combined_filters_are_anded(db_session):
     assert not ok and unmet == ["gender"]
 
 
+def _add_current(db, user, field: str, value: str, confidence: float = 1.0) -> None:
+    """A second current row next to the one the grant helper left in place."""
+    source_id = db.query(VerificationData.verification_source_id).filter_by(user_id=user.id).first()
+    db.add(
+        VerificationData(
+            user_id=user.id,
+            field_name=field,
+            field_value=value,
+            verification_source_id=source_id[0],
+            confidence_score=confidence,
+            is_current=True,
+        )
+    )
+    db.commit()
+
+
+def test_non_iso_birth_dates_agree_across_modes(db_session):
+    from db.models import UserAttributes
+
+    year_only = _user(db_session, "year@x.com", **{FIELD_BIRTH_DATE: "1990"})
+    assert db_session.get(UserAttributes, year_only.id).irregular
+    assert both_modes(db_session, FILTERS(age_range={"min": 18}), year_only)  # "1990" <= ISO bound
+    assert not both_modes(db_session, FILTERS(age_range={"max": 25}), year_only)
+
+
+def test_several_current_cities_agree_across_modes(db_session):
+    from db.models import UserAttributes
+
+    user = _user(db_session, "twocities@x.com", **{FIELD_CITY: "berlin"})
+    _add_current(db_session, user, FIELD_CITY, "paris")
+    assert db_session.get(UserAttributes, user.id).irregular
+    assert both_modes(db_session, FILTERS(location_filter={"cities": [{"name": "paris"}]}), user)
+    assert both_modes(db_session, FILTERS(location_filter={"cities": [{"name": "berlin"}]}), user)
+    assert not both_modes(db_session, FILTERS(location_filter={"cities": [{"name": "rome"}]}), user)
+
+
+def test_unconfident_newer_row_doesnt_hide_a_confident_one(db_session):
+    from db.models import UserAttributes
+
+    user = _user(db_session, "hidden@x.com", **{FIELD_GENDER: "female"})
+    _add_current(db_session, user, FIELD_GENDER, "male", confidence=0.5)
+    row = db_session.get(UserAttributes, user.id)
+    db_session.refresh(row)
+    assert (row.gender, row.gender_confidence) == ("female", 1.0)
+    assert both_modes(db_session, FILTERS(gender="female"), user)
+    assert not both_modes(db_session, FILTERS(gender="male"), user)
+
+    regular = _user(db_session, "regular@x.com", **{FIELD_GENDER: "female"})
+    assert not db_session.get(UserAttributes, regular.id).irregular
+    assert both_modes(db_session, FILTERS(gender="female"), regular)
+
+
 def test_raw_only_location_is_advisory(db_session):
     nobody = _user(db_session, "raw@x.com")  # no attributes at all
     filters = FILTERS(location_filter={"raw_statement": "EMEA but not Russia"})
@@ -214,8 +337,188 @@ def test_audience_count_excludes_launcher(db_session):
     assert count == 1
 
 
+def test_compiled_filters_are_shared_by_canonical_json():
+    a = {"basic_filters": {"gender": "female", "age_range": {"min": 18, "max": 25}}}
+    b = {"basic_filters": {"age_range": {"max": 25, "min": 18}, "gender": "female"}}
+    assert matching.compile_filters(a) is matching.compile_filters(b)
+    assert matching.compile_filters(a) == matching.parse_filters(a)
+
+    edited = {"basic_filters": {"gender": "male", "age_range": {"min": 18, "max": 25}}}
+    assert matching.compile_filters(edited).gender == "male"
+
+
+def test_region_exceptions_compile_to_frozensets():
+    pf = matching.compile_filters(
+        FILTERS(
+            location_filter={
+                "regions": [{"name": "dach", "exceptions": {"cities": ["Vienna"]}}],
+                "countries": [{"name": "france"}],
+            }
+        )
+    )
+    assert pf.free_countries == frozenset({"france"})
+    assert ("austria", frozenset({"vienna"})) in pf.excepted_countries
+    assert len(pf.countries) == 4
+
+
 def test_garbage_filters_dont_crash(db_session):
     user = _user(db_session, "g@x.com")
     for junk in ("string", 42, {"basic_filters": "nope"}, {"basic_filters": {"age_range": "x"}}):
         ok, _ = matching.user_matches(db_session, junk, user.id)
         assert ok  # nothing parseable = unconstrained
+
+
+# --- index mode -------------------------------------------------------------
+
+
+def test_index_follows_commits_not_rollbacks(db_session):
+    user = _user(db_session, "idx@x.com", **{FIELD_GENDER: "female"})
+    assert matching.audience_count(db_session, FILTERS(gender="female"))[0] == 1
+
+    grant_verified_attributes(db_session, user, {FIELD_GENDER: "male"})
+    db_session.rollback()
+    assert matching.audience_count(db_session, FILTERS(gender="female"))[0] == 1
+
+    grant_verified_attributes(db_session, user, {FIELD_GENDER: "male"})
+    db_session.commit()
+    assert matching.audience_count(db_session, FILTERS(gender="female"))[0] == 0
+    assert matching.audience_count(db_session, FILTERS(gender="male"))[0] == 1
+
+
+def test_index_count_agrees_with_sql_over_a_population(db_session, monkeypatch):
+    from config import settings
+
+    for i in range(40):
+        _user(
+            db_session,
+            f"pop{i}@x.com",
+            **{
+                FIELD_GENDER: ("female", "male")[i % 2],
+                FIELD_COUNTRY: ("germany", "france", "turkey", "russia")[i % 4],
+                FIELD_CITY: ("berlin", "paris", "istanbul", "moscow", "munich")[i % 5],
+                FIELD_BIRTH_DATE: _birth(16 + i),
+            },
+        )
+    cases = [
+        FILTERS(gender="female"),
+        FILTERS(age_range={"min": 20, "max": 31}),
+        FILTERS(age_range={"max": 30}),
+        FILTERS(
+            location_filter={"regions": [{"name": "emea", "exceptions": {"countries": ["russia"]}}]}
+        ),
+        FILTERS(
+            gender="male",
+            age_range={"min": 25},
+            location_filter={
+                "countries": [{"name": "germany", "exceptions": {"cities": ["berlin"]}}],
+                "cities": [{"name": "paris"}],
+            },
+        ),
+    ]
+    for filters in cases:
+        indexed, _ = matching.audience_count(db_session, filters)
+        monkeypatch.setattr(settings, "ATTRIBUTE_INDEX_ENABLED", False)
+        scanned, _ = matching.audience_count(db_session, filters)
+        monkeypatch.setattr(settings, "ATTRIBUTE_INDEX_ENABLED", True)
+        assert indexed == scanned, filters
+
+
+def test_counters_agree_with_sql_and_follow_commits(db_session, monkeypatch):
+    from config import settings
+    from services.audience_counters import get_counters
+
+    users = [
+        _user(
+            db_session,
+            f"cnt{i}@x.com",
+            **{
+                FIELD_GENDER: ("female", "male", "female")[i % 3],
+                FIELD_COUNTRY: ("germany", "france", "austria", "russia")[i % 4],
+                FIELD_BIRTH_DATE: _birth(17 + i),
+            },
+        )
+        for i in range(36)
+    ]
+    _user(db_session, "nobirth@x.com", **{FIELD_GENDER: "female", FIELD_COUNTRY: "germany"})
+    cases = [
+        FILTERS(gender="female"),
+        FILTERS(age_range={"min": 20, "max": 31}),
+        FILTERS(gender="male", age_range={"min": 30}),
+        FILTERS(location_filter={"regions": [{"name": "dach"}]}, age_range={"max": 40}),
+        FILTERS(location_filter={"countries": [{"name": "france"}, {"name": "narnia"}]}),
+    ]
+
+    def check():
+        for filters in cases:
+            pf = matching.parse_filters(filters)
+            assert get_counters().supports(pf)
+            counted = get_counters().count(db_session, pf)
+            monkeypatch.setattr(settings, "ATTRIBUTE_INDEX_ENABLED", False)
+            scanned, _ = matching.audience_count(db_session, filters)
+            monkeypatch.setattr(settings, "ATTRIBUTE_INDEX_ENABLED", True)
+            assert counted == scanned, filters
+
+    check()
+    # moves between cells, a low-confidence supersede, and a second current
+    # country the cells can't hold
+    grant_verified_attributes(db_session, users[0], {FIELD_COUNTRY: "france"})
+    grant_verified_attributes(db_session, users[1], {FIELD_GENDER: "female"}, confidence=0.5)
+    db_session.add(
+        VerificationData(
+            user_id=users[2].id,
+            field_name=FIELD_COUNTRY,
+            field_value="germany",
+            verification_source_id=db_session.query(VerificationData)
+            .first()
+            .verification_source_id,
+            is_current=True,
+        )
+    )
+    db_session.commit()
+    check()
+
+
+def test_theta_sketch_estimates_within_bounds():
+    from services.audience_sketches import ThetaSketch, hash_id
+
+    k = 1024
+    a = ThetaSketch.of(map(hash_id, range(0, 20_000)), k)
+    b = ThetaSketch.of(map(hash_id, range(10_000, 30_000)), k)
+    assert not a.exact
+    # ~3 standard errors: 1/sqrt(k) for unions, 1/sqrt(k * share) for slices
+    assert abs(a.union(b, k=k).estimate() / 30_000 - 1) < 0.1
+    assert abs(a.intersect(b).estimate() / 10_000 - 1) < 0.2
+    assert abs(a.minus(b).estimate() / 10_000 - 1) < 0.2
+    small = ThetaSketch.of(map(hash_id, range(50)), k)
+    assert small.exact and small.estimate() == 50
+
+
+def test_small_sketches_are_exact_set_algebra(db_session, monkeypatch):
+    from config import settings
+    from services.audience_sketches import get_sketches
+
+    for i in range(30):
+        _user(
+            db_session,
+            f"sk{i}@x.com",
+            **{
+                FIELD_GENDER: ("female", "male")[i % 2],
+                FIELD_COUNTRY: ("germany", "france", "austria")[i % 3],
+                FIELD_CITY: ("berlin", "paris", "vienna", "munich")[i % 4],
+                FIELD_BIRTH_DATE: _birth(17 + i),
+            },
+        )
+    cases = [
+        FILTERS(gender="female", age_range={"min": 20, "max": 35}),
+        FILTERS(
+            location_filter={
+                "countries": [{"name": "germany", "exceptions": {"cities": ["berlin"]}}],
+                "cities": [{"name": "paris"}],
+            }
+        ),
+        FILTERS(gender="male", location_filter={"regions": [{"name": "dach"}]}),
+    ]
+    monkeypatch.setattr(settings, "ATTRIBUTE_INDEX_ENABLED", False)
+    for filters in cases:
+        exact, _ = matching.audience_count(db_session, filters)
+        assert get_sketches().estimate(db_session, matching.parse_filters(filters)) == exact
@@ -71,3 +71,188 @@ def test_feed_pagination_counts_only_eligible(client, register):
     assert len(r["items"]) == 2
     r = client.get("/tasks", headers=jumper, params={"page": 2, "size": 2}).json()
     assert len(r["items"]) == 1
+
+
+def test_feed_cursor_skips_ineligible_tasks(client, register):
+    launcher, _ = register("launcher@example.com")
+    jumper, _ = register("jumper@example.com")
+    for i in range(2):
+        _launch(client, launcher, desc=f"open {i}")
+        _launch(client, launcher, filters=FEMALE_ONLY, desc=f"hidden {i}")
+
+    first = client.get("/tasks", headers=jumper, params={"size": 1}).json()
+    assert [t["desc"] for t in first["items"]] == ["open 1"]
+    body = client.get(
+        "/tasks", headers=jumper, params={"size": 1, "cursor": first["next_cursor"]}
+    ).json()
+    assert [t["desc"] for t in body["items"]] == ["open 0"]
+    assert body["total"] is None and body["next_cursor"] is None
+
+
+def test_feed_has_no_scan_window(client, register, db_session):
+    from db.models import Task
+
+    launcher, _ = register("launcher@example.com")
+    jumper, _ = register("jumper@example.com")
+    old = _launch(client, launcher, desc="older, open to all")
+    owner = db_session.query(User).filter(User.email == "launcher@example.com").one()
+    # 250 newer tasks the jumper can't see used to push `old` out of the scan
+    db_session.add_all(
+        Task(owner_id=owner.id, desc=f"women {i}", total_budget=1, filters=FEMALE_ONLY)
+        for i in range(250)
+    )
+    db_session.commit()
+
+    body = client.get("/tasks", headers=jumper).json()
+    assert body["total"] == 1
+    assert body["items"][0]["id"] == old
+
+
+def test_feed_follows_status_changes(client, register):
+    launcher, _ = register("launcher@example.com")
+    jumper, _ = register("jumper@example.com")
+    other, _ = register("other@example.com")
+    r = client.post(
+        "/tasks", headers=launcher, json={"desc": "one slot", "total_budget": 5, "num_jumpers": 1}
+    )
+    tid = r.json()["id"]
+    assert client.get("/tasks", headers=other, params={"status": "open"}).json()["total"] == 1
+
+    assert client.post(f"/tasks/{tid}/jump", headers=jumper).status_code == 201
+    assert client.get("/tasks", headers=other, params={"status": "open"}).json()["total"] == 0
+    assert client.get("/tasks", headers=other, params={"status": "full"}).json()["total"] == 1
+
+
+def test_feed_pages_from_the_viewer_cache(client, register, monkeypatch):
+    from services import task_index
+
+    launcher, _ = register("launcher@example.com")
+    jumper, _ = register("jumper@example.com")
+    for i in range(3):
+        _launch(client, launcher, desc=f"open {i}")
+
+    calls = []
+    real = task_index.TaskIndex.eligible
+    monkeypatch.setattr(
+        task_index.TaskIndex, "eligible", lambda *a, **kw: calls.append(1) or real(*a, **kw)
+    )
+    body = client.get("/tasks", headers=jumper, params={"size": 1}).json()
+    seen = [body["items"][0]["desc"]]
+    while body["next_cursor"]:
+        params = {"size": 1, "cursor": body["next_cursor"]}
+        body = client.get("/tasks", headers=jumper, params=params).json()
+        seen += [t["desc"] for t in body["items"]]
+    assert client.get("/tasks", headers=jumper, params={"page": 3, "size": 1}).json()["total"] == 3
+    assert seen == ["open 2", "open 1", "open 0"]
+    assert len(calls) == 1  # the first page; every later tap was a cache hit
+
+    _launch(client, launcher, desc="new")  # a Task commit drops every entry
+    assert client.get("/tasks", headers=jumper).json()["total"] == 4
+    assert len(calls) == 2
+
+
+def test_feed_cache_survives_slot_bumps_until_the_task_fills(client, register, monkeypatch):
+    from services import task_index
+
+    launcher, _ = register("launcher@example.com")
+    viewer, _ = register("viewer@example.com")
+    first, _ = register("first@example.com")
+    second, _ = register("second@example.com")
+    tid = _launch(client, launcher)  # two slots
+
+    calls = []
+    real = task_index.TaskIndex.eligible
+    monkeypatch.setattr(
+        task_index.TaskIndex, "eligible", lambda *a, **kw: calls.append(1) or real(*a, **kw)
+    )
+    feed = {"status": "open"}
+    assert client.get("/tasks", headers=viewer, params=feed).json()["total"] == 1
+    assert client.post(f"/tasks/{tid}/jump", headers=first).status_code == 201
+    assert client.get("/tasks", headers=viewer, params=feed).json()["total"] == 1
+    assert len(calls) == 1  # the slot bump left the cached list alone
+
+    assert client.post(f"/tasks/{tid}/jump", headers=second).status_code == 201  # fills it
+    assert client.get("/tasks", headers=viewer, params=feed).json()["total"] == 0
+    assert len(calls) == 2
+
+
+def test_feed_cache_expires_and_stays_bounded(monkeypatch):
+    from config import settings
+    from services.feed_cache import FeedCache
+
+    cache = FeedCache()
+    monkeypatch.setattr(settings, "FEED_CACHE_SIZE", 2)
+    for viewer in (1, 2, 3):
+        cache.load((viewer,), lambda: [10, 11])
+    assert cache.get((1,)) is None and cache.get((3,)).ids == (10, 11)
+
+    monkeypatch.setattr(settings, "FEED_CACHE_TTL_SECONDS", 0)
+    cache.reset()
+    cache.load((1,), lambda: [10])
+    assert cache.get((1,)) is None
+
+
+def test_feed_cache_drops_fills_that_raced_a_commit():
+    from services.feed_cache import FeedCache
+
+    cache = FeedCache()
+
+    def loader():
+        cache.invalidate_viewers({2})  # a commit lands mid-load
+        return [10]
+
+    assert cache.load((1,), loader).ids == (10,)
+    assert cache.get((1,)) is None
+    cache.load((1,), lambda: [10, 11])
+    cache.invalidate_viewers({1})
+    assert cache.get((1,)) is None
+
+
+def test_task_index_agrees_with_a_full_scan(db_session, register):
+    from datetime import date
+
+    from db.models import Task
+    from services import matching, task_index
+
+    register("launcher@example.com")
+    owner = db_session.query(User).filter(User.email == "launcher@example.com").one()
+    filter_sets = [
+        None,
+        FEMALE_ONLY,
+        {"basic_filters": {"age_range": {"min": 18, "max": 25}}},
+        {"basic_filters": {"age_range": {"min": 40}}},
+        {"basic_filters": {"location_filter": {"regions": [{"name": "dach"}]}}},
+        {
+            "basic_filters": {
+                "gender": "male",
+                "location_filter": {
+                    "countries": [{"name": "germany", "exceptions": {"cities": ["berlin"]}}],
+                    "cities": [{"name": "paris"}],
+                },
+            }
+        },
+    ]
+    db_session.add_all(
+        Task(owner_id=owner.id, desc=f"t{i}", total_budget=1, filters=f)
+        for i, f in enumerate(filter_sets)
+    )
+    db_session.commit()
+    tasks = db_session.query(Task).all()
+
+    year = date.today().year
+    snapshots = [
+        {},
+        {"gender": {"female"}, "birth_date": {f"{year - 20}-01-15"}},
+        {"gender": {"male"}, "location_country": {"germany"}, "location_city": {"berlin"}},
+        {"gender": {"male"}, "location_country": {"germany"}, "location_city": {"munich"}},
+        {"location_country": {"france"}, "location_city": {"paris"}, "birth_date": {"1960-02-29"}},
+        {"birth_date": {"not-a-date"}, "location_country": {"austria"}},
+    ]
+    index = task_index.get_index()
+    for snap in snapshots:
+        expected = {
+            t.id
+            for t in tasks
+            if not matching.unmet_requirements(matching.parse_filters(t.filters), snap)
+        }
+        assert set(index.eligible(db_session, snap)) == expected, snap
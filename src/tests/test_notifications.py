@@ -4,9 +4,9 @@
 
 import pytest
 
-from db.models import Notification, Task, User
+from db.models import FanOutJob, Notification, User
+from services import fanout
 from services.attributes import FIELD_GENDER, grant_verified_attributes
-from services.notifications import fan_out_task_matched
 from services.notifier import ConsoleNotifierBackend
 
 FEMALE_ONLY = {"basic_filters": {"gender": "female"}}
@@ -73,9 +73,12 @@ def test_fanout_is_idempotent(client, register, db_session):
     headers, _ = register("launcher@example.com")
     tid = _launch(client, headers, filters=FEMALE_ONLY)
 
-    task = db_session.get(Task, tid)
-    fan_out_task_matched(db_session, task)  # second fan-out, same task
+    # walk the audience again from the start: every row dedupes
+    job = db_session.query(FanOutJob).filter_by(task_id=tid).one()
+    job.status, job.last_user_id = "running", None
+    assert fanout.run_batch(db_session, job) is False
     db_session.commit()
+    assert (job.matched, job.notified) == (4, 2)
 
     assert db_session.query(Notification).filter_by(event_type="task.matched").count() == 2
 
@@ -158,3 +161,375 @@ def test_delivery_failure_marks_failed_not_500(client, register, db_session, mon
     assert tid is not None
     row = db_session.query(Notification).filter_by(event_type="task.matched").one()
     assert row.status == "failed"
+
+
+@pytest.fixture()
+def outbox(monkeypatch):
+    """NOTIFY_DISPATCH=outbox; returns a drain() that runs due fan-out
+    batches, then the dispatcher once, and returns the rows it sent."""
+    import asyncio
+
+    from config import settings
+    from services.dispatcher import get_dispatcher
+
+    monkeypatch.setattr(settings, "NOTIFY_DISPATCH", "outbox")
+    monkeypatch.setattr(settings, "NOTIFY_DIGEST_WINDOW_SECONDS", 0)
+
+    def drain():
+        while fanout.get_worker().step():
+            pass
+        return asyncio.run(get_dispatcher().drain())
+
+    return drain
+
+
+def test_outbox_launch_only_queues_work(client, register, db_session, outbox):
+    _grant_many(db_session, 3, **{FIELD_GENDER: "female"})
+    headers, _ = register("launcher@example.com")
+    _launch(client, headers, filters=FEMALE_ONLY)
+
+    assert db_session.query(Notification).count() == 0  # the launch only queued a job
+    assert ConsoleNotifierBackend.outbox == []
+
+    assert outbox() == 3
+    db_session.expire_all()
+    rows = db_session.query(Notification).filter_by(event_type="task.matched").all()
+    assert all(r.status == "sent" and r.provider_ref and r.sent_at for r in rows)
+    assert len(ConsoleNotifierBackend.outbox) == 3
+    assert outbox() == 0  # nothing sent twice
+
+
+def test_outbox_failure_and_skips(client, register, db_session, monkeypatch, outbox):
+    from services import notifications as notif_module
+
+    class ExplodingBackend:
+        def send(self, chat_id, text):
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(notif_module, "get_notifier", lambda: ExplodingBackend())
+    users = _grant_many(db_session, 2, **{FIELD_GENDER: "female"})
+    users[0].notifications_muted = True
+    db_session.commit()
+    headers, _ = register("launcher@example.com")
+    _launch(client, headers, filters=FEMALE_ONLY)
+
+    assert outbox() == 1  # the muted row was never queued
+    db_session.expire_all()
+    statuses = {
+        r.user_id: r.status
+        for r in db_session.query(Notification).filter_by(event_type="task.matched")
+    }
+    assert statuses == {users[0].id: "skipped", users[1].id: "failed"}
+
+
+def test_claims_do_not_overlap_and_stale_claims_return(client, register, db_session, outbox):
+    from datetime import timedelta
+
+    from db.base import utcnow
+    from services.dispatcher import get_dispatcher
+
+    _grant_many(db_session, 3, **{FIELD_GENDER: "female"})
+    headers, _ = register("launcher@example.com")
+    _launch(client, headers, filters=FEMALE_ONLY)
+    assert fanout.get_worker().step()
+
+    dispatcher = get_dispatcher()
+    first, second = dispatcher.claim(2), dispatcher.claim(2)
+    assert len(first) == 2 and len(second) == 1
+    assert not {j.ids for j in first} & {j.ids for j in second}
+    assert dispatcher.claim(10) == []
+
+    # a dispatcher that died mid-send: its claim expires and the row is retried
+    (stale,) = first[0].ids
+    db_session.query(Notification).filter(Notification.id == stale).update(
+        {"claimed_at": utcnow() - timedelta(hours=1)}
+    )
+    db_session.commit()
+    assert [j.ids for j in dispatcher.claim(10)] == [(stale,)]
+
+
+def test_dispatcher_runs_in_app_lifespan(db_session, outbox):
+    import time
+
+    from fastapi.testclient import TestClient
+
+    from app import app
+
+    _grant_many(db_session, 2, **{FIELD_GENDER: "female"})
+    with TestClient(app) as client:  # lifespan starts the dispatcher
+        r = client.post(
+            "/auth/register", json={"email": "l@example.com", "password": "pw123456789"}
+        )
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        _launch(client, headers, filters=FEMALE_ONLY)
+
+        deadline = time.monotonic() + 5
+        while len(ConsoleNotifierBackend.outbox) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    assert len(ConsoleNotifierBackend.outbox) == 2
+
+
+def test_task_matched_rows_are_sent_as_one_digest(
+    client, register, db_session, monkeypatch, outbox
+):
+    from datetime import timedelta
+
+    from config import settings
+    from db.base import utcnow
+
+    monkeypatch.setattr(settings, "NOTIFY_DIGEST_WINDOW_SECONDS", 60)
+    (jumper,) = _grant_many(db_session, 1, **{FIELD_GENDER: "female"})
+    headers, _ = register("launcher@example.com")
+    for desc in ("first", "second", "third"):
+        _launch(client, headers, filters=FEMALE_ONLY, desc=desc)
+
+    assert outbox() == 0  # held inside the window
+    oldest = db_session.query(Notification).order_by(Notification.id).first()
+    oldest.created_at = utcnow() - timedelta(seconds=61)
+    db_session.commit()
+
+    assert outbox() == 3  # the due row pulls the user's other held rows along
+    assert len(ConsoleNotifierBackend.outbox) == 1
+    digest = ConsoleNotifierBackend.outbox[0]
+    assert digest.chat_id == str(jumper.id)
+    assert digest.text.startswith("🐦 3 new tasks for you")
+    assert all(desc in digest.text for desc in ("first", "second", "third"))
+    db_session.expire_all()
+    rows = db_session.query(Notification).filter_by(user_id=jumper.id).all()
+    assert len(rows) == 3  # one ledger row (and dedupe key) per event
+    assert {(r.status, r.provider_ref) for r in rows} == {("sent", "console-1")}
+
+
+def test_digest_skips_tasks_that_closed_inside_the_window(
+    client, register, db_session, monkeypatch, outbox
+):
+    from datetime import timedelta
+
+    from config import settings
+    from db.base import utcnow
+    from db.models import FanOutJob, Task
+
+    monkeypatch.setattr(settings, "NOTIFY_DIGEST_WINDOW_SECONDS", 60)
+    _grant_many(db_session, 1, **{FIELD_GENDER: "female"})
+    headers, _ = register("launcher@example.com")
+    descs = ("first", "second", "third", "fourth")
+    ids = [_launch(client, headers, filters=FEMALE_ONLY, desc=d) for d in descs]
+    assert outbox() == 0  # fan-outs finished, rows held
+    assert {j.status for j in db_session.query(FanOutJob)} == {"done"}
+
+    db_session.get(Task, ids[2]).status = "full"  # filled after its fan-out was done
+    db_session.query(FanOutJob).filter_by(task_id=ids[3]).delete()
+    db_session.delete(db_session.get(Task, ids[3]))  # and one deleted outright
+    for row in db_session.query(Notification):
+        row.created_at = utcnow() - timedelta(seconds=61)
+    db_session.commit()
+
+    assert outbox() == 2
+    (digest,) = ConsoleNotifierBackend.outbox
+    assert digest.text.startswith("🐦 2 new tasks for you")
+    assert "second" in digest.text and "third" not in digest.text
+    db_session.expire_all()
+    skipped = db_session.query(Notification).filter_by(status="skipped").all()
+    assert {r.payload["task_id"] for r in skipped} == set(ids[2:])
+    assert {r.skip_reason for r in skipped} == {"task_closed"}
+
+
+class _FakeTime:
+    """clock + sleep for the Telegram sender: sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _telegram(responses, fake_time, monkeypatch, **overrides):
+    """Sender over a mock transport answering with `responses` in order."""
+    import httpx
+
+    from config import settings
+    from services.notifier import TelegramNotifierBackend
+
+    for name, value in overrides.items():
+        monkeypatch.setattr(settings, name, value)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status, body = responses.pop(0) if responses else (200, None)
+        if body is None:
+            body = {"ok": True, "result": {"message_id": len(requests)}}
+        return httpx.Response(status, json=body)
+
+    backend = TelegramNotifierBackend(
+        "TOKEN",
+        transport=httpx.MockTransport(handler),
+        sleep=fake_time.sleep,
+        clock=fake_time.clock,
+    )
+    return backend, requests
+
+
+def test_telegram_honors_retry_after(monkeypatch):
+    fake = _FakeTime()
+    too_many = {"ok": False, "error_code": 429, "parameters": {"retry_after": 3}}
+    backend, requests = _telegram([(429, too_many)], fake, monkeypatch)
+
+    assert backend.send("42", "hi") == "2"
+    assert len(requests) == 2
+    assert requests[0].url.path == "/botTOKEN/sendMessage"
+    assert fake.now >= 3  # the retry waited out retry_after
+    assert backend.stats["rate_limited"] == 1 and backend.stats["sent"] == 1
+
+
+def test_telegram_retries_transient_not_permanent(monkeypatch):
+    from services.notifier import NotifyDeliveryError, RecipientBlockedError
+
+    fake = _FakeTime()
+    backend, requests = _telegram([(502, {}), (500, {})], fake, monkeypatch)
+    assert backend.send("42", "hi") == "3"
+    assert backend.stats["retried"] == 2
+
+    backend, requests = _telegram([(403, {"ok": False})], fake, monkeypatch)
+    with pytest.raises(RecipientBlockedError):
+        backend.send("42", "hi")
+    assert len(requests) == 1
+
+    backend, requests = _telegram([(400, {"ok": False})], fake, monkeypatch)
+    with pytest.raises(NotifyDeliveryError):
+        backend.send("42", "hi")
+    assert len(requests) == 1
+
+    backend, requests = _telegram([(503, {})] * 10, fake, monkeypatch, TELEGRAM_MAX_RETRIES=2)
+    with pytest.raises(NotifyDeliveryError):
+        backend.send("42", "hi")
+    assert len(requests) == 3
+
+
+def test_telegram_global_and_per_chat_pacing(monkeypatch):
+    fake = _FakeTime()
+    backend, _ = _telegram(
+        [],
+        fake,
+        monkeypatch,
+        TELEGRAM_RATE_PER_SECOND=2.0,
+        TELEGRAM_BURST=1,
+        TELEGRAM_CHAT_INTERVAL_SECONDS=5.0,
+    )
+    for chat in ("a", "b", "c"):
+        backend.send(chat, "hi")
+    assert fake.now == pytest.approx(1.0)  # 3 sends at 2/s after a burst of 1
+
+    backend.send("a", "again")  # last "a" went out at t=0
+    assert fake.now == pytest.approx(5.0)
+
+
+def test_telegram_backend_is_shared(monkeypatch):
+    from config import settings
+    from services.notifier import get_notifier
+
+    monkeypatch.setattr(settings, "NOTIFY_BACKEND", "telegram")
+    monkeypatch.setattr(settings, "BOT_TOKEN", "TOKEN")
+    assert get_notifier() is get_notifier()  # one pooled client, one rate limit
+
+
+def _make_due(db, task_id):
+    from datetime import timedelta
+
+    from db.base import utcnow
+
+    db.query(FanOutJob).filter_by(task_id=task_id).update(
+        {"next_run_at": utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+
+
+def test_fan_out_walks_audience_in_paced_batches(client, register, db_session, monkeypatch, outbox):
+    from config import settings
+
+    monkeypatch.setattr(settings, "FANOUT_BATCH_SIZE", 2)
+    users = _grant_many(db_session, 5, **{FIELD_GENDER: "female"})
+    headers, _ = register("launcher@example.com")
+    other, _ = register("other@example.com")
+    tid = _launch(client, headers, filters=FEMALE_ONLY)
+
+    worker = fanout.get_worker()
+    assert worker.step()
+    assert not worker.step()  # next batch is paced, not due yet
+    progress = client.get(f"/tasks/{tid}/fan-out", headers=headers).json()
+    assert progress["status"] == "running"
+    assert (progress["matched"], progress["notified"], progress["sent"]) == (2, 2, 0)
+
+    for _ in range(2):
+        _make_due(db_session, tid)
+        assert worker.step()
+    assert outbox() == 5
+
+    progress = client.get(f"/tasks/{tid}/fan-out", headers=headers).json()
+    assert progress["status"] == "done" and progress["finished_at"]
+    assert (progress["matched"], progress["notified"], progress["sent"]) == (5, 5, 5)
+    notified = [r.user_id for r in db_session.query(Notification).order_by(Notification.id)]
+    assert notified == sorted((u.id for u in users), reverse=True)  # newest first
+
+    assert client.get(f"/tasks/{tid}/fan-out", headers=other).status_code == 403
+
+
+def test_fan_out_stops_once_task_is_full(client, register, db_session, monkeypatch, outbox):
+    from config import settings
+
+    monkeypatch.setattr(settings, "FANOUT_BATCH_SIZE", 2)
+    _grant_many(db_session, 5, **{FIELD_GENDER: "female"})
+    headers, _ = register("launcher@example.com")
+    jumper, _ = register("jumper@example.com")
+    tid = _launch(client, headers, num_jumpers=1)  # unfiltered: everyone matches
+    assert fanout.get_worker().step()
+
+    assert client.post(f"/tasks/{tid}/jump", headers=jumper).status_code == 201
+    _make_due(db_session, tid)
+    assert fanout.get_worker().step()
+
+    progress = client.get(f"/tasks/{tid}/fan-out", headers=headers).json()
+    assert (progress["status"], progress["stop_reason"]) == ("stopped", "full")
+    assert progress["matched"] == 2
+    matched = db_session.query(Notification).filter_by(event_type="task.matched").all()
+    assert {(r.status, r.skip_reason) for r in matched} == {("skipped", "task_closed")}
+
+
+def test_notify_many_dedupes_in_a_handful_of_statements(db_session, monkeypatch):
+    from sqlalchemy import event, insert
+
+    from config import settings
+    from db.engine import engine
+    from services.notifications import Outgoing, notify_many
+
+    monkeypatch.setattr(settings, "NOTIFY_DISPATCH", "outbox")
+    db_session.execute(insert(User), [{"email": f"bulk{i}@example.com"} for i in range(10_000)])
+    users = db_session.query(User).all()
+    users[0].notifications_muted = True
+    db_session.flush()
+    batch = [Outgoing(u, "test.bulk", "hi", dedupe_key=f"test.bulk:{u.id}") for u in users]
+
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        ids = notify_many(db_session, batch)
+        again = notify_many(db_session, batch[:10] + [Outgoing(users[1], "test.other", "x")])
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(ids) == 10_000
+    assert len(again) == 1  # only the row without a dedupe key is new
+    assert len(statements) <= 20
+    db_session.commit()
+    muted = db_session.query(Notification).filter_by(user_id=users[0].id).one()
+    assert (muted.status, muted.skip_reason) == ("skipped", "muted")
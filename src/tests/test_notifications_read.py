@@ -1,6 +1,20 @@
 # filepath: src/tests/test_notifications_read.py
 
-"""GET /users/me/notifications — the polling endpoint for the dev web client."""
+"""GET /users/me/notifications — polling, long-poll and SSE for the web client."""
+
+import asyncio
+import contextlib
+import json
+import threading
+import time
+
+from sqlalchemy import event
+
+from app import app
+from config import settings
+from db.engine import SessionLocal, engine
+from db.models import User
+from services import notifications
 
 
 def _launch_manual(client, headers):
@@ -85,3 +99,130 @@ def test_since_id_polling(client, register):
         "/users/me/notifications", headers=launcher, params={"since_id": last_seen}
     ).json()
     assert [r["event_type"] for r in fresh] == ["task.full"]
+
+
+def _notify_later(user_id: int, text: str, delay: float = 0.2) -> threading.Timer:
+    def _commit():
+        with SessionLocal() as db:
+            notifications.notify(db, db.get(User, user_id), "test.live", text)
+            db.commit()
+
+    timer = threading.Timer(delay, _commit)
+    timer.start()
+    return timer
+
+
+def test_wait_returns_existing_rows_at_once(client, register):
+    launcher, _ = register("launcher@example.com")
+    jumper, _ = register("jumper@example.com")
+    tid = _launch_manual(client, launcher)
+    client.post(f"/tasks/{tid}/jump", headers=jumper)
+
+    t0 = time.monotonic()
+    rows = client.get(
+        "/users/me/notifications/wait", headers=launcher, params={"timeout": 10}
+    ).json()
+    assert time.monotonic() - t0 < 5
+    assert [r["event_type"] for r in rows] == ["jump.pending"]
+
+
+def test_idle_wait_does_not_touch_the_db(client, register):
+    headers, _ = register("quiet@example.com")
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        t0 = time.monotonic()
+        rows = client.get(
+            "/users/me/notifications/wait", headers=headers, params={"timeout": 0.5}
+        ).json()
+        elapsed = time.monotonic() - t0
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert rows == []
+    assert elapsed >= 0.5
+    assert len(statements) <= 3  # auth + one ledger read; nothing while waiting
+
+
+def test_wait_wakes_on_commit(client, register):
+    headers, _ = register("waiter@example.com")
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+
+    timer = _notify_later(user_id, "hello")
+    t0 = time.monotonic()
+    rows = client.get(
+        "/users/me/notifications/wait", headers=headers, params={"timeout": 10}
+    ).json()
+    timer.join()
+    assert time.monotonic() - t0 < 5
+    assert [r["text"] for r in rows] == ["hello"]
+
+
+def test_wait_timeout_is_capped(client, register, monkeypatch):
+    headers, _ = register("waiter@example.com")
+    monkeypatch.setattr(settings, "NOTIFY_LONGPOLL_MAX_SECONDS", 0)
+    r = client.get("/users/me/notifications/wait", headers=headers, params={"timeout": 600})
+    assert r.json() == []
+
+
+async def _read_events(headers: dict, count: int, on_event) -> list[dict]:
+    # TestClient buffers whole responses, so drive the endless stream over raw ASGI
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "path": "/users/me/notifications/stream",
+        "raw_path": b"/users/me/notifications/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    disconnected = asyncio.Event()
+    chunks: asyncio.Queue[dict] = asyncio.Queue()
+
+    async def receive():
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    app_task = asyncio.create_task(app(scope, receive, chunks.put))
+    start = await asyncio.wait_for(chunks.get(), 5)
+    assert dict(start["headers"])[b"content-type"].startswith(b"text/event-stream")
+    events, buf = [], ""
+    try:
+        while len(events) < count:
+            buf += (await asyncio.wait_for(chunks.get(), 5)).get("body", b"").decode()
+            *frames, buf = buf.split("\n\n")
+            for frame in frames:
+                for line in frame.splitlines():
+                    if line.startswith("data: "):
+                        events.append(json.loads(line[6:]))
+                        on_event(events[-1])
+    finally:
+        disconnected.set()
+        app_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await app_task
+    return events
+
+
+def test_stream_sends_backlog_then_new_rows(client, register, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_STREAM_HEARTBEAT_SECONDS", 0.1)
+    headers, _ = register("streamer@example.com")
+    user_id = client.get("/users/me", headers=headers).json()["id"]
+    _notify_later(user_id, "old", delay=0).join()
+
+    timers = []
+    events = asyncio.run(
+        _read_events(headers, 2, lambda _e: timers.append(_notify_later(user_id, "new")))
+    )
+    for timer in timers:
+        timer.join()
+
+    assert [e["text"] for e in events] == ["old", "new"]
+    assert events[1]["id"] > events[0]["id"]
@@ -67,6 +67,42 @@ def test_browse_pagination(client, register):
     assert len(r.json()["items"]) == 1
 
 
+def test_browse_cursor_walks_the_feed_once(client, register):
+    headers, _ = register("launcher@example.com")
+    launched = [_launch(client, headers, desc=f"task {i}")["id"] for i in range(5)]
+
+    first = client.get("/tasks", headers=headers, params={"size": 2}).json()
+    assert first["total"] == 5
+    seen = [t["id"] for t in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        body = client.get("/tasks", headers=headers, params={"size": 2, "cursor": cursor}).json()
+        assert body["total"] is None  # cursor pages don't count
+        seen += [t["id"] for t in body["items"]]
+        cursor = body["next_cursor"]
+    assert seen == sorted(launched, reverse=True)
+
+
+def test_browse_cursor_is_stable_under_inserts(client, register):
+    headers, _ = register("launcher@example.com")
+    for i in range(3):
+        _launch(client, headers, desc=f"task {i}")
+    first = client.get("/tasks", headers=headers, params={"size": 1}).json()
+    _launch(client, headers, desc="newer")  # would shift every OFFSET page by one
+
+    body = client.get(
+        "/tasks", headers=headers, params={"size": 5, "cursor": first["next_cursor"]}
+    ).json()
+    assert [t["desc"] for t in body["items"]] == ["task 1", "task 0"]
+    assert body["next_cursor"] is None
+
+
+def test_browse_rejects_bad_cursor(client, register):
+    headers, _ = register("launcher@example.com")
+    r = client.get("/tasks", headers=headers, params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
 def test_jump_lifecycle(client, register):
     launcher, _ = register("launcher@example.com")
     j1, _ = register("jumper1@example.com")
@@ -151,3 +187,74 @@ def test_task_audit_events(client, register, db_session):
     types = [e.event_type for e in db_session.query(AuditEvent).all()]
     for expected in ("task.launched", "task.jumped", "task.forfeited"):
         assert expected in types
+
+
+def test_buffered_audit_is_written_after_commit_in_batches(
+    client, register, db_session, monkeypatch
+):
+    from config import settings
+    from db.models import AuditEvent
+    from services import audit
+
+    monkeypatch.setattr(settings, "AUDIT_SINK", "buffered")
+    monkeypatch.setattr(settings, "AUDIT_BATCH_SIZE", 2)
+    launcher, _ = register("launcher@example.com")
+    j1, _ = register("jumper1@example.com")
+    task = _launch(client, launcher)
+    client.post(f"/tasks/{task['id']}/jump", headers=j1)
+
+    assert db_session.query(AuditEvent).count() == 0  # off the request path
+    writer = audit.get_writer()
+    assert writer.pending() == 4
+
+    # a rolled-back transaction never reaches the buffer
+    audit.record(db_session, "test.rolled_back")
+    db_session.rollback()
+    assert writer.pending() == 4
+
+    assert writer.flush() == 4
+    rows = db_session.query(AuditEvent).order_by(AuditEvent.id).all()
+    assert [r.event_type for r in rows] == [
+        "auth.register",
+        "auth.register",
+        "task.launched",
+        "task.jumped",
+    ]
+    assert all(r.request_id and r.created_at for r in rows)
+
+
+def test_buffered_audit_is_flushed_on_shutdown(db_session, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import app
+    from config import settings
+    from db.models import AuditEvent
+
+    monkeypatch.setattr(settings, "AUDIT_SINK", "buffered")
+    monkeypatch.setattr(settings, "AUDIT_FLUSH_SECONDS", 3600)  # only shutdown flushes
+    with TestClient(app) as client:
+        r = client.post(
+            "/auth/register", json={"email": "l@example.com", "password": "pw123456789"}
+        )
+        assert r.status_code == 201
+    assert [e.event_type for e in db_session.query(AuditEvent)] == ["auth.register"]
+
+
+def test_hot_paths_stay_within_query_budgets(client, register, query_budget):
+    # statement counts must not grow with the number of rows listed (N+1)
+    launcher, _ = register("launcher@example.com")
+    jumpers = [register(f"jumper{i}@example.com")[0] for i in range(3)]
+    tasks = [_launch(client, launcher, desc=f"task {i}", num_jumpers=3) for i in range(3)]
+    for task in tasks:
+        for jumper in jumpers:
+            client.post(f"/tasks/{task['id']}/jump", headers=jumper)
+
+    query_budget(2, "GET", "/users/me", headers=jumpers[0])
+    assert len(query_budget(2, "GET", "/tasks/my", headers=launcher).json()) == 3
+    assert len(query_budget(2, "GET", "/tasks/participated", headers=jumpers[0]).json()) == 3
+    jumps = query_budget(3, "GET", f"/tasks/{tasks[0]['id']}/jumps", headers=launcher)
+    assert len(jumps.json()) == 3
+
+    metrics = client.get("/health/queries").json()
+    assert metrics["GET /tasks/{task_id}/jumps"]["queries_max"] == 3
+    assert metrics["POST /tasks/{task_id}/jump"]["requests"] == 9
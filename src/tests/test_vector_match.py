@@ -0,0 +1,96 @@
+# filepath: src/tests/test_vector_match.py
+
+"""Vectorized snapshot mode (services/vector_match.py) — needs numpy."""
+
+import random
+from datetime import date
+
+import pytest
+
+from db.models import User, VerificationData
+from services import matching
+from services.attributes import (
+    FIELD_BIRTH_DATE,
+    FIELD_CITY,
+    FIELD_COUNTRY,
+    FIELD_GENDER,
+    grant_verified_attributes,
+    load_snapshot,
+)
+
+pytest.importorskip("numpy")
+
+from services.vector_match import AttributeMatrix  # noqa: E402
+
+CASES = [
+    {"basic_filters": {"gender": "female"}},
+    {"basic_filters": {"age_range": {"min": 20, "max": 31}}},
+    {"basic_filters": {"age_range": {"max": 30}, "gender": "male"}},
+    {
+        "basic_filters": {
+            "location_filter": {
+                "regions": [{"name": "emea", "exceptions": {"countries": ["russia"]}}]
+            }
+        }
+    },
+    {
+        "basic_filters": {
+            "age_range": {"min": 25},
+            "location_filter": {
+                "countries": [{"name": "germany", "exceptions": {"cities": ["berlin"]}}],
+                "cities": [{"name": "paris"}, {"name": "atlantis"}],
+            },
+        }
+    },
+]
+
+
+def _birth(age_years: int) -> str:
+    today = date.today()
+    return today.replace(year=today.year - age_years, day=1).isoformat()
+
+
+def test_matrix_agrees_with_snapshot_mode(db_session):
+    rng = random.Random(7)
+    users = []
+    for i in range(60):
+        user = User(email=f"vec{i}@x.com")
+        db_session.add(user)
+        db_session.flush()
+        attrs = {
+            FIELD_GENDER: rng.choice(("female", "male")),
+            FIELD_COUNTRY: rng.choice(("germany", "france", "turkey", "russia")),
+            FIELD_CITY: rng.choice(("berlin", "paris", "istanbul", "moscow", "munich")),
+            FIELD_BIRTH_DATE: _birth(rng.randint(16, 60)),
+        }
+        for field in rng.sample(sorted(attrs), rng.randint(0, 2)):
+            del attrs[field]  # partial profiles: missing attribute = no match
+        if attrs:
+            grant_verified_attributes(db_session, user, attrs)
+        users.append(user)
+    db_session.flush()
+    # rows the integer codes can't hold: a second current city, a non-ISO birth
+    source = db_session.query(VerificationData).first()
+    for user, field, value in (
+        (users[1], FIELD_CITY, "berlin"),
+        (users[2], FIELD_BIRTH_DATE, "1990"),
+    ):
+        db_session.add(
+            VerificationData(
+                user_id=user.id,
+                field_name=field,
+                field_value=value,
+                verification_source_id=source.verification_source_id,
+                is_current=True,
+            )
+        )
+    db_session.commit()
+
+    matrix = AttributeMatrix.load(db_session)
+    snapshots = {u.id: load_snapshot(db_session, u.id) for u in users}
+    for filters in CASES:
+        pf = matching.parse_filters(filters)
+        expected = sorted(
+            uid for uid, s in snapshots.items() if not matching.unmet_requirements(pf, s)
+        )
+        assert matrix.match(pf).tolist() == expected, filters